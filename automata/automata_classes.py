@@ -6,11 +6,28 @@ for its type, such as how it processes input strings and what constitutes a vali
 transition. These are the main classes intended for user interaction.
 """
 
-from typing import List, Set, Tuple, Union, Callable
+import math
+from typing import Iterable, Iterator, List, Set, Tuple, Union, Callable
 
 from automata.automaton import Automaton
-from automata.state import By, State, AutomatonState
-from automata.transition import PDATransition, Transition, MappingType, TuringTransition
+from automata.state import By, State
+from automata.transition import PDATransition, Transition, MappingType, TuringTransition, MultiStackPDATransition, \
+    MultiTapeTuringTransition
+from automata.simulation.pda import CompiledPDA, CompiledDPDA, DPDASession, RunWitness
+from automata.simulation.multistack import CompiledMultiStackPDA
+from automata.simulation.multitape import CompiledMultiTapeTuring
+from automata.simulation.ntm import CompiledNTM, SegmentStore
+from automata.simulation.tape import Tape
+from automata.simulation.turing import CompiledTuring, turing_outcome
+from automata.simulation.frozen import FrozenTuring
+from automata.simulation.codegen import GeneratedTuring
+from automata.simulation.macro import AcceleratedRun, MacroMachine
+from automata.simulation.deciders import Decision, DeciderState, decide
+from automata.simulation.cooperative import run_to_completion, stepped_in_chunks, tighter_budget
+from automata.simulation import checkpoint
+from automata.simulation.trace import TraceRecorder, TURING_FIELDS
+from automata.simulation.transducer import CompiledTransducer, TransducerSession, BatchTransduction, \
+    encode_sequences, transduce_batch
 
 
 class DFA(Automaton):
@@ -41,14 +58,94 @@ class DFA(Automaton):
         """
         super().__init__(name, description, 'DFA', allow_partial)
 
-class MOORE(Automaton):
+class Transducer(Automaton):
+    """
+    Base class of the machines that produce output, `MOORE` and `MEALY`.
+
+    `process_input` collects the outputs in `output[simulation_input]`. For long inputs
+    use `transduce` or `session`, which stream the outputs in constant memory, see
+    `automata.simulation.transducer`.
+    """
+
+    def compile(self) -> CompiledTransducer:
+        """
+        Returns integer next-state and output tables indexed by (state, input symbol).
+        The tables are cached and rebuilt automatically after states or transitions
+        are added.
+        """
+        if self._compiled is None:
+            self._compiled = CompiledTransducer(self)
+        return self._compiled
+
+    def session(self) -> TransducerSession:
+        """
+        Starts a resumable run from the initial state for input that arrives in chunks.
+
+        Returns:
+            TransducerSession: A session with `feed(chunk)`, which yields the outputs,
+            `feed_into(chunk, sink)`, which writes them to a list or file, and `finish()`.
+        """
+        return TransducerSession(self)
+
+    def transduce(self, simulation_input: Iterable[str]) -> Iterator:
+        """
+        Runs the machine from the initial state and yields its outputs lazily. The
+        input can be any iterable of symbols, including a generator, and stops at the
+        first symbol without a transition.
+        """
+        return self.session().feed(simulation_input)
+
+    def transduce_batch(self, sequences: Iterable[Iterable[str]]) -> BatchTransduction:
+        """
+        Runs many sequences from the initial state in lockstep with NumPy.
+
+        Args:
+            sequences: The input sequences, for example a list of strings.
+
+        Returns:
+            BatchTransduction: A matrix of output codes with one row per sequence, the
+            table to decode them with and the final state of every sequence.
+        """
+        compiled = self.compile()
+        codes, lengths = encode_sequences(compiled, sequences)
+        return transduce_batch(compiled, codes, lengths, compiled.state_index[self.initial_state])
+
+class MOORE(Transducer):
     def __init__(self, name='MOORE', description='', allow_partial=False):
         super().__init__(name, description, 'MOORE', allow_partial)
 
-class MEALY(Automaton):
+    def minimize(self) -> 'MOORE':
+        """Returns the minimal equivalent machine, see `automata.conversion.transducers.minimize_moore`."""
+        from automata.conversion.transducers import minimize_moore
+        return minimize_moore(self)
+
+    def to_mealy(self) -> 'MEALY':
+        """Returns an equivalent Mealy machine, see `automata.conversion.transducers.moore_to_mealy`."""
+        from automata.conversion.transducers import moore_to_mealy
+        return moore_to_mealy(self)
+
+class MEALY(Transducer):
     def __init__(self, name='MEALY', description='', allow_partial=False):
         super().__init__(name, description,  'MEALY', allow_partial)
 
+    def compose(self, *others: 'MEALY', minimize=False) -> 'MEALY':
+        """
+        Fuses this machine and `others` into one machine, each consuming the outputs of
+        the one before it, see `automata.conversion.transducers.compose_mealy`.
+        """
+        from automata.conversion.transducers import compose_mealy
+        return compose_mealy(self, *others, minimize=minimize)
+
+    def minimize(self) -> 'MEALY':
+        """Returns the minimal equivalent machine, see `automata.conversion.transducers.minimize_mealy`."""
+        from automata.conversion.transducers import minimize_mealy
+        return minimize_mealy(self)
+
+    def to_moore(self) -> 'MOORE':
+        """Returns an equivalent Moore machine, see `automata.conversion.transducers.mealy_to_moore`."""
+        from automata.conversion.transducers import mealy_to_moore
+        return mealy_to_moore(self)
+
 
 class NFA(Automaton):
     """
@@ -119,6 +216,10 @@ class NFA(Automaton):
         Returns:
             bool: True if the string is accepted, False otherwise.
         """
+        return run_to_completion(self._run_chunks(simulation_input))
+
+    def _run_chunks(self, simulation_input, step_budget=None, chunk_steps=None):
+        """The simulation behind `process_input`, yielding every `chunk_steps` consumed symbols."""
 
         # Check if the NFA has any epsilon transitions
         has_epsilon_transitions = any(
@@ -132,7 +233,11 @@ class NFA(Automaton):
         if has_epsilon_transitions:
             self.current_states = self._epsilon_closure(self.initial_state)
 
-        for symbol in simulation_input:
+        for position, symbol in enumerate(simulation_input):
+            if step_budget is not None and position >= step_budget:
+                return False
+            if chunk_steps and position and position % chunk_steps == 0:
+                yield position
             if symbol not in self.alphabet:
                 return False
 
@@ -200,7 +305,7 @@ class DPDA(Automaton):
             self.initial_stack: List[str] = ['|']  # Initialize with a bottom marker
         else:
             self.initial_stack: List[str] = initial_stack
-        self.stack: List[str] = self.initial_stack
+        self.stack: List[str] = self.initial_stack.copy()
         self.stack_alphabet: Set[str] = set(self.initial_stack)  # Initialize with a bottom marker
         self.require_empty_stack = require_empty_stack
 
@@ -308,88 +413,73 @@ class DPDA(Automaton):
 
         source_state.transitions[key] = transition
         source_state.used_symbols.add(symbol)
+        self._compiled = None
+
+    def compile(self) -> CompiledDPDA:
+        """
+        Returns the transition tables used by `process_input`. Every input transition
+        is fused with the epsilon chain following it, and epsilon chains that never
+        terminate are detected here instead of hanging the simulation. The tables are
+        cached and rebuilt automatically after states or transitions are added.
+        """
+        if self._compiled is None:
+            self._compiled = CompiledDPDA(self)
+        return self._compiled
 
     def follow_epsilon_transitions(self):
         """Follow all possible epsilon transitions from the current state"""
-        while True:
-            stack_top = self.stack[-1] if self.stack else '|'
-            epsilon_transition = self.current_state.transitions.get(('', stack_top))
-
-            if not epsilon_transition:
-                break
+        compiled = self.compile()
+        stack = list(compiled.encode_stack(self.stack))
+        state = compiled.follow_epsilon(compiled.state_index[self.current_state], stack)
+        self.stack = list(compiled.decode_stack(stack))
+        self.current_state = compiled.states[state]
 
-            # Perform stack operations for epsilon transition
-            if epsilon_transition.stack_symbol != '':  # If we need to pop
-                if not self.stack or self.stack[-1] != epsilon_transition.stack_symbol:
-                    break
-                self.stack.pop()
+    def session(self, require_empty_stack=None, trace: TraceRecorder = None) -> DPDASession:
+        """
+        Starts a resumable run for input that arrives in chunks, for example when
+        validating nested structures in a network stream.
 
-            # Push new symbols in reverse order
-            for push_symbol in reversed(epsilon_transition.stack_push):
-                self.stack.append(push_symbol)
+        Args:
+            require_empty_stack: Override default empty stack requirement
+            trace: A `TraceRecorder` to record the last consumed symbols and stack
+                   operations in.
 
-            self.current_state = epsilon_transition.target
+        Returns:
+            DPDASession: A session with `feed(chunk)`, `at_accepting_point()` and `finish()`.
+        """
+        return DPDASession(self, require_empty_stack, trace)
 
-    def process_input(self, simulation_input: str, require_empty_stack=None) -> bool:
+    def process_input(self, simulation_input: str, require_empty_stack=None, trace: TraceRecorder = None) -> bool:
         """
         Process an input string and return whether it's accepted
 
         Args:
             simulation_input: String to process
             require_empty_stack: Override default empty stack requirement
+            trace: A `TraceRecorder` to record the last steps of the run in
         """
+        return run_to_completion(self._run_chunks(simulation_input, require_empty_stack=require_empty_stack,
+                                                  trace=trace))
+
+    def _run_chunks(self, simulation_input: str, step_budget=None, chunk_steps=None, require_empty_stack=None,
+                    trace=None):
+        """The simulation behind `process_input`, yielding every `chunk_steps` consumed symbols."""
+        session = self.session(require_empty_stack, trace)
+        end = len(simulation_input) if step_budget is None else min(step_budget, len(simulation_input))
+        chunk_steps = chunk_steps or max(end, 1)
+        for start in range(0, end, chunk_steps):
+            if start:
+                yield start
+            if not session.feed(simulation_input[start:start + chunk_steps]):
+                break
 
-        self.stack = self.initial_stack  # Reset stack to the initial state
-        self.current_state = self.initial_state  # Reset to the initial state
-        input_pos = 0  # Track position in the input string
-
-        # Use method parameter if provided, otherwise use class setting
-        check_empty_stack = (require_empty_stack
-                             if require_empty_stack is not None
-                             else self.require_empty_stack)
-
-        # Follow initial epsilon transitions
-        self.follow_epsilon_transitions()
-
-        while input_pos < len(simulation_input):
-            symbol = simulation_input[input_pos]
-
-            if symbol not in self.alphabet:
-                return False
-
-            # Try to find a valid transition
-            stack_top = self.stack[-1] if self.stack else '|'
-
-            transition = self.current_state.transitions.get((symbol, stack_top))
-            if not transition:
-                return False
-
-            # Perform stack operations
-            if not self.stack or self.stack[-1] != transition.stack_symbol:
-                return False
-
-            self.stack.pop()
-
-            # Push new symbols in reverse order
-            for push_symbol in reversed(transition.stack_push):
-                self.stack.append(push_symbol)
-
-            self.current_state = transition.target
-            input_pos += 1  # Move to the next input symbol
-
-            # Follow any epsilon transitions after processing the input symbol
-            self.follow_epsilon_transitions()
-
-        # Follow any remaining epsilon transitions after input is consumed
-        self.follow_epsilon_transitions()
+        self.stack = session.decoded_stack()
+        self.current_state = session.current_state
+        if session.rejected or end < len(simulation_input):
+            return False
 
-        # Accept if:
-        # 1. All inputs were consumed (input_pos == len(simulation_input))
-        # 2. In a final state
-        # 3. Stack is empty (if required)
-        acceptance = (input_pos == len(simulation_input) and
-                      self.current_state.is_final and
-                      (not check_empty_stack or len(self.stack) == 1))
+        # Accept if all inputs were consumed in a final state, with an empty stack if required
+        acceptance = session.finish()
 
         self.output[simulation_input] = {
             "state": self.current_state.name,
@@ -409,6 +499,7 @@ class NPDA(Automaton):
         self.stack_alphabet: Set[str] = set(self.initial_stack)  # Initialize with a bottom marker
         self.require_empty_stack = require_empty_stack
         self.current_states: Set[Tuple[State, Tuple[str, ...]]] = set()
+        self.witness: Union[RunWitness, None] = None
 
     def add_transition(self, source: str, target: str, symbol: Union[str, List[str]],
                        stack_symbol: Union[str, List[str]], stack_push: Union[List[str],
@@ -477,74 +568,82 @@ class NPDA(Automaton):
             source_state.transitions[symbol] = []
         source_state.transitions[symbol].append(transition)
         source_state.used_symbols.add(symbol)
+        self._compiled = None
 
-    @staticmethod
-    def _apply_stack_operation(stack: List[str],
-                               stack_symbol: str, stack_push: List[str]) -> Union[List[str], None]:
-        if stack_symbol and (not stack or stack[-1] != stack_symbol):
-            return None
-
-        new_stack = stack[:-1] if stack_symbol else stack.copy()
-
-        for symbol in reversed(stack_push):
-            new_stack.append(symbol)
-
-        return new_stack
-
-    def _get_epsilon_closure(self, state: AutomatonState, stack: List[str]) -> Set[Tuple[AutomatonState, Tuple[str, ...]]]:
-        closure = {(state, tuple(stack))}
-        stack_states_to_process = [(state, stack)]
-
-        while stack_states_to_process:
-            current_state, current_stack = stack_states_to_process.pop()
+    def compile(self) -> CompiledPDA:
+        """
+        Returns the transition tables used by `process_input`, indexed by
+        (state, input symbol, stack top). The tables are cached and rebuilt
+        automatically after states or transitions are added.
+        """
+        if self._compiled is None:
+            self._compiled = CompiledPDA(self)
+        return self._compiled
 
-            if "" in current_state.transitions:
-                for transition in current_state.transitions[""]:
-                    new_stack = self._apply_stack_operation(
-                        current_stack.copy(),
-                        transition.stack_symbol,
-                        transition.stack_push
-                    )
+    @staticmethod
+    def _decode_configurations(compiled: CompiledPDA, configurations) -> Set[Tuple[State, Tuple[str, ...]]]:
+        return {(compiled.states[state], compiled.decode_stack(stack)) for state, stack in configurations}
 
-                    if new_stack is not None:
-                        new_config = (transition.target, tuple(new_stack))
-                        if new_config not in closure:
-                            closure.add(new_config)
-                            stack_states_to_process.append((transition.target, new_stack))
+    def process_input(self, simulation_input: str, require_empty_stack=None, witness=False) -> bool:
+        """
+        Process an input string and return whether it's accepted
 
-        return closure
+        Args:
+            simulation_input: String to process
+            require_empty_stack: Override default empty stack requirement
+            witness: If True, record parent pointers during the search, so that one of the
+                     shortest accepting runs can be retrieved with `accepting_run()`
+        """
+        return run_to_completion(self._run_chunks(simulation_input, require_empty_stack=require_empty_stack,
+                                                  witness=witness))
 
-    def process_input(self, simulation_input: str, require_empty_stack=None) -> bool:
+    def _run_chunks(self, simulation_input: str, step_budget=None, chunk_steps=None, require_empty_stack=None,
+                    witness=False):
+        """
+        The simulation behind `process_input`, yielding whenever another `chunk_steps`
+        configurations have been explored.
+        """
         check_empty_stack = (require_empty_stack
                              if require_empty_stack is not None
                              else self.require_empty_stack)
 
-        self.current_states = self._get_epsilon_closure(self.initial_state, self.initial_stack.copy())
+        compiled = self.compile()
+        initial = (compiled.state_index[self.initial_state], compiled.encode_stack(self.initial_stack))
+
+        if witness:
+            return self._process_with_witness(compiled, initial, simulation_input, check_empty_stack)
+
+        self.witness = None
+        configurations = compiled.epsilon_closure([initial])
+        steps = len(configurations)
+        next_yield = chunk_steps
 
         for symbol in simulation_input:
+            if step_budget is not None and steps > step_budget:
+                self.current_states = self._decode_configurations(compiled, configurations)
+                return False
+            if next_yield and steps >= next_yield:
+                yield steps
+                next_yield = steps + chunk_steps
             if symbol not in self.alphabet:
+                self.current_states = self._decode_configurations(compiled, configurations)
                 return False
 
-            next_states = set()
-
-            for current_state, current_stack in self.current_states:
-                if symbol in current_state.transitions:
-                    for transition in current_state.transitions[symbol]:
-                        new_stack = self._apply_stack_operation(
-                            list(current_stack),
-                            transition.stack_symbol,
-                            transition.stack_push
-                        )
-
-                        if new_stack is not None:
-                            next_states.update(
-                                self._get_epsilon_closure(transition.target, new_stack)
-                            )
+            next_configurations = compiled.step(configurations, symbol)
 
-            if not next_states:
+            if not next_configurations:
+                self.current_states = self._decode_configurations(compiled, configurations)
                 return False
 
-            self.current_states = next_states
+            configurations = next_configurations
+            steps += len(configurations)
+
+        if step_budget is not None and steps > step_budget:
+            self.current_states = self._decode_configurations(compiled, configurations)
+            return False
+
+        # Map back to state objects and stack symbols only once, for the caller
+        self.current_states = self._decode_configurations(compiled, configurations)
 
         acceptance = any(
             state.is_final and (not check_empty_stack or len(stack) == 1)
@@ -557,6 +656,36 @@ class NPDA(Automaton):
         }
         return acceptance
 
+    def _process_with_witness(self, compiled: CompiledPDA, initial, simulation_input: str,
+                              check_empty_stack: bool) -> bool:
+        configurations, self.witness, consumed = compiled.witness_search(initial, simulation_input, self.alphabet)
+        self.current_states = self._decode_configurations(compiled, configurations)
+        if not consumed:
+            return False
+
+        final = compiled.final
+        acceptance = self.witness.select_accepting(
+            lambda state, stack: final[state] and (not check_empty_stack or len(stack) == 1)
+        )
+
+        self.output[simulation_input] = {
+            "states": [state.name for state, _ in self.current_states],
+            "accepted": acceptance
+        }
+        return acceptance
+
+    def accepting_run(self) -> Union[List[PDATransition], None]:
+        """
+        Reconstructs an accepting run of the last input processed with `witness=True`.
+
+        Returns:
+            List[PDATransition]: The transitions of one of the shortest accepting runs,
+            or None if the input was rejected or processed without a witness.
+        """
+        if self.witness is None:
+            return None
+        return self.witness.run()
+
 
 class Turing(Automaton):
     def __init__(self, name='Turing Machine', description='', blank_symbol='|'):
@@ -564,6 +693,7 @@ class Turing(Automaton):
         self.tape = []
         self.head_position = 1
         self.blank_symbol = blank_symbol
+        self._generated = None  # The tables compile_python last ran on, its cache_dir and result
 
     def add_transition(self, source: str, target: str, tape_symbol: Union[str, List[str]],
                        tape_write: Union[str, List[str]], move: str, by=By.NAME,
@@ -608,6 +738,42 @@ class Turing(Automaton):
 
         source_state.transitions[tape_symbol] = transition
         source_state.used_symbols.add(tape_symbol)
+        self._compiled = None
+
+    def compile(self) -> CompiledTuring:
+        """
+        Returns flat transition tables (next state, write symbol, move delta) indexed by
+        `state * symbol_count + symbol`, which `process_input` runs on. The tables are
+        cached and rebuilt automatically after states or transitions are added or the
+        blank symbol changes.
+        """
+        if self._compiled is None or self._compiled.blank != self.blank_symbol:
+            self._compiled = CompiledTuring.from_turing(self)
+        return self._compiled
+
+    def freeze(self) -> FrozenTuring:
+        """
+        Returns an immutable snapshot of the machine backed by its flat transition
+        tables, see `automata.simulation.frozen`. Snapshots pickle far faster than the
+        machine, can be put into shared memory with `share()`, and run with
+        `process_input` or any engine that takes a machine with `compile()`.
+        """
+        compiled = self.compile()
+        return FrozenTuring.from_compiled(compiled, compiled.state_index[self.initial_state], self.name)
+
+    def compile_python(self, cache_dir: str = None) -> GeneratedTuring:
+        """
+        Returns the machine compiled to a specialized Python function, see
+        `automata.simulation.codegen`. The generated module is cached on disk in
+        `cache_dir` (by default in the user's cache directory), keyed by a hash of the
+        transition tables. Like `compile`, the result is cached until the machine changes,
+        and without `cache_dir` the machine generated last is reused wherever it was cached.
+        """
+        compiled = self.compile()
+        if self._generated is None or self._generated[0] is not compiled \
+                or cache_dir not in (None, self._generated[1]):
+            self._generated = compiled, cache_dir, GeneratedTuring.from_compiled(compiled, cache_dir)
+        return self._generated[2]
 
     def loop(self, source:str, tape_symbol:Union[list[str], str], move:str, by=By.NAME):
         self.add_transition(source, source, tape_symbol, tape_symbol, move, by)
@@ -622,43 +788,171 @@ class Turing(Automaton):
             self,
             simulation_input: Union[List[str], str],
             max_iterations=1000,
-            return_steps=False
+            return_steps=False,
+            backend="table",
+            trace: TraceRecorder = None
     ) -> Union[tuple[bool, list[str]], tuple[bool, list[str], int]]:
-        self.current_state = self.initial_state
-        self.tape = list(self.blank_symbol) + list(simulation_input) + list(self.blank_symbol)
-        self.head_position = 1
+        return run_to_completion(self._run_chunks(simulation_input, max_iterations, return_steps=return_steps,
+                                                  backend=backend, trace=trace))
+
+    def _run_chunks(self, simulation_input: Union[List[str], str], step_budget=None, chunk_steps=None,
+                    return_steps=False, backend="table", trace=None, max_iterations=None):
+        """
+        The simulation behind `process_input`, with `step_budget` as `max_iterations`
+        (if both are given, the smaller one applies).
+        `backend` is "table" for the flat transition tables or "python" for generated code.
+        With a `TraceRecorder` as `trace`, the last steps of the run are recorded in it.
+        """
+        step_budget = tighter_budget(step_budget, max_iterations)
+        if backend == "table":
+            compiled = self.compile()
+        elif backend == "python":
+            compiled = self.compile_python()
+        else:
+            raise ValueError(f"Unknown backend '{backend}', expected 'table' or 'python'")
+        compiled, tape = compiled.new_tape(simulation_input)
+
+        if trace is None:
+            def run(current, count):
+                return compiled.run(tape, current, count)
+        else:
+            trace.bind(TURING_FIELDS, {"state": [state.name for state in compiled.states],
+                                       "read": compiled.symbols, "write": compiled.symbols})
+
+            def run(current, count):
+                try:
+                    return compiled.run_traced(tape, current, count, trace)
+                except BaseException:
+                    trace.failed()
+                    raise
+
+        # The old step loop checked the budget before looking up a transition, so a
+        # machine gets max_iterations + 1 steps before the run is cut off
+        budget = math.inf if step_budget is None else step_budget + 1
+        state, iteration, halted = yield from stepped_in_chunks(
+            run, compiled.state_index[self.initial_state], budget, chunk_steps)
+        if trace is not None:
+            trace.finish(halted)
+        self.current_state = compiled.states[state]
+        self._materialize_tape(tape)
+        return turing_outcome(self.current_state.is_final, halted, self.tape, self.head_position, iteration,
+                              return_steps)
+
+    def run_accelerated(self, simulation_input: Union[List[str], str] = '', max_steps=math.inf,
+                        block_size: int = 1) -> AcceleratedRun:
+        """
+        Runs the machine on a run-length encoded tape, skipping whole runs of identical
+        blocks whenever the machine sweeps over them in a single state. The step count
+        stays exact, so this can finish machines that run far too long for `process_input`.
+
+        Args:
+            simulation_input: The input, laid out on the tape like `process_input` does.
+            max_steps: The step budget, `math.inf` for none.
+            block_size (int): Number of cells per block. Machines whose sweeps handle
+                              several cells at a time (k-symbol macro machines) need
+                              matching blocks to be accelerated.
+
+        Returns:
+            AcceleratedRun: The outcome, exact step count and compressed tape of the run.
+        """
+        compiled = self.compile()
+        macro = MacroMachine(compiled, block_size)
+        result = macro.run(simulation_input, compiled.state_index[self.initial_state], max_steps)
+        self.current_state = self.states[result.state]
+        return result
+
+    def decide_halting(self, simulation_input: Union[List[str], str] = '', max_steps=1000,
+                       max_tape=None, backward_depth: int = 8) -> Decision:
+        """
+        Runs the machine like `process_input`, but tells apart runs that provably never
+        halt from runs that only need more time. Exact configuration cycles, translated
+        cyclers and (via backward reasoning from missing transitions) machines that can
+        only halt within a few steps of starting are detected and stop the run early.
+
+        Args:
+            simulation_input: The input, laid out on the tape like `process_input` does.
+            max_steps: The step budget, `math.inf` for none.
+            max_tape: Stop undecided once more cells than this have been visited.
+            backward_depth (int): Depth limit for backward reasoning, 0 disables it.
+
+        Returns:
+            Decision: The `RunStatus` of the run (HALTED, LOOPING, UNDECIDED or
+            BUDGET_EXCEEDED), the decider that proved a loop, and the step count. The
+            tape and head position are left in `tape` and `head_position`.
+        """
+        compiled, tape = self.compile().new_tape(simulation_input)
+        decision = decide(compiled, tape, compiled.state_index[self.initial_state],
+                          max_steps, max_tape, backward_depth)
+        self.current_state = compiled.states[decision.state]
+        self._materialize_tape(tape)
+        return decision
+
+    def run_checkpointed(self, checkpoint_path: str, simulation_input: Union[List[str], str] = '',
+                         max_steps=math.inf, checkpoint_every: float = 5.0, deciders: bool = False,
+                         max_tape=None, backward_depth: int = 8) -> Decision:
+        """
+        Runs the machine and writes a checkpoint to `checkpoint_path` every
+        `checkpoint_every` seconds and at the end of the run. An interrupted run can be
+        continued with `resume_checkpointed` and ends exactly like an uninterrupted one.
+
+        Args:
+            checkpoint_path (str): The checkpoint file, replaced atomically on every write.
+            simulation_input: The input, laid out on the tape like `process_input` does.
+            max_steps: The step budget, `math.inf` for none.
+            checkpoint_every (float): Seconds between checkpoints.
+            deciders (bool): Whether to run with the non-halting deciders of `decide_halting`.
+            max_tape: Tape limit for the deciders.
+            backward_depth (int): Depth limit for backward reasoning.
+
+        Returns:
+            Decision: The status of the run and the step count.
+        """
+        compiled, tape = self.compile().new_tape(simulation_input)
+        state = compiled.state_index[self.initial_state]
+        progress = DeciderState.start(compiled, tape, state, backward_depth) if deciders else None
+        decision, tape = checkpoint.run_with_checkpoints(compiled, tape, state, checkpoint_path, max_steps,
+                                                         checkpoint_every, progress, max_tape)
+        self.current_state = compiled.states[decision.state]
+        self._materialize_tape(tape)
+        return decision
+
+    def resume_checkpointed(self, checkpoint_path: str, max_steps=math.inf, checkpoint_every: float = 5.0,
+                            max_tape=None) -> Decision:
+        """
+        Continues a run from a checkpoint written by `run_checkpointed` on this machine.
+
+        Raises:
+            ValueError: If the checkpoint belongs to a different machine.
+        """
+        decision, tape = checkpoint.resume(checkpoint_path, self.compile(), max_steps, checkpoint_every, max_tape)
+        self.current_state = self.compile().states[decision.state]
+        self._materialize_tape(tape)
+        return decision
 
-        iteration = 0
-        while True:
-            if iteration > max_iterations:
-                return False, self.tape
-            tape_symbol = self.tape[self.head_position]
-            transition = self.current_state.transitions.get(tape_symbol)
-            if not transition:
-                if return_steps:
-                    if self.current_state.is_final:
-                        return self.current_state.is_final, self.tape, iteration
-                    else:
-                        return self.current_state.is_final, self.tape, self.head_position
-                if self.current_state.is_final:
-                    return self.current_state.is_final, self.tape
-                else:
-                    return self.current_state.is_final, self.tape, self.head_position
-
-            self.tape[self.head_position] = transition.tape_write
-            self.head_position += 1 if transition.move == 'R' else -1 if transition.move == 'L' else 0
-
-            if self.head_position < 0:
-                self.tape.insert(0, self.blank_symbol)
-                self.head_position = 0
-            elif self.head_position >= len(self.tape):
-                self.tape.append(self.blank_symbol)
-
-            self.current_state = transition.target
-            iteration += 1
+    def _materialize_tape(self, tape: Tape) -> List[str]:
+        """Publishes the final tape as a list of symbols, only done once per run."""
+        self.tape = tape.to_list()
+        self.head_position = tape.head_offset
+        return self.tape
 
 
 class MultiStackPDA(Automaton):
+    """
+    Represents a pushdown automaton with several stacks.
+
+    Every transition reads an input symbol (or '' for an epsilon transition) and, for
+    every stack, either requires a symbol on top of that stack, which is popped, or
+    leaves the stack alone (stack symbol None). Symbols can be pushed onto any stack.
+    With two stacks the model is as powerful as a Turing machine.
+
+    Attributes:
+        initial_stacks (List[List[str]]): The contents of every stack at the start, bottom first.
+        deterministic (bool): If True, at most one transition may apply in every
+                              configuration and a single run is simulated. Otherwise
+                              all runs are explored.
+        require_empty_stack (bool): If True, every stack must contain only its bottom
+                                    marker for a string to be accepted.
+    """
     def __init__(self, stack_amount=2, name='Multi-Stack PDA', deterministic=True, initial_stacks: List[List[str]]=None, description='', require_empty_stack=False):
         super().__init__(name, description, 'MSPDA')
         if initial_stacks is None:
@@ -674,11 +968,399 @@ class MultiStackPDA(Automaton):
         self.stack_names = [f"stack_{i}" for i in range(stack_amount)]
         if not self.deterministic:
             self.current_state = None
+        self.current_states: Set[Tuple[State, Tuple[Tuple[str, ...], ...]]] = set()
         self.require_empty_stack = require_empty_stack
 
+    def add_transition(self, source: str, target: str, symbol: Union[str, List[str]],
+                       stack_symbols: Union[List[Union[str, None]], dict],
+                       stack_pushes: Union[List[List[str]], dict], by=By.NAME) -> None:
+        """
+        Adds a transition to the multi-stack PDA.
+
+        Args:
+            source (str): The name or ID of the source state.
+            target (str): The name or ID of the target state.
+            symbol (str): The input symbol, or a list of input symbols. Use '' for an
+                          epsilon (ε) transition.
+            stack_symbols: The symbol required on top of every stack, as a list in stack
+                           order or a dict keyed by stack name. None (or a missing key)
+                           leaves that stack untouched apart from pushes.
+            stack_pushes: The symbols pushed onto every stack, as a list of lists in stack
+                          order or a dict keyed by stack name. As for the other PDAs, the
+                          first symbol of a list ends up on top.
+            by (By, optional): The attribute to identify states by. Defaults to By.NAME.
+
+        Example:
+            # On 'a', push 'A' onto the first stack and leave the second one alone
+            mspda.add_transition('q0', 'q0', 'a', ['|', None], [['A', '|'], []])
+        """
+        stack_symbols = self._per_stack(stack_symbols, None)
+        stack_pushes = self._per_stack(stack_pushes, [])
+        if any(stack_symbol == "" for stack_symbol in stack_symbols):
+            raise ValueError("Empty stack symbol not allowed in PDA transitions, use None to skip a stack")
+
+        for sym in (symbol if isinstance(symbol, list) else [symbol]):
+            self._add_single_transition(source, target, sym, stack_symbols, stack_pushes, by)
+
+    def _per_stack(self, values, default) -> list:
+        if isinstance(values, dict):
+            unknown = set(values) - set(self.stack_names)
+            if unknown:
+                raise ValueError(f"Unknown stack names: {', '.join(sorted(unknown))}")
+            return [values.get(name, default) for name in self.stack_names]
+        if len(values) != self.stack_amount:
+            raise ValueError(f"Expected one entry per stack ({self.stack_amount}), got {len(values)}")
+        return list(values)
+
+    def _add_single_transition(self, source: str, target: str, symbol: str, stack_symbols: List[Union[str, None]],
+                               stack_pushes: List[List[str]], by=By.NAME) -> None:
+        if symbol not in self.alphabet and symbol != "":
+            self.alphabet.add(symbol)
+
+        source_state, target_state = self._get_source_and_target(by, source, target)
+
+        for stack_symbol, stack_push in zip(stack_symbols, stack_pushes):
+            if stack_symbol is not None:
+                self.stack_alphabet.add(stack_symbol)
+            self.stack_alphabet.update(stack_push)
+
+        stack_operations = {name: (stack_symbol, list(stack_push))
+                            for name, stack_symbol, stack_push in zip(self.stack_names, stack_symbols, stack_pushes)}
+        transition = MultiStackPDATransition(symbol, source_state, target_state, stack_operations)
+
+        key = (symbol, tuple(stack_symbols))
+        if self.deterministic and key in source_state.transitions:
+            raise ValueError(f"Duplicate transition for input '{symbol}' and stack symbols {list(stack_symbols)}")
+        source_state.transitions.setdefault(key, []).append(transition)
+        source_state.used_symbols.add(symbol)
+        self._compiled = None
+
+    def compile(self) -> CompiledMultiStackPDA:
+        """
+        Returns the transition tables used by `process_input`, indexed by
+        (state, input symbol, tuple of stack tops). The tables are cached and rebuilt
+        automatically after states or transitions are added.
+
+        Raises:
+            ValueError: If the automaton is deterministic but more than one transition
+                        applies in some configuration.
+        """
+        if self._compiled is None:
+            self._compiled = CompiledMultiStackPDA(self)
+        return self._compiled
+
+    def process_input(self, simulation_input: str, require_empty_stack=None, max_steps=None) -> bool:
+        """
+        Process an input string and return whether it's accepted
+
+        Args:
+            simulation_input: String to process
+            require_empty_stack: Override default empty stack requirement
+            max_steps: Maximum number of transitions to apply. The input is rejected
+                       if the budget runs out. Defaults to no limit.
+        """
+        return run_to_completion(self._run_chunks(simulation_input, max_steps,
+                                                  require_empty_stack=require_empty_stack))
+
+    def _run_chunks(self, simulation_input: str, step_budget=None, chunk_steps=None, require_empty_stack=None,
+                    max_steps=None):
+        """
+        The simulation behind `process_input`, with `step_budget` as `max_steps` (if both
+        are given, the smaller one applies).
+        """
+        step_budget = tighter_budget(step_budget, max_steps)
+        check_empty_stack = (require_empty_stack
+                             if require_empty_stack is not None
+                             else self.require_empty_stack)
+        compiled = self.compile()
+        initial_state = compiled.state_index[self.initial_state]
+
+        if self.deterministic:
+            stacks = compiled.new_stacks(self.initial_stacks)
+            state, consumed, exhausted = yield from compiled.iter_deterministic(
+                initial_state, stacks, simulation_input, self.alphabet, step_budget, chunk_steps)
+            self.current_state = compiled.states[state]
+            self.stacks = [[compiled.stack_symbols[code] for code in stack] for stack in stacks]
+            configurations = [(self.current_state, tuple(tuple(stack) for stack in self.stacks))]
+        else:
+            reached, stacks, consumed, exhausted = yield from compiled.iter_nondeterministic(
+                initial_state, self.initial_stacks, simulation_input, self.alphabet, step_budget, chunk_steps)
+            symbols = compiled.stack_symbols
+            configurations = [
+                (compiled.states[state],
+                 tuple(tuple(symbols[code] for code in stacks.to_symbols(stack_id)) for stack_id in stack_ids))
+                for state, stack_ids in reached
+            ]
+            self.current_states = set(configurations)
+
+        if exhausted or consumed < len(simulation_input):
+            return False
+
+        acceptance = any(
+            state.is_final and (not check_empty_stack or all(len(stack) == 1 for stack in stacks))
+            for state, stacks in configurations
+        )
+
+        self.output[simulation_input] = {
+            "states": [state.name for state, _ in configurations],
+            "accepted": acceptance
+        }
+        return acceptance
+
 class MultiTapeTuring(Automaton):
-    def __init__(self, name='Multi-Tape Turing Machine', description='', blank_symbol='|'):
+    """
+    Represents a Turing machine with several tapes, each with its own head.
+
+    A transition reads one symbol from every tape, writes one symbol to every tape and
+    moves every head independently. The input is written to the first tape, the other
+    tapes start out blank.
+
+    Attributes:
+        tape_count (int): The number of tapes.
+        tapes (List[List[str]]): The visited cells of every tape after a run.
+        head_positions (List[int]): The head position on every tape, as an index into
+                                    the corresponding list in `tapes`.
+    """
+    def __init__(self, name='Multi-Tape Turing Machine', description='', blank_symbol='|', tape_count=2):
         super().__init__(name, description, 'Multi-Tape Turing')
+        if tape_count < 1:
+            raise ValueError("A multi-tape Turing machine needs at least one tape")
+        self.tape_count = tape_count
         self.tapes = []
         self.head_positions = [1]
-        self.blank_symbol = blank_symbol
\ No newline at end of file
+        self.blank_symbol = blank_symbol
+
+    def add_transition(self, source: str, target: str, tape_symbols: Union[List[str], Tuple[str, ...]],
+                       tape_writes: Union[List[str], Tuple[str, ...]], moves: Union[str, List[str]],
+                       by=By.NAME) -> None:
+        """
+        Adds a transition.
+
+        Args:
+            source (str): The name or ID of the source state.
+            target (str): The name or ID of the target state.
+            tape_symbols: The symbol to read on every tape.
+            tape_writes: The symbol to write on every tape.
+            moves: The move of every head ('L', 'R' or 'N'), as a list or a string like "RN".
+            by (By, optional): The attribute to use for identifying states. Defaults to By.NAME.
+
+        Raises:
+            ValueError: If an argument does not have one entry per tape, or there already
+                        is a transition for these symbols.
+        """
+        tape_symbols, tape_writes, moves = tuple(tape_symbols), tuple(tape_writes), tuple(moves)
+        for values in (tape_symbols, tape_writes, moves):
+            if len(values) != self.tape_count:
+                raise ValueError(f"Expected one entry per tape ({self.tape_count}), got {len(values)}")
+
+        self.stack_alphabet.update(symbol for symbol in tape_symbols + tape_writes if symbol != "")
+
+        source_state, target_state = self._get_source_and_target(by, source, target)
+
+        if tape_symbols in source_state.transitions:
+            raise ValueError(f"Duplicate transition for tape symbols {list(tape_symbols)}")
+
+        transition = MultiTapeTuringTransition(source_state, target_state, tape_symbols, tape_writes, moves)
+
+        source_state.transitions[tape_symbols] = transition
+        source_state.used_symbols.add(tape_symbols)
+        self._compiled = None
+
+    def compile(self) -> CompiledMultiTapeTuring:
+        """
+        Returns the transition table `process_input` runs on, indexed by the state and the
+        symbols under all heads packed into one integer. The table is cached and rebuilt
+        automatically after states or transitions are added or the blank symbol changes.
+        """
+        if self._compiled is None or self._compiled.blank != self.blank_symbol:
+            self._compiled = CompiledMultiTapeTuring.from_machine(self)
+        return self._compiled
+
+    def process_input(
+            self,
+            simulation_input: Union[List[str], str],
+            max_iterations=1000,
+            return_steps=False
+    ) -> Union[tuple[bool, list[list[str]]], tuple[bool, list[list[str]], int]]:
+        """
+        Runs the machine on an input written to the first tape.
+
+        Args:
+            simulation_input: The input symbols.
+            max_iterations (int): The step budget, like `Turing.process_input`.
+            return_steps (bool): Whether to also return the number of steps taken.
+
+        Returns:
+            tuple: Whether the machine halted in a final state and the visited cells of
+            every tape, plus the step count if `return_steps` is set. A run that exceeds
+            the budget returns False.
+        """
+        return run_to_completion(self._run_chunks(simulation_input, max_iterations, return_steps=return_steps))
+
+    def _run_chunks(self, simulation_input: Union[List[str], str], step_budget=None, chunk_steps=None,
+                    return_steps=False, max_iterations=None):
+        """
+        The simulation behind `process_input`, with `step_budget` as `max_iterations`
+        (if both are given, the smaller one applies).
+        """
+        step_budget = tighter_budget(step_budget, max_iterations)
+        compiled, tapes = self.compile().new_tapes(simulation_input)
+
+        # Same budget as the single-tape process_input
+        budget = math.inf if step_budget is None else step_budget + 1
+        state, steps, halted = yield from stepped_in_chunks(
+            lambda current, count: compiled.run(tapes, current, count),
+            compiled.state_index[self.initial_state], budget, chunk_steps)
+        self.current_state = compiled.states[state]
+        self.tapes = [tape.to_list() for tape in tapes]
+        self.head_positions = [tape.head_offset for tape in tapes]
+
+        accepted = halted and self.current_state.is_final
+        if return_steps:
+            return accepted, self.tapes, steps
+        return accepted, self.tapes
+
+
+class NTM(Automaton):
+    """
+    Represents a nondeterministic single-tape Turing machine.
+
+    Unlike `Turing`, a state may have several transitions for the same tape symbol. The
+    input is accepted if some run halts in a final state. Runs are explored breadth
+    first or by iterative deepening, with duplicate configurations pruned, see
+    `automata.simulation.ntm`.
+
+    Attributes:
+        tape (List[str]): The tape of the accepting run after a run, empty on rejection.
+        head_position (int): The head position of the accepting run, as an index into `tape`.
+    """
+    def __init__(self, name='Nondeterministic Turing Machine', description='', blank_symbol='|'):
+        super().__init__(name, description, 'NTM')
+        self.deterministic = False
+        self.tape = []
+        self.head_position = 1
+        self.blank_symbol = blank_symbol
+
+    def add_transition(self, source: str, target: str, tape_symbol: Union[str, List[str]],
+                       tape_write: Union[str, List[str]], move: str, by=By.NAME,
+                       mapping_type: MappingType=MappingType.ONE_TO_ONE) -> None:
+        if isinstance(tape_symbol, list) and isinstance(tape_write, list):
+            if mapping_type == MappingType.ALL_TO_ALL:
+                for sym in tape_symbol:
+                    for write in tape_write:
+                        self._add_single_transition(source, target, sym, write, move, by)
+            elif mapping_type == MappingType.ONE_TO_ONE:
+                if len(tape_symbol) != len(tape_write):
+                    raise ValueError("tape_symbol and tape_write lists must be of the same length for ONE_TO_ONE mapping")
+                for sym, write in zip(tape_symbol, tape_write):
+                    self._add_single_transition(source, target, sym, write, move, by)
+        else:
+            if not isinstance(tape_symbol, list):
+                tape_symbol = [tape_symbol]
+            if not isinstance(tape_write, list):
+                tape_write = [tape_write]
+
+            for sym in tape_symbol:
+                for write in tape_write:
+                    self._add_single_transition(source, target, sym, write, move, by)
+
+    def _add_single_transition(self, source: str, target: str, tape_symbol: str,
+                               tape_write: str, move: str, by=By.NAME) -> None:
+        if tape_symbol != "":
+            self.stack_alphabet.add(tape_symbol)
+        if tape_write != "":
+            self.stack_alphabet.add(tape_write)
+
+        source_state, target_state = self._get_source_and_target(by, source, target)
+
+        transition = TuringTransition(source_state, target_state, tape_symbol, tape_write, move)
+
+        if tape_symbol not in source_state.transitions:
+            source_state.transitions[tape_symbol] = []
+        source_state.transitions[tape_symbol].append(transition)
+        source_state.used_symbols.add(tape_symbol)
+        self._compiled = None
+
+    def compile(self) -> CompiledNTM:
+        """
+        Returns the transition table `process_input` explores, with all moves for a
+        (state, symbol) pair in one entry. The table is cached and rebuilt automatically
+        after states or transitions are added or the blank symbol changes.
+        """
+        if self._compiled is None or self._compiled.blank != self.blank_symbol:
+            self._compiled = CompiledNTM(self)
+        return self._compiled
+
+    def loop_right(self, source: str, tape_symbol: Union[list[str], str], by=By.NAME):
+        self.add_transition(source, source, tape_symbol, tape_symbol, 'R', by)
+
+    def loop_left(self, source: str, tape_symbol: Union[list[str], str], by=By.NAME):
+        self.add_transition(source, source, tape_symbol, tape_symbol, 'L', by)
+
+    def process_input(self, simulation_input: Union[List[str], str], max_iterations=1000,
+                      strategy="bfs", max_configurations=None,
+                      return_steps=False) -> Union[tuple[bool, list[str]], tuple[bool, list[str], int]]:
+        """
+        Explores the runs of the machine on an input.
+
+        Args:
+            simulation_input: The input, laid out on the tape like `Turing.process_input` does.
+            max_iterations (int, optional): Maximum length of the runs explored, None for no limit.
+            strategy (str): "bfs" to explore breadth first, or "iddfs" for iterative
+                            deepening, which keeps only the current run and a bounded
+                            number of configurations but explores short runs repeatedly.
+                            Both find a shortest accepting run.
+            max_configurations (int, optional): With "bfs", stop after keeping this many
+                                                configurations. With "iddfs", the number
+                                                of configurations remembered to prune
+                                                repeated ones.
+            return_steps (bool): Also return the length of the accepting run.
+
+        Returns:
+            Whether the input was accepted and the tape of the accepting run (empty on
+            rejection), plus the run length if `return_steps` is set. Details of the
+            exploration are stored in `output[simulation_input]`.
+
+        Raises:
+            ValueError: If the strategy is unknown.
+        """
+        return run_to_completion(self._run_chunks(simulation_input, strategy=strategy,
+                                                  max_configurations=max_configurations,
+                                                  return_steps=return_steps, max_iterations=max_iterations))
+
+    def _run_chunks(self, simulation_input: Union[List[str], str], step_budget=None, chunk_steps=None,
+                    strategy="bfs", max_configurations=None, return_steps=False, max_iterations=None):
+        """
+        The simulation behind `process_input`, counting explored configurations as steps:
+        `step_budget` limits the configurations explored, as for `NPDA`, while
+        `max_iterations` limits the length of the runs explored.
+        """
+        compiled = self.compile()
+        if strategy == "bfs":
+            explore = compiled.breadth_first
+        elif strategy == "iddfs":
+            explore = compiled.iterative_deepening
+        else:
+            raise ValueError(f"Unknown strategy '{strategy}', expected 'bfs' or 'iddfs'")
+
+        store = SegmentStore()
+        start = compiled.initial(simulation_input, compiled.state_index[self.initial_state], store)
+        result = yield from explore(start, store, max_iterations, max_configurations, chunk_steps, step_budget)
+
+        self.tape = []
+        if result.accepted:
+            state, head, base, ids = result.configuration
+            first, last = store.span((base, ids))
+            first, last = min(first, head), max(last, head)
+            self.current_state = compiled.states[state]
+            self.tape = [compiled.symbols[code] for code in store.cells((base, ids), first, last)]
+            self.head_position = head - first
+        self.output[simulation_input] = {
+            "accepted": result.accepted,
+            "explored": result.explored,
+            "exhausted": result.exhausted,
+        }
+
+        if return_steps:
+            return result.accepted, self.tape, result.steps
+        return result.accepted, self.tape
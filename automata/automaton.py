@@ -1,5 +1,8 @@
+from typing import Iterable, Union
+
 from automata.state import By, State, AutomatonState, MooreState
 from automata.transition import Transition, MealyTransition
+from automata.simulation.cooperative import run_cooperatively, run_to_completion
 
 
 class Automaton:
@@ -17,12 +20,55 @@ class Automaton:
         self.inputs = []
         self.deterministic = True
         self.output = {}
+        self._compiled = None  # Cached simulation tables, rebuilt after the automaton changes
+        self._states_by_id = {}  # Index of the states by ID, kept by add_state
 
-        if self.type not in ["DPDA", "NPDA", "Turing"]:
+        if self.type not in ["DPDA", "NPDA", "Turing", "MSPDA", "Multi-Tape Turing", "NTM"]:
             self.add_transition = self._add_transition
 
     def process_input(self, simulation_input):
         print(f"Processing input '{simulation_input}' on automaton '{self.name}'")
+        return run_to_completion(self._run_chunks(simulation_input))
+
+    async def run_async(self, simulation_input, step_budget=None, yield_every=1000, deadline=None,
+                        progress=None, **options):
+        """
+        Runs `process_input` cooperatively in an asyncio event loop, giving other tasks
+        a chance to run every `yield_every` steps. The task can be cancelled at any of
+        those points.
+
+        What counts as a step depends on the automaton: one transition for Turing
+        machines, one explored configuration for nondeterministic pushdown automata
+        and nondeterministic Turing machines (whose run length is limited by the
+        `max_iterations` option), and one consumed input symbol otherwise.
+
+        Args:
+            simulation_input: The input to process.
+            step_budget (int, optional): Stop after this many steps and reject the input
+                                         (Turing machines return like `process_input`
+                                         with `max_iterations=step_budget`). Defaults to
+                                         no limit.
+            yield_every (int): Steps between two chances for other tasks to run.
+            deadline (float, optional): Event loop time (`loop.time()`) at which to stop.
+            progress (Callable[[int], None], optional): Called with the number of steps
+                                                        taken so far whenever the run yields.
+            **options: Further keyword arguments of this automaton's `process_input`.
+                       The budget option of machines whose steps are transitions
+                       (`max_iterations` of Turing machines, `max_steps` of
+                       `MultiStackPDA`) is combined with `step_budget`, the smaller
+                       one applies. Unknown options raise a TypeError.
+
+        Returns:
+            The same as `process_input`.
+
+        Raises:
+            TimeoutError: If the deadline passes before the run finishes.
+        """
+        chunks = self._run_chunks(simulation_input, step_budget, yield_every, **options)
+        return await run_cooperatively(chunks, deadline, progress)
+
+    def _run_chunks(self, simulation_input, step_budget=None, chunk_steps=None):
+        """The simulation behind `process_input`, yielding every `chunk_steps` consumed symbols."""
         if self.type not in ["MOORE", "MEALY"]:
             self.output[simulation_input] = {}
             self.output[simulation_input]["output"] = ""
@@ -30,18 +76,22 @@ class Automaton:
             self.output[simulation_input] = {}
             self.output[simulation_input]["output"] = []
 
-        for symbol in simulation_input:
+        for position, symbol in enumerate(simulation_input):
+            if step_budget is not None and position >= step_budget:
+                return False
+            if chunk_steps and position and position % chunk_steps == 0:
+                yield position
             if self.type == "MOORE":
                 if self.current_state.output:
                     self.output[simulation_input]["output"].append(self.current_state.output)
             if symbol not in self.alphabet:
                 return False
             transition = self.current_state.transitions.get(symbol)
+            if not transition:
+                return False
             if self.type == "MEALY":
                 if transition.output:
                     self.output[simulation_input]["output"].append(transition.output)
-            if not transition:
-                return False
             self.current_state = transition.target
 
         if self.type == 'DFA':
@@ -64,93 +114,155 @@ class Automaton:
             if output not in self.stack_alphabet:
                 self.stack_alphabet.add(output)
             state = MooreState(name, state_id, output)
-        elif self.type in ["DFA", "NFA", "NPDA", "DPDA", "Turing"]:
+        elif self.type in ["DFA", "NFA", "NPDA", "DPDA", "Turing", "MSPDA", "Multi-Tape Turing", "NTM"]:
             state = AutomatonState(name, state_id, is_final)
         else:
             state = State(name, state_id)
         state.transitions = {}
+        replaced = self.states.get(name)
+        if replaced is not None and self._states_by_id.get(replaced.id) is replaced:
+            del self._states_by_id[replaced.id]
         self.states[name] = state
+        self._states_by_id.setdefault(state_id, state)
+        self._compiled = None
         if not self.initial_state:
             self.initial_state = state
             self.current_state = state
 
+    def add_states(self, states: Iterable[Union[str, tuple, dict]]) -> None:
+        """
+        Adds many states at once.
+
+        Args:
+            states: One entry per state: a name, a tuple of `add_state` arguments
+                    (`(name, state_id, is_final, output)`, trailing ones optional) or a
+                    dict of `add_state` keyword arguments.
+        """
+        add_state = self.add_state
+        for state in states:
+            if isinstance(state, dict):
+                add_state(**state)
+            elif isinstance(state, tuple):
+                add_state(*state)
+            else:
+                add_state(state)
+
+    def _state_by_id(self, identifier):
+        """
+        Looks up a state by its ID in the index kept by `add_state`. States put into
+        `states` directly are found by a scan, and indexed from then on.
+
+        Raises:
+            KeyError: If no state has the ID.
+        """
+        state = self._states_by_id.get(identifier)
+        if state is None or state.id != identifier:
+            state = next((state for state in self.states.values() if state.id == identifier), None)
+            if state is None:
+                raise KeyError(identifier)
+            self._states_by_id[identifier] = state
+        return state
+
     def _get_source_and_target(self, by, source, target):
         if by == By.NAME:
             source_state = self.states[source]
             target_state = self.states[target]
         elif by == By.ID:
-            source_state = next(state for state in self.states.values() if state.id == source)
-            target_state = next(state for state in self.states.values() if state.id == target)
+            source_state = self._state_by_id(source)
+            target_state = self._state_by_id(target)
         else:
             raise ValueError("Invalid value for 'by' parameter")
 
         return source_state, target_state
 
+    def _insert_transition(self, source_state, target_state, symbol, output=None, x=0, y=0):
+        if self.type == "MEALY":
+            if output not in self.stack_alphabet:
+                self.stack_alphabet.add(output)
+            transition = MealyTransition(symbol, source_state, target_state, output, x, y)
+        else:
+            transition = Transition(symbol, source_state, target_state, x, y)
+
+        # For NFAs, store multiple transitions per symbol
+        if self.type == "NFA":
+            if symbol not in source_state.transitions:
+                source_state.transitions[symbol] = []
+            source_state.transitions[symbol].append(transition)
+        else:
+            # For DFAs and other types, keep the original behavior
+            if symbol in source_state.transitions:
+                raise ValueError(f"Duplicate transition found for symbol '{symbol}'")
+            source_state.transitions[symbol] = transition
+
+        source_state.used_symbols.add(symbol)
+
     def _add_transition(self, source, target, symbols, output=None, x=0, y=0, by=By.NAME):
-        if isinstance(symbols, list):
-            for symbol in symbols:
-                if symbol not in self.alphabet:
-                    self.alphabet.add(symbol)
-
-            source_state, target_state = self._get_source_and_target(by, source, target)
-
-            for symbol in symbols:
-                if self.type == "MEALY":
-                    if output not in self.stack_alphabet:
-                        self.stack_alphabet.add(output)
-                    transition = MealyTransition(
-                        symbol=symbol,
-                        source=source_state,
-                        target=target_state,
-                        output=output,
-                        x=x, y=y
-                    )
-                else:
-                    transition = Transition(
-                        symbol=symbol,
-                        source=source_state,
-                        target=target_state,
-                        x=x, y=y
-                    )
-
-                # For NFAs, store multiple transitions per symbol
-                if self.type == "NFA":
-                    if symbol not in source_state.transitions:
-                        source_state.transitions[symbol] = []
-                    source_state.transitions[symbol].append(transition)
-                else:
-                    # For DFAs and other types, keep the original behavior
-                    if symbol in source_state.transitions:
-                        raise ValueError(f"Duplicate transition found for symbol '{symbol}'")
-                    source_state.transitions[symbol] = transition
+        self._compiled = None
+        symbols = symbols if isinstance(symbols, list) else [symbols]
+        for symbol in symbols:
+            if symbol not in self.alphabet:
+                self.alphabet.add(symbol)
+        source_state, target_state = self._get_source_and_target(by, source, target)
+        for symbol in symbols:
+            self._insert_transition(source_state, target_state, symbol, output, x, y)
 
-                source_state.used_symbols.add(symbol)
+    def add_transitions(self, transitions: Iterable[tuple] = (), by=By.NAME, **columns) -> None:
+        """
+        Adds many transitions at once, given as rows or as columns.
 
-        else:
-            if symbols not in self.alphabet:    
-                self.alphabet.add(symbols)
+        Example:
+            dfa.add_transitions([("q0", "q1", "a"), ("q1", "q0", ["a", "b"])])
+            dfa.add_transitions(source=sources, target=targets, symbols=symbols)
 
-            source_state, target_state = self._get_source_and_target(by, source, target)
+        Args:
+            transitions: One tuple of positional `add_transition` arguments per
+                         transition, without `by`.
+            by (By): Whether sources and targets are state names or IDs, for all rows.
+            **columns: Alternatively, one sequence (a list or a NumPy array, for
+                       example) per `add_transition` parameter, all of the same length.
+                       Row `i` is the transition made of the `i`-th elements.
 
-            if self.type == "MEALY":
-                if output not in self.stack_alphabet:
-                    self.stack_alphabet.add(output)
-                transition = MealyTransition(symbols, source_state, target_state, output)
-            else:
-                transition = Transition(symbols, source_state, target_state)
+        Raises:
+            ValueError: If rows and columns are both given or the columns differ in length.
+        """
+        if columns:
+            if transitions:
+                raise ValueError("Give transitions either as rows or as columns, not both")
+            names = list(columns)
+            lengths = {len(column) for column in columns.values()}
+            if len(lengths) > 1:
+                raise ValueError("All transition columns must have the same length")
+            rows = (dict(zip(names, row)) for row in zip(*columns.values()))
+        else:
+            rows = transitions
 
-            # For NFAs, store multiple transitions
-            if self.type == "NFA":
-                if symbols not in source_state.transitions:
-                    source_state.transitions[symbols] = []
-                source_state.transitions[symbols].append(transition)
-            else:
-                # For DFAs and other types, keep original behavior
-                if symbols in source_state.transitions:
-                    raise ValueError(f"Duplicate transition found for symbol '{symbols}'")
-                source_state.transitions[symbols] = transition
+        self._compiled = None
+        if self.add_transition != self._add_transition:
+            # Machines with their own add_transition, which validates each transition
+            for row in rows:
+                if isinstance(row, dict):
+                    self.add_transition(**row, by=by)
+                else:
+                    self.add_transition(*row, by=by)
+            return
 
-            source_state.used_symbols.add(symbols)
+        if by == By.NAME:
+            lookup = self.states.__getitem__
+        elif by == By.ID:
+            lookup = self._state_by_id
+        else:
+            raise ValueError("Invalid value for 'by' parameter")
+        insert = self._insert_transition
+        alphabet = self.alphabet
+        for row in rows:
+            if isinstance(row, dict):
+                row = _transition_row(**row)
+            source, target, symbols = row[:3]
+            source_state, target_state = lookup(source), lookup(target)
+            for symbol in symbols if isinstance(symbols, list) else [symbols]:
+                if symbol not in alphabet:
+                    alphabet.add(symbol)
+                insert(source_state, target_state, symbol, *row[3:])
 
     def add_input(self, simulation_input):
         self.inputs.append(simulation_input)
@@ -159,7 +271,7 @@ class Automaton:
         if by == By.NAME:
             self.initial_state = self.states[identifier]
         elif by == By.ID:
-            self.initial_state = next(state for state in self.states.values() if state.id == identifier)
+            self.initial_state = self._state_by_id(identifier)
         self.current_state = self.initial_state
 
     def check_automaton(self):
@@ -185,4 +297,9 @@ class Automaton:
             missing = self.alphabet - state.used_symbols
             if missing:
                 pass
-        # Logic for completing transitions would go here
\ No newline at end of file
+        # Logic for completing transitions would go here
+
+
+def _transition_row(source, target, symbols, output=None, x=0, y=0) -> tuple:
+    """The row of `add_transitions` for a transition given by keyword."""
+    return source, target, symbols, output, x, y
@@ -0,0 +1,284 @@
+"""
+Constructions on Mealy and Moore machines: composition of cascaded Mealy machines,
+minimization, and conversion between the two kinds of machine.
+
+All of them work on the integer tables of `CompiledTransducer` and build a new machine,
+the input machines are left unchanged. Only states reachable from the initial state are
+built.
+"""
+
+from collections import deque
+from typing import Dict, List, Tuple
+
+from automata.automata_classes import MEALY, MOORE, Transducer
+from automata.simulation.transducer import CompiledTransducer, MISSING, NO_OUTPUT
+
+
+def _reachable(compiled: CompiledTransducer, initial: int) -> List[int]:
+    """The indices of the states reachable from `initial`, in breadth-first order."""
+    row_size = len(compiled.symbols)
+    order = [initial]
+    seen = {initial}
+    for state in order:
+        for target in compiled.next_state[state * row_size:(state + 1) * row_size]:
+            if target != MISSING and target not in seen:
+                seen.add(target)
+                order.append(target)
+    return order
+
+
+def compose_mealy(*machines: MEALY, minimize: bool = False, name: str = None) -> MEALY:
+    """
+    Composes a cascade of Mealy machines into one machine, in which each symbol costs a
+    single transition. Every machine consumes the outputs of the one before it, so
+    `compose_mealy(a, b)` transduces like feeding the outputs of `a` into `b`.
+
+    A transition without an output does not feed the next machine, which stays in its
+    state. A composed transition is missing if any machine it passes through has no
+    transition for its input. The states of the composed machine are the reachable
+    tuples of states, named like "(q0, p1)".
+
+    Args:
+        *machines (MEALY): The cascade, first stage first.
+        minimize (bool): Minimize the composed machine with `minimize_mealy`.
+        name (str, optional): Name of the composed machine.
+
+    Returns:
+        MEALY: The composed machine.
+
+    Raises:
+        ValueError: If no machine is given or a machine has no initial state.
+    """
+    if not machines:
+        raise ValueError("Composition needs at least one machine")
+    if any(machine.initial_state is None for machine in machines):
+        raise ValueError("Every machine in a composition needs an initial state")
+
+    tables = [machine.compile() for machine in machines]
+    initial = tuple(table.state_index[machine.initial_state] for machine, table in zip(machines, tables))
+    symbols = tables[0].symbols
+
+    def state_name(states: Tuple[int, ...]) -> str:
+        return "(" + ", ".join(table.states[state].name for table, state in zip(tables, states)) + ")"
+
+    def step(states: Tuple[int, ...], symbol) -> Tuple[Tuple[int, ...], object]:
+        """The target tuple and output of a composed transition, or None if it is missing."""
+        targets = list(states)
+        value = symbol
+        for stage, table in enumerate(tables):
+            code = table.codes.get(value)
+            if code is None:
+                return None
+            cell = states[stage] * len(table.symbols) + code
+            target = table.next_state[cell]
+            if target == MISSING:
+                return None
+            targets[stage] = target
+            output = table.output[cell]
+            if output == NO_OUTPUT:
+                return tuple(targets), None
+            value = table.outputs[output]
+        return tuple(targets), value
+
+    composed = MEALY(name or " -> ".join(machine.name for machine in machines))
+    composed.alphabet = set(symbols)
+    composed.add_state(state_name(initial))
+    names = {initial: state_name(initial)}
+    pending = deque([initial])
+    while pending:
+        states = pending.popleft()
+        for symbol in symbols:
+            result = step(states, symbol)
+            if result is None:
+                continue
+            targets, output = result
+            if targets not in names:
+                names[targets] = state_name(targets)
+                composed.add_state(names[targets])
+                pending.append(targets)
+            composed.add_transition(names[states], names[targets], symbol, output)
+
+    return minimize_mealy(composed) if minimize else composed
+
+
+def _refine(compiled: CompiledTransducer, states: List[int], signature) -> Dict[int, int]:
+    """
+    Partition refinement: starts from the blocks of states with equal `signature` and
+    splits blocks until all states in a block move to the same blocks on every symbol.
+
+    Returns:
+        Dict[int, int]: The block of every state, numbered in order of first appearance.
+    """
+    row_size = len(compiled.symbols)
+    next_state = compiled.next_state
+
+    def numbered(keys: Dict[int, object]) -> Dict[int, int]:
+        numbers: Dict[object, int] = {}
+        return {state: numbers.setdefault(keys[state], len(numbers)) for state in states}
+
+    block = numbered({state: signature(state) for state in states})
+    while True:
+        keys = {
+            state: (block[state],) + tuple(
+                MISSING if target == MISSING else block[target]
+                for target in next_state[state * row_size:(state + 1) * row_size]
+            )
+            for state in states
+        }
+        refined = numbered(keys)
+        if len(set(refined.values())) == len(set(block.values())):
+            return refined
+        block = refined
+
+
+def _output(compiled: CompiledTransducer, code: int):
+    return None if code == NO_OUTPUT else compiled.outputs[code]
+
+
+def _minimized(machine: Transducer, signature, name: str = None) -> Transducer:
+    """
+    Builds the quotient of `machine` by the blocks `_refine` finds for `signature`,
+    with every block named after its first state.
+    """
+    if machine.initial_state is None:
+        raise ValueError("Cannot minimize a machine without an initial state")
+    compiled = machine.compile()
+    row_size = len(compiled.symbols)
+    states = _reachable(compiled, compiled.state_index[machine.initial_state])
+    block = _refine(compiled, states, lambda state: signature(compiled, state))
+
+    representatives: Dict[int, int] = {}
+    for state in states:
+        representatives.setdefault(block[state], state)
+
+    minimal = type(machine)(name or machine.name, machine.description, machine.allow_partial)
+    minimal.alphabet = set(machine.alphabet)
+    minimal.stack_alphabet = set(machine.stack_alphabet)
+    for state in representatives.values():
+        if compiled.moore:
+            minimal.add_state(compiled.states[state].name, output=_output(compiled, compiled.state_output[state]))
+        else:
+            minimal.add_state(compiled.states[state].name)
+    for state in representatives.values():
+        for code, symbol in enumerate(compiled.symbols):
+            cell = state * row_size + code
+            target = compiled.next_state[cell]
+            if target == MISSING:
+                continue
+            minimal.add_transition(compiled.states[state].name,
+                                   compiled.states[representatives[block[target]]].name, symbol,
+                                   None if compiled.moore else _output(compiled, compiled.output[cell]))
+    return minimal
+
+
+def _row(compiled: CompiledTransducer, state: int) -> slice:
+    row_size = len(compiled.symbols)
+    return slice(state * row_size, (state + 1) * row_size)
+
+
+def minimize_mealy(machine: MEALY, name: str = None) -> MEALY:
+    """
+    Returns the minimal Mealy machine transducing like `machine`: unreachable states
+    are dropped and states that produce the same outputs for every input are merged.
+    Each state of the result is named after the first state of its block.
+
+    Raises:
+        ValueError: If the machine has no initial state.
+    """
+    def outputs(compiled: CompiledTransducer, state: int) -> Tuple:
+        """The output of every transition of a state, and which transitions are missing."""
+        row = _row(compiled, state)
+        return tuple(compiled.output[row]), tuple(target == MISSING for target in compiled.next_state[row])
+
+    return _minimized(machine, outputs, name)
+
+
+def minimize_moore(machine: MOORE, name: str = None) -> MOORE:
+    """
+    Returns the minimal Moore machine transducing like `machine`, see `minimize_mealy`.
+    States are only merged if they have the same output.
+
+    Raises:
+        ValueError: If the machine has no initial state.
+    """
+    def output(compiled: CompiledTransducer, state: int) -> Tuple:
+        """The output of a state, and which of its transitions are missing."""
+        return (compiled.state_output[state],
+                tuple(target == MISSING for target in compiled.next_state[_row(compiled, state)]))
+
+    return _minimized(machine, output, name)
+
+
+def moore_to_mealy(machine: MOORE, name: str = None) -> MEALY:
+    """
+    Converts a Moore machine into a Mealy machine with the same states, in which every
+    transition outputs the output of its target state.
+
+    The Mealy machine produces the same outputs for every input, except for the output
+    of the initial state that a Moore machine emits before reading the first symbol.
+
+    Raises:
+        ValueError: If the machine has no initial state.
+    """
+    if machine.initial_state is None:
+        raise ValueError("Cannot convert a machine without an initial state")
+    compiled = machine.compile()
+    row_size = len(compiled.symbols)
+    mealy = MEALY(name or machine.name, machine.description, machine.allow_partial)
+    mealy.alphabet = set(machine.alphabet)
+    states = _reachable(compiled, compiled.state_index[machine.initial_state])
+    for state in states:
+        mealy.add_state(compiled.states[state].name)
+    for state in states:
+        for code, symbol in enumerate(compiled.symbols):
+            cell = state * row_size + code
+            target = compiled.next_state[cell]
+            if target != MISSING:
+                mealy.add_transition(compiled.states[state].name, compiled.states[target].name, symbol,
+                                     _output(compiled, compiled.output[cell]))
+    return mealy
+
+
+def mealy_to_moore(machine: MEALY, name: str = None) -> MOORE:
+    """
+    Converts a Mealy machine into a Moore machine that produces the same outputs for
+    every input.
+
+    Every state of the Mealy machine is split by the output of the transition it was
+    entered with: the state `q` entered with output `x` becomes the Moore state "q/x"
+    with output `x`, and transitions without an output lead to the state named "q",
+    without an output. The initial state has no output, so the Moore machine emits
+    nothing before the first symbol either.
+
+    Raises:
+        ValueError: If the machine has no initial state.
+    """
+    if machine.initial_state is None:
+        raise ValueError("Cannot convert a machine without an initial state")
+    compiled = machine.compile()
+    row_size = len(compiled.symbols)
+
+    def state_name(state: int, output: int) -> str:
+        name = compiled.states[state].name
+        return name if output == NO_OUTPUT else f"{name}/{compiled.outputs[output]}"
+
+    moore = MOORE(name or machine.name, machine.description, machine.allow_partial)
+    moore.alphabet = set(machine.alphabet)
+    initial = (compiled.state_index[machine.initial_state], NO_OUTPUT)
+    names = {initial: state_name(*initial)}
+    moore.add_state(names[initial], output=None)
+    pending = deque([initial])
+    while pending:
+        source = pending.popleft()
+        state = source[0]
+        for code, symbol in enumerate(compiled.symbols):
+            cell = state * row_size + code
+            target = (compiled.next_state[cell], compiled.output[cell])
+            if target[0] == MISSING:
+                continue
+            if target not in names:
+                names[target] = state_name(*target)
+                moore.add_state(names[target], output=_output(compiled, target[1]))
+                pending.append(target)
+            moore.add_transition(names[source], names[target], symbol)
+    return moore
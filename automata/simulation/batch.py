@@ -0,0 +1,195 @@
+"""
+Lockstep simulation of many small single-tape Turing machines with NumPy.
+
+The transition tables of all machines are stacked into one table, with every machine's
+states offset into a shared row space, and every machine gets a row of a 2D tape array.
+A step of the whole batch is a handful of array operations: gather the symbols under the
+heads, look up the transitions, scatter the written symbols and move the heads. Machines
+that halt are dropped from the set of running machines, so later steps only touch the
+machines still running.
+
+NumPy is an optional dependency and only imported when a batch is created.
+"""
+
+from typing import List, Sequence, Union
+
+from automata.simulation.turing import HALT
+
+GROW_MARGIN = 64  # Minimum number of blank cells added on either side of the tapes
+
+
+def _numpy():
+    try:
+        import numpy
+    except ImportError as error:
+        raise ImportError("Batch simulation of Turing machines requires NumPy, install it with "
+                          "'pip install numpy'") from error
+    return numpy
+
+
+class BatchResult:
+    """
+    Outcome of a batch run, one entry per machine in every array.
+
+    Attributes:
+        halted (numpy.ndarray): Whether the machine halted within the step budget.
+        states (numpy.ndarray): Index of the state each machine ended in.
+        steps (numpy.ndarray): Steps taken by each machine.
+        accepted (numpy.ndarray): Whether the machine halted in a final state.
+    """
+
+    def __init__(self, batch: 'BatchTuring', halted, rows, steps, tapes, heads, lo, hi):
+        numpy = _numpy()
+        self.batch = batch
+        self.halted = halted
+        self.states = rows - batch.state_offsets
+        self.steps = steps
+        final = numpy.array([final for machine in batch.machines for final in machine.final] or [False])
+        self.accepted = halted & final[rows]
+        self._tapes = tapes
+        self._heads = heads
+        self._lo = lo
+        self._hi = hi
+
+    def __len__(self):
+        return len(self.halted)
+
+    def tape(self, index: int) -> List[str]:
+        """The visited cells of a machine's tape, in the layout `Turing.process_input` returns."""
+        symbols = self.batch.machines[index].symbols
+        return [symbols[code] for code in self._tapes[index, self._lo[index]:self._hi[index] + 1].tolist()]
+
+    def head_position(self, index: int) -> int:
+        """The head position of a machine as an index into `tape(index)`."""
+        return int(self._heads[index] - self._lo[index])
+
+    def count(self, symbol: str):
+        """Counts the cells holding `symbol` on every machine's visited tape, as an array."""
+        numpy = _numpy()
+        machines = self.batch.machines
+        codes = numpy.array([machine.codes.get(symbol, -1) for machine in machines])
+        columns = numpy.arange(self._tapes.shape[1])
+        visited = (columns >= self._lo[:, None]) & (columns <= self._hi[:, None])
+        return ((self._tapes == codes[:, None]) & visited).sum(axis=1)
+
+
+class BatchTuring:
+    """
+    Many compiled Turing machines sharing one stacked transition table.
+
+    Attributes:
+        machines (List[CompiledTuring]): The machines, position in the list is the
+                                         machine's index in every result array.
+        state_offsets (numpy.ndarray): Row of every machine's first state in the table.
+        width (int): Row length of the stacked tables, the largest symbol count.
+    """
+
+    def __init__(self, machines: Sequence):
+        """
+        Initializes a batch.
+
+        Args:
+            machines (Sequence): `Turing` machines or anything with a `compile()` method
+                                 returning a `CompiledTuring`.
+        """
+        numpy = _numpy()
+        self.machines = [machine.compile() for machine in machines]
+        self.initial_states = numpy.array([self._initial_state(machine) for machine in machines],
+                                          dtype=numpy.int64)
+        self._build()
+
+    @staticmethod
+    def _initial_state(machine) -> int:
+        initial = getattr(machine, "initial_state", None)
+        if initial is None:
+            return 0
+        return machine.compile().state_index[initial]
+
+    def _build(self) -> None:
+        numpy = _numpy()
+        machines = self.machines
+        self.width = max((machine.symbol_count for machine in machines), default=1)
+        sizes = [len(machine.states) for machine in machines]
+        self.state_offsets = numpy.cumsum([0] + sizes[:-1]).astype(numpy.int64) if machines \
+            else numpy.zeros(0, dtype=numpy.int64)
+
+        rows = sum(sizes)
+        next_state = numpy.full((max(rows, 1), self.width), HALT, dtype=numpy.int64)
+        write = numpy.zeros((max(rows, 1), self.width), dtype=numpy.uint8)
+        move = numpy.zeros((max(rows, 1), self.width), dtype=numpy.int64)
+        for machine, offset in zip(machines, self.state_offsets.tolist()):
+            count, symbol_count = len(machine.states), machine.symbol_count
+            targets = numpy.array(machine.next_state, dtype=numpy.int64).reshape(count, symbol_count)
+            next_state[offset:offset + count, :symbol_count] = numpy.where(targets == HALT, HALT, targets + offset)
+            write[offset:offset + count, :symbol_count] = numpy.array(
+                machine.write, dtype=numpy.uint8).reshape(count, symbol_count)
+            move[offset:offset + count, :symbol_count] = numpy.array(
+                machine.move, dtype=numpy.int64).reshape(count, symbol_count)
+        self.next_state = next_state.ravel()
+        self.write = write.ravel()
+        self.move = move.ravel()
+
+    def run(self, simulation_input: Union[List[str], str] = '', max_steps: int = 1000) -> BatchResult:
+        """
+        Runs every machine on the same input, laid out like `Turing.process_input` does,
+        for at most `max_steps` steps each.
+
+        Returns:
+            BatchResult: Status, steps and final tapes of all machines.
+        """
+        numpy = _numpy()
+        simulation_input = list(simulation_input)
+        count = len(self.machines)
+
+        # Input symbols the machines do not know extend their tables, like process_input does
+        extended = [machine.new_tape(simulation_input)[0] for machine in self.machines]
+        if any(new is not old for new, old in zip(extended, self.machines)):
+            self.machines = extended
+            self._build()
+
+        length = len(simulation_input) + 2
+        width = length + 2 * GROW_MARGIN
+        tapes = numpy.zeros((count, width), dtype=numpy.uint8)
+        for index, machine in enumerate(self.machines):
+            codes = machine.codes
+            tapes[index, GROW_MARGIN + 1:GROW_MARGIN + 1 + len(simulation_input)] = \
+                [codes[symbol] for symbol in simulation_input]
+        heads = numpy.full(count, GROW_MARGIN + 1, dtype=numpy.int64)
+        lo = numpy.full(count, GROW_MARGIN, dtype=numpy.int64)
+        hi = numpy.full(count, GROW_MARGIN + length - 1, dtype=numpy.int64)
+        rows = self.state_offsets + self.initial_states
+        steps = numpy.zeros(count, dtype=numpy.int64)
+        halted = numpy.zeros(count, dtype=bool)
+
+        next_state, write, move, symbol_width = self.next_state, self.write, self.move, self.width
+        running = numpy.arange(count)
+        step = 0
+        while running.size:
+            cells = rows[running] * symbol_width + tapes[running, heads[running]]
+            targets = next_state[cells]
+            stopped = targets == HALT
+            if stopped.any():
+                halted[running[stopped]] = True
+                steps[running[stopped]] = step
+                keep = ~stopped
+                running, cells, targets = running[keep], cells[keep], targets[keep]
+            if step >= max_steps or not running.size:
+                break
+
+            tapes[running, heads[running]] = write[cells]
+            positions = heads[running] + move[cells]
+            heads[running] = positions
+            rows[running] = targets
+            lo[running] = numpy.minimum(lo[running], positions)
+            hi[running] = numpy.maximum(hi[running], positions)
+            step += 1
+
+            if positions.min() < 0 or positions.max() >= tapes.shape[1]:
+                margin = max(GROW_MARGIN, tapes.shape[1] // 2)
+                tapes = numpy.pad(tapes, ((0, 0), (margin, margin)))
+                heads += margin
+                lo += margin
+                hi += margin
+
+        steps[running] = step
+        return BatchResult(self, halted, rows, steps, tapes, heads, lo, hi)
@@ -0,0 +1,296 @@
+"""
+Busy beaver search over Turing machines in tree normal form.
+
+Machines are never built as `Turing` objects during the search. A machine with `states`
+states and `symbols` symbols is a tuple of `states * symbols` integers, one per
+(state, read symbol) pair, row-major: 0 means the transition is still undefined,
+otherwise the entry is `1 + 2 * (next state * symbols + write) + move` with move 0 for
+left and 1 for right.
+
+The search starts from the machine without transitions and runs every machine on the
+blank tape until it reaches an undefined transition. That is a halting candidate (the
+halting transition writes a non-blank symbol), and the children of the machine define
+exactly that transition. Only the transitions a run actually reaches get defined, and
+states and symbols are introduced in order of first use, with the very first move going
+right, so machines that only differ by renaming states or symbols, by mirroring, or in
+transitions they never use are generated once. Machines proven never to reach an
+undefined transition are pruned with all their descendants.
+
+Subtrees are explored by a process pool in depth-first order, and only the best results
+and counters travel back, so memory use does not grow with the size of the search.
+"""
+
+import heapq
+import itertools
+from array import array
+from dataclasses import dataclass, field
+from multiprocessing import Pool, cpu_count
+from typing import Iterator, List, Optional, Tuple
+
+from automata.simulation.deciders import RunStatus, decide
+from automata.simulation.turing import CompiledTuring, HALT
+
+Machine = Tuple[int, ...]
+
+HALT_STATE = 'Z'
+
+
+@dataclass(order=True)
+class Candidate:
+    """
+    A machine that halts on the blank tape.
+
+    Attributes:
+        ones (int): Non-blank cells left on the tape, including the one written by the
+                    halting transition.
+        steps (int): Steps until the halt, including the halting transition.
+        machine (Machine): The integer-encoded machine, with the halting transition
+                           still undefined.
+    """
+    ones: int
+    steps: int
+    machine: Machine = field(compare=False)
+
+
+@dataclass
+class SearchResult:
+    """
+    Outcome of a busy beaver search.
+
+    Attributes:
+        best (List[Candidate]): The best halting machines, most ones first.
+        halted (int): Number of halting machines found.
+        looping (int): Number of subtrees pruned as never halting.
+        holdouts (int): Number of subtrees given up on at the step budget or tape limit.
+        holdout_machines (List[Machine]): Some of the holdouts, for closer inspection.
+    """
+    best: List[Candidate]
+    halted: int = 0
+    looping: int = 0
+    holdouts: int = 0
+    holdout_machines: List[Machine] = field(default_factory=list)
+
+
+def encode_transition(next_state: int, write: int, move: int, symbols: int) -> int:
+    return 1 + 2 * (next_state * symbols + write) + move
+
+
+def decode_transition(entry: int, symbols: int) -> Tuple[int, int, int]:
+    """Returns `(next state, write, move)` of a defined transition, move 0 is left."""
+    code, move = divmod(entry - 1, 2)
+    next_state, write = divmod(code, symbols)
+    return next_state, write, move
+
+
+def compile_machine(machine: Machine, symbols: int) -> CompiledTuring:
+    """Builds the flat tables of a `CompiledTuring` directly from an encoded machine."""
+    states = len(machine) // symbols
+    next_state = array('i', [HALT]) * len(machine)
+    write = array('B', [0]) * len(machine)
+    move = array('b', [0]) * len(machine)
+    for cell, entry in enumerate(machine):
+        if entry:
+            next_state[cell], write[cell], direction = decode_transition(entry, symbols)
+            move[cell] = 1 if direction else -1
+    names = [chr(ord('A') + state) for state in range(states)]
+    return CompiledTuring(names, [False] * states, '0', [str(symbol) for symbol in range(symbols)],
+                          next_state, write, move)
+
+
+def to_standard_format(machine: Machine, symbols: int) -> str:
+    """
+    Formats a machine like "1RB1LB_1LA1RZ": one group per state, three characters per
+    read symbol, undefined transitions as halting ones writing a 1.
+    """
+    groups = []
+    for start in range(0, len(machine), symbols):
+        group = ''
+        for entry in machine[start:start + symbols]:
+            if entry:
+                next_state, write, move = decode_transition(entry, symbols)
+                group += f"{write}{'LR'[move]}{chr(ord('A') + next_state)}"
+            else:
+                group += f"1R{HALT_STATE}"
+        groups.append(group)
+    return '_'.join(groups)
+
+
+def to_turing(machine: Machine, symbols: int):
+    """Builds a `Turing` machine with blank '0' and a final halting state."""
+    from automata.automata_classes import Turing
+
+    states = len(machine) // symbols
+    names = [chr(ord('A') + state) for state in range(states)]
+    tm = Turing(blank_symbol='0')
+    for name in names:
+        tm.add_state(name)
+    tm.add_state(HALT_STATE, is_final=True)
+    for cell, entry in enumerate(machine):
+        source, read = divmod(cell, symbols)
+        if entry:
+            next_state, write, move = decode_transition(entry, symbols)
+            tm.add_transition(names[source], names[next_state], str(read), str(write), 'LR'[move])
+        else:
+            tm.add_transition(names[source], HALT_STATE, str(read), '1', 'R')
+    return tm
+
+
+def expand(machine: Machine, symbols: int, max_steps: int, max_tape: Optional[int] = None,
+           backward_depth: int = 8) -> Tuple[RunStatus, Optional[Candidate], List[Machine]]:
+    """
+    Runs a machine on the blank tape and returns its status, the halting candidate if
+    it reached an undefined transition, and its children in tree normal form.
+    """
+    compiled = compile_machine(machine, symbols)
+    compiled, tape = compiled.new_tape('')
+    decision = decide(compiled, tape, 0, max_steps, max_tape, backward_depth)
+    if decision.status != RunStatus.HALTED:
+        return decision.status, None, []
+
+    read = tape.cells[tape.head]
+    ones = len(tape) - tape.cells[tape.lo:tape.hi + 1].count(0) + (read == 0)
+    candidate = Candidate(ones, decision.steps + 1, machine)
+
+    undefined = machine.count(0)
+    if undefined == 1:
+        # Defining the last transition would leave the machine no way to halt
+        return RunStatus.HALTED, candidate, []
+
+    states = len(machine) // symbols
+    used_states = max([decode_transition(entry, symbols)[0] for entry in machine if entry], default=0)
+    used_symbols = max([decode_transition(entry, symbols)[1] for entry in machine if entry], default=0)
+    cell = decision.state * symbols + read
+    first = undefined == len(machine)
+    children = []
+    for next_state in range(min(used_states + 2, states)):
+        for write in range(min(used_symbols + 2, symbols)):
+            for move in ((1,) if first else (0, 1)):
+                child = list(machine)
+                child[cell] = encode_transition(next_state, write, move, symbols)
+                children.append(tuple(child))
+    return RunStatus.HALTED, candidate, children
+
+
+@dataclass
+class _Settings:
+    symbols: int
+    max_steps: int
+    max_tape: Optional[int]
+    backward_depth: int
+    keep: int
+
+
+def _explore(root: Machine, settings: _Settings, split_depth: Optional[int] = None,
+             result: Optional[SearchResult] = None) -> Tuple[SearchResult, List[Machine]]:
+    """
+    Explores the subtree below `root` depth first. With `split_depth`, machines with that
+    many defined transitions are not expanded but returned, to be explored separately.
+    """
+    if result is None:
+        result = SearchResult(best=[])
+    deferred = []
+    pending = [root]
+    while pending:
+        machine = pending.pop()
+        if split_depth is not None and len(machine) - machine.count(0) >= split_depth:
+            deferred.append(machine)
+            continue
+        status, candidate, children = expand(machine, settings.symbols, settings.max_steps,
+                                             settings.max_tape, settings.backward_depth)
+        if status == RunStatus.LOOPING:
+            result.looping += 1
+        elif status != RunStatus.HALTED:
+            result.holdouts += 1
+            if len(result.holdout_machines) < settings.keep:
+                result.holdout_machines.append(machine)
+        else:
+            result.halted += 1
+            _keep_best(result.best, candidate, settings.keep)
+            pending.extend(reversed(children))
+    return result, deferred
+
+
+def _keep_best(best: List[Candidate], candidate: Candidate, keep: int) -> None:
+    """Keeps the `keep` best candidates in a min-heap."""
+    if len(best) < keep:
+        heapq.heappush(best, candidate)
+    elif candidate > best[0]:
+        heapq.heapreplace(best, candidate)
+
+
+def _explore_subtree(arguments: Tuple[Machine, _Settings]) -> SearchResult:
+    root, settings = arguments
+    return _explore(root, settings)[0]
+
+
+def _merge(total: SearchResult, part: SearchResult, keep: int) -> None:
+    total.halted += part.halted
+    total.looping += part.looping
+    total.holdouts += part.holdouts
+    total.holdout_machines.extend(part.holdout_machines[:keep - len(total.holdout_machines)])
+    for candidate in part.best:
+        _keep_best(total.best, candidate, keep)
+
+
+def _batches(iterator: Iterator, size: int) -> Iterator[list]:
+    while True:
+        batch = list(itertools.islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def search(states: int, symbols: int = 2, max_steps: int = 10000, max_tape: Optional[int] = None,
+           backward_depth: int = 8, keep: int = 10, processes: Optional[int] = None,
+           split_depth: int = 3, batch_size: int = 256, progress=None) -> SearchResult:
+    """
+    Enumerates all machines with up to `states` states and `symbols` symbols in tree
+    normal form and returns the best halting ones.
+
+    Args:
+        states (int): Number of states.
+        symbols (int): Number of tape symbols, '0' is the blank.
+        max_steps (int): Step budget per machine. Machines still running afterwards
+                         without a proof that they never halt count as holdouts.
+        max_tape (Optional[int]): Optional limit on the visited tape per machine.
+        backward_depth (int): Depth limit for the backward reasoning decider.
+        keep (int): How many of the best machines (and of the holdouts) to keep.
+        processes (Optional[int]): Worker processes, defaults to all cores but one.
+                                   With 1 the search runs in this process.
+        split_depth (int): Subtrees rooted at machines with this many transitions are
+                           handed to the workers as one task each.
+        batch_size (int): Subtrees submitted to the pool at a time.
+        progress (Callable[[SearchResult, int], None], optional): Called with the result so
+                                                                  far and the number of
+                                                                  finished subtrees after
+                                                                  every batch.
+
+    Returns:
+        SearchResult: The best machines and the counters of the search.
+    """
+    if states < 1 or symbols < 2:
+        raise ValueError("A busy beaver search needs at least one state and two symbols")
+    settings = _Settings(symbols, max_steps, max_tape, backward_depth, keep)
+    root = (0,) * (states * symbols)
+    if processes is None:
+        processes = max(1, cpu_count() - 1)
+
+    if processes == 1:
+        result, _ = _explore(root, settings)
+        if progress is not None:
+            progress(result, 1)
+    else:
+        # The top of the tree is expanded here, the subtrees below it by the workers
+        result, subtrees = _explore(root, settings, split_depth)
+        finished = 0
+        with Pool(processes=processes) as pool:
+            for batch in _batches(iter(subtrees), batch_size):
+                tasks = ((subtree, settings) for subtree in batch)
+                for part in pool.imap_unordered(_explore_subtree, tasks):
+                    _merge(result, part, keep)
+                    finished += 1
+                if progress is not None:
+                    progress(result, finished)
+
+    result.best.sort(reverse=True)
+    return result
@@ -0,0 +1,170 @@
+"""
+Checkpoints of long single-tape Turing machine runs.
+
+A checkpoint is a pickled dict holding the state index, the step count, the `Decision`
+of the run so far, the tape
+(run-length encoded, with the head and visited extent relative to the tape's origin) and,
+for runs with non-halting deciders, the `DeciderState`. It also stores a fingerprint of
+the compiled transition tables, so a run is never resumed with a different machine.
+
+Checkpoints are written to a temporary file in the target directory and moved into
+place with `os.replace`, so a crash while writing leaves the previous checkpoint intact.
+"""
+
+import hashlib
+import os
+import pickle
+import re
+import tempfile
+import time
+from typing import Callable, Optional, Tuple
+
+from automata.simulation.deciders import Decision, DeciderState, RunStatus, continue_deciding
+from automata.simulation.tape import Tape
+from automata.simulation.turing import HALT
+
+FORMAT_VERSION = 1
+CHUNK_STEPS = 1 << 16  # Steps between two looks at the clock
+
+_RUN = re.compile(rb'(.)\1*', re.DOTALL)
+
+
+def fingerprint(compiled) -> str:
+    """A hash of the transition tables and symbols of a compiled machine."""
+    digest = hashlib.sha256()
+    names = [getattr(state, "name", state) for state in compiled.states]
+    digest.update(repr((compiled.blank, compiled.symbols, names)).encode())
+    digest.update(compiled.next_state.tobytes())
+    digest.update(compiled.write.tobytes())
+    digest.update(compiled.move.tobytes())
+    return digest.hexdigest()
+
+
+def encode_tape(tape: Tape) -> dict:
+    """Run-length encodes the visited part of a tape as `(code, count)` pairs."""
+    content = bytes(tape.cells[tape.lo:tape.hi + 1])
+    return {
+        "symbols": list(tape.symbols),
+        "runs": [(match.group()[0], match.end() - match.start()) for match in _RUN.finditer(content)],
+        "lo": tape.lo - tape.origin,
+        "head": tape.head - tape.origin,
+    }
+
+
+def decode_tape(data: dict, blank: str) -> Tape:
+    """Rebuilds a tape from `encode_tape` output, with the same positions relative to its origin."""
+    symbols = data["symbols"]
+    tape = Tape(blank, [symbols[code] for code, count in data["runs"] for _ in range(count)],
+                head=data["head"] - data["lo"], symbols=symbols)
+    # Keep positions relative to the origin of the checkpointed tape
+    tape.origin -= data["lo"]
+    return tape
+
+
+def save_checkpoint(path: str, checkpoint: dict) -> None:
+    """Writes a checkpoint atomically."""
+    directory = os.path.dirname(os.path.abspath(path))
+    descriptor, temporary = tempfile.mkstemp(prefix=".checkpoint-", dir=directory)
+    try:
+        with os.fdopen(descriptor, "wb") as file:
+            pickle.dump(checkpoint, file, protocol=pickle.HIGHEST_PROTOCOL)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temporary, path)
+    except BaseException:
+        if os.path.exists(temporary):
+            os.remove(temporary)
+        raise
+
+
+def load_checkpoint(path: str, compiled) -> Tuple[dict, object, Tape]:
+    """
+    Reads a checkpoint written for `compiled`.
+
+    Returns:
+        Tuple[dict, CompiledTuring, Tape]: The checkpoint, the tables to continue with
+        (extended if the input contained symbols unknown to the machine) and the tape.
+
+    Raises:
+        ValueError: If the checkpoint was written for a different machine or format.
+    """
+    with open(path, "rb") as file:
+        checkpoint = pickle.load(file)
+    if not isinstance(checkpoint, dict) or checkpoint.get("version") != FORMAT_VERSION:
+        raise ValueError(f"Unsupported checkpoint format in '{path}'")
+    tape = decode_tape(checkpoint["tape"], compiled.blank)
+    if len(tape.symbols) > compiled.symbol_count:
+        compiled = compiled.extended(tape.symbols)
+    if checkpoint["machine"] != fingerprint(compiled):
+        raise ValueError(f"Checkpoint '{path}' was written for a different machine")
+    return checkpoint, compiled, tape
+
+
+def run_with_checkpoints(compiled, tape: Tape, state: int, path: str, max_steps=float('inf'),
+                         interval: float = 5.0, deciders: Optional[DeciderState] = None,
+                         max_tape: Optional[int] = None, steps: int = 0,
+                         clock: Callable[[], float] = time.monotonic) -> Tuple[Decision, Tape]:
+    """
+    Runs the machine on `tape` in chunks and writes a checkpoint to `path` whenever
+    `interval` seconds have passed, and once more at the end of the run.
+
+    Args:
+        compiled (CompiledTuring): The tables to run, matching the tape's codes.
+        tape (Tape): The tape.
+        state (int): Index of the state to continue in.
+        path (str): Where to write the checkpoints.
+        max_steps: The step budget for the whole run, counting from its start.
+        interval (float): Seconds between checkpoints.
+        deciders (Optional[DeciderState]): Run with the non-halting deciders, continuing
+                                           from this state.
+        max_tape (Optional[int]): Tape limit for the deciders.
+        steps (int): Steps already taken, for runs without deciders.
+
+    Returns:
+        Tuple[Decision, Tape]: The outcome of the run and the final tape.
+    """
+    machine = fingerprint(compiled)
+    last_checkpoint = clock()
+
+    def checkpoint(decision: Decision) -> None:
+        save_checkpoint(path, {
+            "version": FORMAT_VERSION,
+            "machine": machine,
+            "state": decision.state,
+            "steps": decision.steps,
+            "decision": decision,
+            "tape": encode_tape(tape),
+            "deciders": deciders,
+        })
+
+    while True:
+        chunk_end = min(max_steps, steps + CHUNK_STEPS)
+        if deciders is not None:
+            decision = continue_deciding(compiled, tape, state, deciders, chunk_end, max_tape)
+            state, steps = decision.state, decision.steps
+        else:
+            state, taken, halted = compiled.run(tape, state, chunk_end - steps)
+            steps += taken
+            if not halted and compiled.next_state[state * compiled.symbol_count + tape.cells[tape.head]] == HALT:
+                halted = True
+            decision = Decision(RunStatus.HALTED if halted else RunStatus.BUDGET_EXCEEDED, state, steps)
+
+        finished = decision.status != RunStatus.BUDGET_EXCEEDED or steps >= max_steps
+        now = clock()
+        if finished or now - last_checkpoint >= interval:
+            checkpoint(decision)
+            last_checkpoint = now
+        if finished:
+            return decision, tape
+
+
+def resume(path: str, compiled, max_steps=float('inf'), interval: float = 5.0,
+           max_tape: Optional[int] = None) -> Tuple[Decision, Tape]:
+    """Continues the run checkpointed in `path`, see `run_with_checkpoints`."""
+    checkpoint, compiled, tape = load_checkpoint(path, compiled)
+    decision = checkpoint["decision"]
+    if decision.status != RunStatus.BUDGET_EXCEEDED:
+        # The run is already over
+        return decision, tape
+    return run_with_checkpoints(compiled, tape, checkpoint["state"], path, max_steps, interval,
+                                checkpoint["deciders"], max_tape, checkpoint["steps"])
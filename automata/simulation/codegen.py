@@ -0,0 +1,242 @@
+"""
+Python code generation backend for single-tape Turing machines.
+
+`generate_source` turns the tables of a `CompiledTuring` into the source of a module
+with a function `run` specialized to the machine: every state is a function of
+straight-line code that dispatches on the symbol under the head with constant
+comparisons, symbols, targets and moves are literals, and the tape is a local
+`bytearray`. A state stays in its function while its transitions loop back to it, and
+`run` looks up the next state's function in a list when the state changes. Self-loop
+transitions are executed as scans, like `CompiledTuring.run` does.
+
+Generated modules are cached on disk, named by a hash of the tables, and loaded with
+`importlib`, so a machine is only generated once per cache directory.
+"""
+
+import hashlib
+import importlib.util
+import os
+import sys
+import tempfile
+from typing import Callable, Dict, List, Optional, Tuple
+
+from automata.simulation.tape import Tape
+from automata.simulation.turing import CompiledTuring, HALT
+
+CODEGEN_VERSION = 2  # Part of the hash, bump whenever the generated code changes
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "pyautomata", "turing")
+
+_loaded: Dict[str, Callable] = {}
+
+_HEADER = '''"""Generated by automata.simulation.codegen, do not edit."""
+
+from automata.simulation.turing import scan_end
+'''
+
+_RUN = '''
+    blocks = [{blocks}]
+
+    def run(run_cells, run_lo, run_hi, run_head, state, run_max_steps):
+        nonlocal cells, lo, hi, head, steps, shift, max_steps
+        cells, lo, hi, head, steps, shift, max_steps = run_cells, run_lo, run_hi, run_head, 0, 0, run_max_steps
+        try:
+            while True:
+                target = blocks[state]()
+                if target < 0:
+                    return state, steps, target == {halted}, lo, hi, head, shift
+                state = target
+        finally:
+            cells = None
+
+    return run
+
+
+_idle = []  # Runners not in use, each run takes one so that runs never share variables
+
+
+def run(cells, lo, hi, head, state, max_steps):
+    try:
+        runner = _idle.pop()
+    except IndexError:
+        runner = _runner()
+    try:
+        return runner(cells, lo, hi, head, state, max_steps)
+    finally:
+        _idle.append(runner)
+'''
+
+_HALTED = -1  # Returned by a state's block when no transition applies
+_STOPPED = -2  # Returned by a state's block when the step budget is used up
+
+_GROW_RIGHT = [
+    "if head > hi:",
+    "    if head >= len(cells):",
+    "        cells.extend(bytes(len(cells)))",
+    "    hi = head",
+]
+
+_GROW_LEFT = [
+    "if head < lo:",
+    "    if head < 0:",
+    "        extra = len(cells)",
+    "        cells[0:0] = bytes(extra)",
+    "        head += extra",
+    "        lo += extra",
+    "        hi += extra",
+    "        shift += extra",
+    "    lo = head",
+]
+
+
+def machine_hash(compiled: CompiledTuring) -> str:
+    """A hash of everything the generated code depends on."""
+    digest = hashlib.sha256()
+    digest.update(repr((CODEGEN_VERSION, compiled.symbol_count)).encode())
+    digest.update(compiled.next_state.tobytes())
+    digest.update(compiled.write.tobytes())
+    digest.update(compiled.move.tobytes())
+    return digest.hexdigest()
+
+
+def _step_lines(state: int, code: int, compiled: CompiledTuring) -> List[str]:
+    """The body of a transition that is not a scan, ending with its jump."""
+    cell = state * compiled.symbol_count + code
+    target, write, move = compiled.next_state[cell], compiled.write[cell], compiled.move[cell]
+    lines = []
+    if write != code:
+        lines.append(f"cells[head] = {write}")
+    if move:
+        lines.append(f"head += {move}" if move > 0 else f"head -= {-move}")
+        lines.extend(_GROW_RIGHT if move > 0 else _GROW_LEFT)
+    lines.append("steps += 1")
+    if target == state:
+        lines.append("continue")
+    else:
+        lines.append(f"return {target}")
+    return lines
+
+
+def _scan_lines(direction: int, skip: bytes) -> List[str]:
+    """The body of a self-loop transition, see `CompiledTuring.run`."""
+    lines = [f"end = scan_end(cells, head, {direction}, {skip!r}, max_steps - steps)"]
+    if direction > 0:
+        lines += ["if end == head:", "    head += 1", "    steps += 1"]
+        lines += ["    " + line for line in _GROW_RIGHT]
+        lines += ["else:", "    steps += end - head", "    head = end", "    if head > hi:", "        hi = head"]
+    else:
+        lines += ["if end == head:", "    head -= 1", "    steps += 1"]
+        lines += ["    " + line for line in _GROW_LEFT]
+        lines += ["else:", "    steps += head - end", "    head = end", "    if head < lo:", "        lo = head"]
+    lines.append("continue")
+    return lines
+
+
+def generate_source(compiled: CompiledTuring) -> str:
+    """
+    Generates the source of a module whose `run(cells, lo, hi, head, state, max_steps)`
+    runs the machine on a tape buffer in place.
+
+    Every state is a closure that runs until the state changes and returns the next
+    state, and the runner calls them through a list indexed by the state, so a state
+    change costs the same in machines of any size. The closures share the tape, head
+    and step count as variables of the enclosing `_runner`, and `run` reuses idle
+    runners, so the closures are only created once per concurrent run.
+
+    The function returns `(state, steps, halted, lo, hi, head, shift)`, where `shift`
+    is the number of cells prepended to the buffer, by which every buffer index moved.
+    """
+    symbol_count = compiled.symbol_count
+    lines = [_HEADER.rstrip("\n"), "", "", "def _runner():",
+             "    cells = lo = hi = head = steps = shift = max_steps = None"]
+
+    def emit(depth: int, body: List[str]) -> None:
+        lines.extend("    " * depth + line for line in body)
+
+    for state in range(len(compiled.states)):
+        emit(1, ["", f"def state_{state}():",
+                 "    nonlocal lo, hi, head, steps, shift",
+                 "    while True:"])
+        emit(3, ["if steps >= max_steps:",
+                 f"    return {_STOPPED}",
+                 "symbol = cells[head]"])
+        first = True
+        for code in range(symbol_count):
+            cell = state * symbol_count + code
+            if compiled.next_state[cell] == HALT:
+                continue
+            scan = compiled.scans.get(cell)
+            emit(3, [f"{'if' if first else 'elif'} symbol == {code}:"])
+            emit(4, _scan_lines(*scan) if scan else _step_lines(state, code, compiled))
+            first = False
+        emit(3, [f"return {_HALTED}"])
+    lines.append(_RUN.format(blocks=", ".join(f"state_{state}" for state in range(len(compiled.states))),
+                             halted=_HALTED).rstrip("\n"))
+    return "\n".join(lines) + "\n"
+
+
+def _write_atomically(path: str, source: str) -> None:
+    descriptor, temporary = tempfile.mkstemp(prefix=".codegen-", suffix=".py", dir=os.path.dirname(path))
+    try:
+        with os.fdopen(descriptor, "w", encoding="utf-8") as file:
+            file.write(source)
+        os.replace(temporary, path)
+    except BaseException:
+        if os.path.exists(temporary):
+            os.remove(temporary)
+        raise
+
+
+def load_function(compiled: CompiledTuring, cache_dir: Optional[str] = None) -> Callable:
+    """
+    Returns the generated `run` function of a machine, generating and caching its
+    module in `cache_dir` (`DEFAULT_CACHE_DIR` if None) unless it is cached already.
+    """
+    key = machine_hash(compiled)
+    directory = cache_dir or DEFAULT_CACHE_DIR
+    path = os.path.join(directory, f"tm_{key}.py")
+    function = _loaded.get(path)
+    if function is not None:
+        return function
+
+    if not os.path.exists(path):
+        os.makedirs(directory, exist_ok=True)
+        _write_atomically(path, generate_source(compiled))
+    spec = importlib.util.spec_from_file_location(f"_pyautomata_tm_{key}", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    _loaded[path] = function = module.run
+    return function
+
+
+class GeneratedTuring(CompiledTuring):
+    """
+    A `CompiledTuring` whose `run` is generated Python code specialized to the machine.
+    It can be used wherever a `CompiledTuring` is.
+
+    Attributes:
+        cache_dir (Optional[str]): Where the generated module is cached.
+    """
+
+    def __init__(self, states, final: List[bool], blank: str, symbols: List[str],
+                 next_state, write, move, cache_dir: Optional[str] = None):
+        super().__init__(states, final, blank, symbols, next_state, write, move)
+        self.cache_dir = cache_dir
+        self._run = load_function(self, cache_dir)
+
+    @classmethod
+    def from_compiled(cls, compiled: CompiledTuring, cache_dir: Optional[str] = None) -> 'GeneratedTuring':
+        return cls(compiled.states, compiled.final, compiled.blank, compiled.symbols,
+                   compiled.next_state, compiled.write, compiled.move, cache_dir)
+
+    def extended(self, symbols: List[str]) -> 'GeneratedTuring':
+        tables = CompiledTuring(self.states, self.final, self.blank, self.symbols,
+                                self.next_state, self.write, self.move)
+        return self.from_compiled(tables.extended(symbols), self.cache_dir)
+
+    def run(self, tape: Tape, state: int, max_steps) -> Tuple[int, int, bool]:
+        if max_steps == float('inf'):
+            max_steps = sys.maxsize
+        state, steps, halted, tape.lo, tape.hi, tape.head, shift = self._run(
+            tape.cells, tape.lo, tape.hi, tape.head, state, max_steps)
+        tape.origin += shift
+        return state, steps, halted
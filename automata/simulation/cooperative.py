@@ -0,0 +1,87 @@
+"""
+Cooperative execution of simulations.
+
+Every machine implements its simulation as a generator, `_run_chunks`, that does a
+bounded amount of work, yields the number of steps taken so far, and finally returns
+what `process_input` returns. `process_input` simply runs the generator to completion,
+and `run_async` drives the same generator from an event loop, yielding control between
+chunks. Many long simulations can therefore share one event loop fairly, be cancelled,
+or be stopped at a deadline, without threads.
+"""
+
+import asyncio
+from typing import Any, Callable, Generator, Optional
+
+Chunks = Generator[int, None, Any]
+
+
+def run_to_completion(chunks: Chunks) -> Any:
+    """Runs a chunked simulation synchronously and returns its result."""
+    while True:
+        try:
+            next(chunks)
+        except StopIteration as stop:
+            return stop.value
+
+
+async def run_cooperatively(chunks: Chunks, deadline: Optional[float] = None,
+                            progress: Optional[Callable[[int], None]] = None) -> Any:
+    """
+    Runs a chunked simulation, giving other tasks a chance to run after every chunk.
+
+    Args:
+        chunks: The simulation generator.
+        deadline (Optional[float]): Time of the event loop's clock (`loop.time()`) at which
+                                    the simulation is stopped.
+        progress (Optional[Callable[[int], None]]): Called with the number of steps taken
+                                                    so far after every chunk.
+
+    Raises:
+        TimeoutError: If the deadline passes before the simulation finishes.
+        asyncio.CancelledError: If the task running the simulation is cancelled.
+    """
+    loop = asyncio.get_running_loop()
+    try:
+        while True:
+            try:
+                steps = next(chunks)
+            except StopIteration as stop:
+                return stop.value
+            if progress is not None:
+                progress(steps)
+            if deadline is not None and loop.time() >= deadline:
+                raise TimeoutError(f"Simulation stopped at its deadline after {steps} steps")
+            await asyncio.sleep(0)
+    finally:
+        chunks.close()
+
+
+def stepped_in_chunks(run: Callable, state: int, max_steps, chunk_steps: Optional[int] = None) -> Chunks:
+    """
+    Splits a compiled machine's `run(state, max_steps) -> (state, steps, halted)` into
+    chunks of `chunk_steps` steps (one chunk if None).
+
+    Returns:
+        Tuple[int, int, bool]: The final state, the total number of steps and whether
+        the machine halted, as the generator's return value.
+    """
+    steps = 0
+    while True:
+        remaining = max_steps - steps
+        state, taken, halted = run(state, min(chunk_steps, remaining) if chunk_steps else remaining)
+        steps += taken
+        if halted or steps >= max_steps:
+            return state, steps, halted
+        yield steps
+
+
+def tighter_budget(step_budget: Optional[int], limit: Optional[int]) -> Optional[int]:
+    """
+    Combines the `step_budget` of `run_async` with the budget option of `process_input`
+    (`max_iterations` or `max_steps`) that means the same thing. None means no limit.
+    """
+    if step_budget is None:
+        return limit
+    if limit is None:
+        return step_budget
+    return min(step_budget, limit)
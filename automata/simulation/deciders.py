@@ -0,0 +1,256 @@
+"""
+Non-halting deciders for single-tape Turing machines.
+
+`decide` runs a compiled machine like `CompiledTuring.run` does, but in its own stepping
+loop, so the plain simulation pays nothing for it. While stepping it tries to prove that
+the machine never halts:
+
+* Cyclers: the exact configuration (state, head position, tape) repeats. Configurations
+  are compared with Brent's algorithm, so only one saved configuration is kept and a
+  cycle is found within two periods of entering it.
+* Translated cyclers: the machine keeps breaking its record position on one side in the
+  same state, and the tape next to that edge, as far back as the head went in between,
+  is the same both times. Every following record then repeats the same way forever.
+* Backward reasoning: starting from every (state, symbol) pair without a transition, the
+  configurations that could lead to it are explored backwards on partially known tapes.
+  If every branch dies out within `backward_depth` steps, a halting run is never longer
+  than the deepest branch, and a run that has taken more steps never halts.
+"""
+
+import math
+from dataclasses import dataclass
+from enum import Enum
+from typing import Dict, List, Optional, Tuple
+
+from automata.simulation.tape import Tape
+from automata.simulation.turing import HALT
+
+
+class RunStatus(Enum):
+    HALTED = "halted"
+    LOOPING = "looping"
+    UNDECIDED = "undecided"  # Stopped by the tape limit, neither halted nor proven to loop
+    BUDGET_EXCEEDED = "budget_exceeded"  # The step budget ran out
+
+
+@dataclass
+class Decision:
+    """
+    Outcome of a run with non-halting deciders.
+
+    Attributes:
+        status (RunStatus): How the run ended.
+        state (int): Index of the state the run ended in.
+        steps (int): The number of steps taken.
+        reason (Optional[str]): The decider that proved non-halting ('cycler',
+                                'translated cycler' or 'backward reasoning').
+        period (Optional[int]): Steps per repetition for (translated) cyclers.
+    """
+    status: RunStatus
+    state: int
+    steps: int
+    reason: Optional[str] = None
+    period: Optional[int] = None
+
+
+def backward_depth_bound(compiled, max_depth: int = 8, max_nodes: int = 10000) -> Optional[int]:
+    """
+    Explores the configurations leading to a halt backwards on partially known tapes.
+
+    Returns:
+        Optional[int]: The length of the longest possible run into a halting
+        configuration if every backward branch dies out within `max_depth` steps, or
+        None if that could not be shown.
+    """
+    symbol_count = compiled.symbol_count
+    next_state, write, move = compiled.next_state, compiled.write, compiled.move
+    state_count = len(compiled.states)
+
+    # For every state, the transitions leading into it: (source, read, write, move)
+    incoming: List[List[Tuple[int, int, int, int]]] = [[] for _ in range(state_count)]
+    for cell, target in enumerate(next_state):
+        if target != HALT:
+            source, read = divmod(cell, symbol_count)
+            incoming[target].append((source, read, write[cell], move[cell]))
+
+    # A configuration is (state, head, known cells as a sorted tuple of (position, code))
+    frontier = [(state, 0, ((0, symbol),))
+                for state in range(state_count) for symbol in range(symbol_count)
+                if next_state[state * symbol_count + symbol] == HALT]
+    nodes = len(frontier)
+    depth = 0
+    while frontier:
+        if depth >= max_depth:
+            return None
+        predecessors = []
+        for state, head, known in frontier:
+            cells = dict(known)
+            for source, read, written, delta in incoming[state]:
+                previous = head - delta
+                if cells.get(previous, written) != written:
+                    continue
+                before = dict(cells)
+                before[previous] = read
+                predecessors.append((source, previous, tuple(sorted(before.items()))))
+        nodes += len(predecessors)
+        if nodes > max_nodes:
+            return None
+        frontier = predecessors
+        depth += 1
+    return depth
+
+
+def _snapshot(tape: Tape) -> Tuple[int, bytes]:
+    """The non-blank part of the tape and the position of its first cell relative to the origin."""
+    content = bytes(tape.cells[tape.lo:tape.hi + 1])
+    stripped = content.lstrip(b'\0')
+    return tape.lo + len(content) - len(stripped) - tape.origin, stripped.rstrip(b'\0')
+
+
+@dataclass
+class DeciderState:
+    """
+    Everything the deciders remember about a run, so that it can be continued later.
+    Only holds plain values and can be pickled.
+
+    Attributes:
+        steps (int): Steps taken so far.
+        bound (Optional[int]): Longest possible run into a halt, from backward reasoning.
+        saved (tuple): Brent's saved configuration (state, position, tape snapshot).
+        power (int): Current power of two of Brent's algorithm.
+        period (int): Steps since the configuration was saved.
+        records (List[Dict]): Per side (0 left, 1 right) and state, the last record as
+                              (step, position, tape up to the edge, record count).
+        extremes (List[List[int]]): Per side, the position farthest from the edge the
+                                    head reached between consecutive records.
+        since_record (List[int]): The farthest positions since the last record per side.
+    """
+    steps: int
+    bound: Optional[int]
+    saved: tuple
+    power: int
+    period: int
+    records: List[Dict[int, Tuple[int, int, bytes, int]]]
+    extremes: List[List[int]]
+    since_record: List[int]
+
+    @classmethod
+    def start(cls, compiled, tape: Tape, state: int, backward_depth: int = 8) -> 'DeciderState':
+        """The decider state at the start of a run on `tape` in `state`."""
+        bound = backward_depth_bound(compiled, backward_depth) if backward_depth > 0 else None
+        position = tape.head - tape.origin
+        return cls(0, bound, (state, position, _snapshot(tape)), 1, 1, [{}, {}], [[], []],
+                   [position, position])
+
+
+def decide(compiled, tape: Tape, state: int, max_steps=math.inf, max_tape: Optional[int] = None,
+           backward_depth: int = 8) -> Decision:
+    """
+    Runs the machine on `tape` in place until it halts, is proven to loop, or a limit
+    is reached.
+
+    Args:
+        compiled (CompiledTuring): The tables to run, matching the tape's codes.
+        tape (Tape): The tape.
+        state (int): Index of the state to start in.
+        max_steps: The step budget, may be `math.inf`.
+        max_tape (Optional[int]): Stop with `RunStatus.UNDECIDED` once more cells than
+                                  this have been visited.
+        backward_depth (int): Depth limit for backward reasoning, 0 disables it.
+
+    Returns:
+        Decision: The status and where the run stopped.
+    """
+    progress = DeciderState.start(compiled, tape, state, backward_depth)
+    return continue_deciding(compiled, tape, state, progress, max_steps, max_tape)
+
+
+def continue_deciding(compiled, tape: Tape, state: int, progress: DeciderState, max_steps=math.inf,
+                      max_tape: Optional[int] = None) -> Decision:
+    """
+    Like `decide`, but continues a run whose deciders are in `progress`, which is
+    updated in place. `max_steps` counts from the start of the run.
+    """
+    symbol_count = compiled.symbol_count
+    next_state = compiled.next_state
+    write = compiled._write
+    move = compiled._move
+
+    bound = progress.bound
+    saved, power, period = progress.saved, progress.power, progress.period
+    records, extremes, since_record = progress.records, progress.extremes, progress.since_record
+
+    steps = progress.steps
+    while True:
+        cells = tape.cells
+        cell = state * symbol_count + cells[tape.head]
+        target = next_state[cell]
+        if target == HALT:
+            decision = Decision(RunStatus.HALTED, state, steps)
+            break
+        if bound is not None and steps >= bound:
+            decision = Decision(RunStatus.LOOPING, state, steps, 'backward reasoning')
+            break
+        if steps >= max_steps:
+            decision = Decision(RunStatus.BUDGET_EXCEEDED, state, steps)
+            break
+
+        leftmost, rightmost = tape.lo - tape.origin, tape.hi - tape.origin
+        cells[tape.head] = write[cell]
+        tape.move(move[cell])
+        state = target
+        steps += 1
+        position = tape.head - tape.origin
+        if max_tape is not None and len(tape) > max_tape:
+            decision = Decision(RunStatus.UNDECIDED, state, steps)
+            break
+
+        # Exact cycles, the tape is only compared when state and head position match
+        if state == saved[0] and position == saved[1] and _snapshot(tape) == saved[2]:
+            decision = Decision(RunStatus.LOOPING, state, steps, 'cycler', period)
+            break
+        if period == power:
+            saved = (state, position, _snapshot(tape))
+            power *= 2
+            period = 0
+        period += 1
+
+        # Translated cyclers, checked whenever the head breaks a record
+        since_record[0] = max(since_record[0], position)
+        since_record[1] = min(since_record[1], position)
+        if position > rightmost:
+            side = 1
+            content = bytes(tape.cells[tape.lo:tape.head + 1])
+        elif position < leftmost:
+            side = 0
+            content = bytes(tape.cells[tape.head:tape.hi + 1])
+        else:
+            continue
+        extremes[side].append(since_record[side])
+        since_record[side] = position
+        previous = records[side].get(state)
+        records[side][state] = (steps, position, content, len(extremes[side]))
+        if previous is not None and _repeats(side, previous, position, content, extremes[side]):
+            decision = Decision(RunStatus.LOOPING, state, steps, 'translated cycler', steps - previous[0])
+            break
+
+    progress.steps, progress.saved, progress.power, progress.period = steps, saved, power, period
+    return decision
+
+
+def _repeats(side: int, previous: Tuple[int, int, bytes, int], position: int, content: bytes,
+             extremes: List[int]) -> bool:
+    """
+    Whether the tape next to the edge is the same at two records, as far back from the
+    edge as the head went in between.
+    """
+    _, previous_position, previous_content, index = previous
+    if side:
+        window = previous_position - min(extremes[index:]) + 1
+    else:
+        window = max(extremes[index:]) - previous_position + 1
+    if window > len(previous_content) or window > len(content):
+        return False
+    if side:
+        return previous_content[-window:] == content[-window:]
+    return previous_content[:window] == content[:window]
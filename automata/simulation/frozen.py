@@ -0,0 +1,191 @@
+"""
+Immutable snapshots of single-tape Turing machines.
+
+A `Turing` machine is an object graph of states, transition objects and dicts, which
+is slow to pickle and to send to worker processes. `FrozenTuring` keeps only what the
+engines need: the state names, which states are final, the symbols and the flat
+transition tables of `CompiledTuring`, all stored in one contiguous buffer (the next
+state as native `int32`, then the symbol to write and the head movement as bytes).
+
+A snapshot pickles as a few strings and that buffer. `share` copies the buffer into a
+`multiprocessing.shared_memory` block, and a shared snapshot pickles as the name of the
+block only: unpickling it in another process maps the block without copying it.
+
+Snapshots are accepted wherever a machine is, since they have `compile()` and
+`initial_state`: by `BatchTuring`, `MacroMachine`, the deciders and checkpoints (via
+`compile()`), and by `process_input`, which runs like `Turing.process_input`.
+"""
+
+import math
+from array import array
+from multiprocessing import shared_memory
+from typing import List, NamedTuple, Optional, Sequence, Tuple, Union
+
+from automata.simulation.cooperative import run_to_completion, stepped_in_chunks
+from automata.simulation.turing import CompiledTuring, turing_outcome
+
+_STATE_BYTES = array('i').itemsize
+
+
+class FrozenState(NamedTuple):
+    """Stands in for a `State` in the tables compiled from a snapshot."""
+    name: str
+    is_final: bool
+
+
+class FrozenTuring:
+    """
+    An immutable, hashable and picklable snapshot of a single-tape Turing machine.
+
+    Attributes:
+        name (str): The machine's name.
+        state_names (Tuple[str, ...]): The state names, position is the state index.
+        initial (int): Index of the initial state.
+        final (Tuple[bool, ...]): Whether the state with a given index is final.
+        blank (str): The blank symbol, always code 0.
+        symbols (Tuple[str, ...]): The tape symbols, position is the code.
+        next_state (memoryview): Read-only view of the next-state table, see `CompiledTuring`.
+        write (memoryview): Read-only view of the write table.
+        move (memoryview): Read-only view of the move table.
+    """
+
+    __slots__ = ("name", "state_names", "initial", "final", "blank", "symbols",
+                 "next_state", "write", "move", "_buffer", "_shared", "_owner", "_hash", "_compiled")
+
+    def __init__(self, name: str, state_names: Sequence[str], initial: int, final: Sequence[bool], blank: str,
+                 symbols: Sequence[str], tables: Union[bytes, memoryview],
+                 _shared: Optional[shared_memory.SharedMemory] = None, _owner: bool = False):
+        """
+        Creates a snapshot from its tables, see `Turing.freeze` for creating one from a machine.
+
+        Args:
+            tables: The next-state, write and move tables, one after the other, as laid
+                    out by `CompiledTuring`.
+
+        Raises:
+            ValueError: If the tables do not fit the number of states and symbols.
+        """
+        size = len(state_names) * len(symbols)
+        if len(tables) != size * (_STATE_BYTES + 2):
+            raise ValueError(f"Tables of {len(tables)} bytes do not fit {len(state_names)} states "
+                             f"and {len(symbols)} symbols")
+        buffer = memoryview(tables).toreadonly()
+        split = size * _STATE_BYTES
+        assign = object.__setattr__
+        assign(self, "name", name)
+        assign(self, "state_names", tuple(state_names))
+        assign(self, "initial", initial)
+        assign(self, "final", tuple(bool(is_final) for is_final in final))
+        assign(self, "blank", blank)
+        assign(self, "symbols", tuple(symbols))
+        assign(self, "_buffer", buffer)
+        assign(self, "next_state", buffer[:split].cast('i'))
+        assign(self, "write", buffer[split:split + size].cast('B'))
+        assign(self, "move", buffer[split + size:].cast('b'))
+        assign(self, "_shared", _shared)
+        assign(self, "_owner", _owner)
+        assign(self, "_hash", None)
+        assign(self, "_compiled", None)
+
+    @classmethod
+    def from_compiled(cls, compiled: CompiledTuring, initial: int = 0, name: str = '') -> 'FrozenTuring':
+        names = [getattr(state, "name", state) for state in compiled.states]
+        tables = compiled.next_state.tobytes() + compiled.write.tobytes() + compiled.move.tobytes()
+        return cls(name, names, initial, compiled.final, compiled.blank, compiled.symbols, tables)
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def _key(self) -> tuple:
+        return self.state_names, self.initial, self.final, self.blank, self.symbols, self._buffer
+
+    def __eq__(self, other):
+        if not isinstance(other, FrozenTuring):
+            return NotImplemented
+        return self._key() == other._key()
+
+    def __hash__(self):
+        if self._hash is None:
+            object.__setattr__(self, "_hash", hash(self._key()))
+        return self._hash
+
+    def __repr__(self):
+        shared = f", shared={self._shared.name!r}" if self._shared is not None else ""
+        return f"FrozenTuring({self.name!r}, {len(self.state_names)} states, {len(self.symbols)} symbols{shared})"
+
+    def __reduce__(self):
+        metadata = (self.name, self.state_names, self.initial, self.final, self.blank, self.symbols)
+        if self._shared is not None:
+            return _attach, metadata + (self._shared.name, len(self._buffer))
+        return FrozenTuring, metadata + (self._buffer.tobytes(),)
+
+    @property
+    def initial_state(self) -> FrozenState:
+        return FrozenState(self.state_names[self.initial], self.final[self.initial])
+
+    def compile(self) -> CompiledTuring:
+        """
+        Returns the tables as a `CompiledTuring`, whose states are `FrozenState`s. The
+        tables are copied into the process once and cached, the snapshot stays unchanged.
+        """
+        if self._compiled is None:
+            states = [FrozenState(name, is_final) for name, is_final in zip(self.state_names, self.final)]
+            compiled = CompiledTuring(states, list(self.final), self.blank, list(self.symbols),
+                                      array('i', self.next_state), array('B', self.write), array('b', self.move))
+            object.__setattr__(self, "_compiled", compiled)
+        return self._compiled
+
+    def process_input(self, simulation_input: Union[List[str], str], max_iterations=1000,
+                      return_steps=False) -> Union[Tuple[bool, List[str]], Tuple[bool, List[str], int]]:
+        """Runs the machine and returns like `Turing.process_input`, without changing the snapshot."""
+        compiled, tape = self.compile().new_tape(simulation_input)
+        budget = math.inf if max_iterations is None else max_iterations + 1
+        state, steps, halted = run_to_completion(stepped_in_chunks(
+            lambda current, count: compiled.run(tape, current, count), self.initial, budget))
+        return turing_outcome(self.final[state], halted, tape.to_list(), tape.head_offset, steps, return_steps)
+
+    def share(self) -> 'FrozenTuring':
+        """
+        Copies the tables into a new shared memory block and returns a snapshot backed
+        by it, which pickles as the name of the block. The process that shares a
+        snapshot owns the block and must call `unlink` once no process needs it anymore.
+        """
+        block = shared_memory.SharedMemory(create=True, size=max(len(self._buffer), 1))
+        block.buf[:len(self._buffer)] = self._buffer
+        return FrozenTuring(self.name, self.state_names, self.initial, self.final, self.blank, self.symbols,
+                            block.buf[:len(self._buffer)], _shared=block, _owner=True)
+
+    @property
+    def shared_name(self) -> Optional[str]:
+        """The name of the shared memory block backing the snapshot, if any."""
+        return None if self._shared is None else self._shared.name
+
+    def close(self) -> None:
+        """Releases the views of a shared snapshot and unmaps its block. The snapshot is unusable afterwards."""
+        if self._shared is None:
+            return
+        for view in (self.next_state, self.write, self.move, self._buffer):
+            view.release()
+        self._shared.close()
+        object.__setattr__(self, "_shared", None)
+
+    def unlink(self) -> None:
+        """Closes a shared snapshot and, in the process that shared it, frees its block."""
+        block, owner = self._shared, self._owner
+        self.close()
+        if block is not None and owner:
+            block.unlink()
+
+    def __del__(self):
+        if getattr(self, "_shared", None) is not None:
+            self.close()
+
+
+def _attach(name: str, state_names, initial: int, final, blank: str, symbols, block_name: str,
+            size: int) -> FrozenTuring:
+    """Unpickles a shared snapshot by mapping its shared memory block."""
+    block = shared_memory.SharedMemory(name=block_name)
+    return FrozenTuring(name, state_names, initial, final, blank, symbols, block.buf[:size], _shared=block)
@@ -0,0 +1,272 @@
+"""
+Accelerated simulation of single-tape Turing machines.
+
+The tape is split into blocks of `block_size` cells and stored run-length encoded, as
+two stacks of `[block, count]` runs on either side of the head. A macro step simulates
+the machine on one block until the head leaves it (the result is cached per state,
+block contents and entry side), and when a macro step leaves a block in the same state
+it entered it, in the direction of a run of identical blocks, the whole run is
+converted at once. Machines that sweep back and forth over long uniform stretches,
+like busy beaver candidates, therefore take one macro step per run instead of one
+step per cell.
+
+The simulation stays exact: step counts are Python ints and are advanced by the real
+number of steps every macro step and every skipped run stands for, and the step budget
+is honoured to the single step.
+"""
+
+import math
+from dataclasses import dataclass
+from typing import Dict, List, Tuple
+
+from automata.simulation.turing import HALT
+
+Block = Tuple[int, ...]
+
+EXIT_LEFT = -1
+EXIT_RIGHT = 1
+HALTED = 0
+LIMIT = 2
+LOOP = 3
+
+
+@dataclass
+class AcceleratedRun:
+    """
+    Result of an accelerated Turing machine run.
+
+    Attributes:
+        halted (bool): True if no transition applied in the final configuration.
+        accepted (bool): True if the machine halted in a final state.
+        looping (bool): True if the machine provably never halts (it got stuck inside
+                        a block, or sweeps over the blank tape forever).
+        state (str): Name of the state the run ended in.
+        steps (int): The exact number of steps taken.
+        head_position (int): Head position as an index into `tape()`.
+        runs (List[Tuple[List[str], int]]): The tape from left to right as
+                                            `(block symbols, repeat count)` pairs.
+        first_cell (int): Position of the first cell covered by `runs`, relative to the
+                          first (blank) cell of the initial tape.
+        visited (Tuple[int, int]): Leftmost and rightmost cell visited by the head (or
+                                   part of the initial tape), same coordinates as `first_cell`.
+        blank (str): The blank symbol.
+    """
+    halted: bool
+    accepted: bool
+    looping: bool
+    state: str
+    steps: int
+    head_position: int
+    runs: List[Tuple[List[str], int]]
+    first_cell: int
+    visited: Tuple[int, int]
+    blank: str
+
+    def count(self, symbol: str) -> int:
+        """Counts the occurrences of `symbol` in the visited part of the tape without expanding it."""
+        non_blank = {}
+        for block, repeat in self.runs:
+            for cell in block:
+                if cell != self.blank:
+                    non_blank[cell] = non_blank.get(cell, 0) + repeat
+        if symbol != self.blank:
+            return non_blank.get(symbol, 0)
+        return self.visited[1] - self.visited[0] + 1 - sum(non_blank.values())
+
+    def tape(self) -> List[str]:
+        """
+        Expands the visited part of the tape into a list, in the same layout
+        `Turing.process_input` returns. Only feasible for tapes that fit in memory.
+        """
+        cells = [cell for block, repeat in self.runs for _ in range(repeat) for cell in block]
+        start, end = self.visited
+        first = self.first_cell
+        return [cells[position - first] if 0 <= position - first < len(cells) else self.blank
+                for position in range(start, end + 1)]
+
+
+class MacroMachine:
+    """
+    A Turing machine viewed as a machine on blocks of `block_size` cells.
+
+    Macro transitions are computed lazily and cached in `transitions`, keyed by
+    `(state, block, entry offset)`.
+    """
+
+    def __init__(self, compiled, block_size: int = 1):
+        if block_size < 1:
+            raise ValueError("block_size must be at least 1")
+        self.compiled = compiled.compile()
+        self.block_size = block_size
+        self.transitions: Dict[Tuple[int, Block, int], tuple] = {}
+
+    def simulate_block(self, state: int, block: Block, offset: int, limit=math.inf) -> tuple:
+        """
+        Runs the machine inside one block until the head leaves it, the machine halts,
+        or `limit` steps have been taken.
+
+        Returns:
+            tuple: `(outcome, state, block, offset, steps, leftmost, rightmost)`, where
+            outcome is one of EXIT_LEFT, EXIT_RIGHT, HALTED, LIMIT or LOOP, offset is
+            the final head offset (-1 or block_size after an exit) and leftmost and
+            rightmost are the extreme offsets visited inside the block. A LOOP found
+            under a finite `limit` is followed to the configuration after `limit` steps.
+        """
+        key = (state, block, offset)
+        cached = self.transitions.get(key)
+        if cached is not None and cached[4] <= limit and (cached[0] != LOOP or limit == math.inf):
+            return cached
+
+        compiled = self.compiled
+        symbol_count = compiled.symbol_count
+        next_state, write, move = compiled.next_state, compiled.write, compiled.move
+        size = self.block_size
+        cells = list(block)
+        leftmost = rightmost = offset
+        steps = 0
+        seen: Dict[Tuple[int, int, Block], int] = {}
+
+        while True:
+            cell = state * symbol_count + cells[offset]
+            target = next_state[cell]
+            if target == HALT:
+                result = (HALTED, state, tuple(cells), offset, steps, leftmost, rightmost)
+                break
+            if steps >= limit:
+                return LIMIT, state, tuple(cells), offset, steps, leftmost, rightmost
+            configuration = (state, offset, tuple(cells))
+            if configuration in seen:
+                if limit != math.inf:
+                    # Stuck inside the block: fast forward to the budget on the cycle
+                    period = steps - seen[configuration]
+                    remaining = (limit - steps) % period
+                    return (LOOP,) + self.simulate_block(state, tuple(cells), offset, remaining)[1:4] + \
+                        (limit, leftmost, rightmost)
+                result = (LOOP, state, tuple(cells), offset, steps, leftmost, rightmost)
+                break
+            seen[configuration] = steps
+
+            cells[offset] = write[cell]
+            offset += move[cell]
+            state = target
+            steps += 1
+            if offset < 0:
+                result = (EXIT_LEFT, state, tuple(cells), offset, steps, leftmost, rightmost)
+                break
+            if offset >= size:
+                result = (EXIT_RIGHT, state, tuple(cells), offset, steps, leftmost, rightmost)
+                break
+            leftmost = min(leftmost, offset)
+            rightmost = max(rightmost, offset)
+
+        self.transitions[key] = result
+        return result
+
+    def run(self, simulation_input, state: int, max_steps=math.inf) -> AcceleratedRun:
+        """
+        Runs the machine on `simulation_input`, laid out like `Turing.process_input` does.
+
+        Args:
+            simulation_input: The input symbols.
+            state (int): Index of the state to start in.
+            max_steps: The step budget, may be `math.inf`.
+        """
+        compiled, tape = self.compiled.new_tape(simulation_input)
+        if compiled is not self.compiled:
+            self.compiled = compiled
+            self.transitions.clear()
+        size = self.block_size
+        blank_block = (0,) * size
+
+        # Absolute cell c lives in block c // size, the initial tape covers cells 0..n+1
+        initial = list(tape.cells[tape.lo:tape.hi + 1])
+        initial += [0] * (-len(initial) % size)
+        blocks = [tuple(initial[start:start + size]) for start in range(0, len(initial), size)]
+        head_block, offset = divmod(tape.head - tape.lo, size)
+        left: List[List] = []
+        right: List[List] = []
+        for block in blocks[:head_block]:
+            self._push(left, block, 1)
+        for block in reversed(blocks[head_block + 1:]):
+            self._push(right, block, 1)
+        block = blocks[head_block]
+        leftmost_cell, rightmost_cell = 0, tape.hi - tape.lo
+
+        steps = 0
+        looping = False
+        while True:
+            outcome, state, block, offset, taken, low, high = self.simulate_block(
+                state, block, offset, max_steps - steps)
+            steps += taken
+            leftmost_cell = min(leftmost_cell, head_block * size + low)
+            rightmost_cell = max(rightmost_cell, head_block * size + high)
+            if outcome not in (EXIT_LEFT, EXIT_RIGHT):
+                looping = looping or outcome == LOOP
+                break
+
+            # Leave the block, then skip every following block the machine sweeps alike
+            direction = outcome
+            behind, ahead = (left, right) if direction == EXIT_RIGHT else (right, left)
+            self._push(behind, block, 1)
+            head_block += direction
+            offset = 0 if direction == EXIT_RIGHT else size - 1
+            block, available = ahead[-1] if ahead else (blank_block, math.inf)
+
+            sweep = self.simulate_block(state, block, offset)
+            if sweep[0] == direction and sweep[1] == state:
+                # Sweeping over the blank tape forever
+                looping = looping or available == math.inf
+                if available == math.inf and max_steps == math.inf:
+                    leftmost_cell = min(leftmost_cell, head_block * size + offset)
+                    rightmost_cell = max(rightmost_cell, head_block * size + offset)
+                    break
+                repeat = min(available, (max_steps - steps) // sweep[4])
+                if repeat > 0:
+                    repeat = int(repeat)
+                    self._pop(ahead, repeat)
+                    self._push(behind, sweep[2], repeat)
+                    steps += repeat * sweep[4]
+                    first, last = head_block, head_block + direction * (repeat - 1)
+                    leftmost_cell = min(leftmost_cell, min(first, last) * size + sweep[5])
+                    rightmost_cell = max(rightmost_cell, max(first, last) * size + sweep[6])
+                    head_block += direction * repeat
+
+            block = ahead[-1][0] if ahead else blank_block
+            self._pop(ahead)
+
+        head_cell = head_block * size + offset
+        symbols = compiled.symbols
+        runs = [([symbols[code] for code in run_block], count) for run_block, count in left]
+        runs.append(([symbols[code] for code in block], 1))
+        runs.extend(([symbols[code] for code in run_block], count) for run_block, count in reversed(right))
+
+        halted = outcome == HALTED
+        final_state = compiled.states[state]
+        return AcceleratedRun(
+            halted=halted,
+            accepted=halted and bool(getattr(final_state, "is_final", False)),
+            looping=looping,
+            state=final_state.name,
+            steps=steps,
+            head_position=head_cell - leftmost_cell,
+            runs=runs,
+            first_cell=(head_block - sum(count for _, count in left)) * size,
+            visited=(leftmost_cell, rightmost_cell),
+            blank=compiled.blank,
+        )
+
+    @staticmethod
+    def _push(stack: List[List], block: Block, count: int) -> None:
+        if stack and stack[-1][0] == block:
+            stack[-1][1] += count
+        else:
+            stack.append([block, count])
+
+    @staticmethod
+    def _pop(stack: List[List], count: int = 1) -> None:
+        """Removes `count` blocks from the run nearest to the head, if the stack is not blank tape."""
+        if not stack:
+            return
+        stack[-1][1] -= count
+        if stack[-1][1] == 0:
+            stack.pop()
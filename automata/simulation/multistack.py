@@ -0,0 +1,410 @@
+"""
+Simulation engine for pushdown automata with several stacks.
+
+Transitions are compiled into per-state dicts keyed by `(input symbol, pattern)`, where
+`pattern` holds the code of the top symbol every stack must have (-1 for an empty stack),
+or `ANY` for a stack the transition does not read. A step looks up the actual tops once
+per distinct set of read stacks in the state, usually once or twice, so the tables stay
+as large as the transition list however many stacks and stack symbols there are.
+
+Deterministic runs keep one compact array per stack. Nondeterministic runs share stacks
+between configurations: every stack is a hash-consed linked list whose nodes are
+integers, so pushing and popping never copy a stack and a configuration
+`(state, stack IDs)` can be hashed and deduplicated in constant time.
+"""
+
+import sys
+from array import array
+from operator import itemgetter
+from typing import Callable, Dict, Generator, Iterable, List, Optional, Set, Tuple, Union
+
+from automata.simulation.cooperative import run_to_completion
+
+# Pop the top symbol of a stack (or not) and push codes in push order
+StackOperation = Tuple[bool, Tuple[int, ...]]
+Move = Tuple[int, Tuple[StackOperation, ...], int]
+
+EMPTY = -1  # Top code of an empty stack
+ANY = -2  # Pattern code of a stack a transition does not read
+CUT_OFF = -1  # Budget left once a transition was needed after the budget ran out
+
+
+def _no_tops(tops: Tuple[int, ...]) -> Tuple[int, ...]:
+    return ()
+
+
+class CompiledMultiStackPDA:
+    """
+    Indexed transition tables for a `MultiStackPDA`.
+
+    Attributes:
+        states (List[State]): The automaton's states, position in the list is the state index.
+        state_index (Dict[State, int]): Maps a state object to its index.
+        final (List[bool]): Whether the state with a given index is final.
+        stack_symbols (List[str]): Interned stack symbols shared by all stacks.
+        stack_codes (Dict[str, int]): Maps a stack symbol to its code.
+        transitions (List[MultiStackPDATransition]): All transitions, position in the
+            list is the transition index.
+        table (List[Dict[Tuple[str, Tuple[int, ...]], Tuple[Move, ...]]]): For every
+            state, maps `(input symbol, pattern)` to `(target index, stack operations,
+            transition index)` triples. Epsilon transitions use the input symbol ''.
+    """
+
+    def __init__(self, automaton):
+        self.stack_count = automaton.stack_amount
+        self.stack_names = list(automaton.stack_names)
+        self.states = list(automaton.states.values())
+        self.state_index = {state: index for index, state in enumerate(self.states)}
+        self.final = [bool(getattr(state, "is_final", False)) for state in self.states]
+        self.stack_symbols: List[str] = []
+        self.stack_codes: Dict[str, int] = {}
+
+        for symbol in sorted(automaton.stack_alphabet, key=str):
+            self.intern(symbol)
+        for stack in automaton.initial_stacks:
+            for symbol in stack:
+                self.intern(symbol)
+
+        self.transitions = []
+        self.table = []
+        # For every state and distinct set of stacks its transitions read, a function
+        # picking the tops of those stacks and a dict keyed by (input symbol, those tops)
+        self._lookups = []
+        for state in self.states:
+            entries: Dict[Tuple[str, Tuple[int, ...]], List[Move]] = {}
+            for transition in state.transitions.values():
+                for single in (transition if isinstance(transition, list) else [transition]):
+                    pattern = []
+                    operations = []
+                    for name in self.stack_names:
+                        stack_symbol, stack_push = single.stack_operations[name]
+                        pop = stack_symbol is not None
+                        pattern.append(self.intern(stack_symbol) if pop else ANY)
+                        operations.append((pop, tuple(self.intern(symbol) for symbol in reversed(stack_push))))
+                    move = (self.state_index[single.target], tuple(operations), len(self.transitions))
+                    self.transitions.append(single)
+                    entries.setdefault((single.symbol, tuple(pattern)), []).append(move)
+            self.table.append({key: tuple(moves) for key, moves in entries.items()})
+
+            lookups: Dict[Tuple[int, ...], Tuple[Callable, Dict]] = {}
+            for (symbol, pattern), moves in self.table[-1].items():
+                read = tuple(index for index, code in enumerate(pattern) if code != ANY)
+                if read not in lookups:
+                    lookups[read] = (itemgetter(*read) if read else _no_tops), {}
+                pick, by_tops = lookups[read]
+                by_tops[symbol, pick(pattern)] = moves
+            self._lookups.append(tuple(lookups.values()))
+
+        if automaton.deterministic:
+            self._check_determinism()
+
+    def compile(self):
+        return self
+
+    def intern(self, symbol: str) -> int:
+        """Returns the code of a stack symbol, assigning a new one if it is unknown."""
+        code = self.stack_codes.get(symbol)
+        if code is None:
+            code = len(self.stack_symbols)
+            self.stack_symbols.append(symbol)
+            self.stack_codes[symbol] = code
+        return code
+
+    def moves(self, state: int, symbol: str, tops: Tuple[int, ...]) -> Optional[Tuple[Move, ...]]:
+        """Returns the moves for `symbol` ('' for epsilon) that apply on the stack `tops`, or None."""
+        found = None
+        for pick, by_tops in self._lookups[state]:
+            moves = by_tops.get((symbol, pick(tops)))
+            if moves:
+                found = moves if found is None else found + moves
+        return found
+
+    def _check_determinism(self):
+        for index, entries in enumerate(self.table):
+            keys = list(entries)
+            for position, (symbol, pattern) in enumerate(keys):
+                conflicts = [(other_symbol, other) for other_symbol, other in keys[position + 1:]
+                             if other_symbol in (symbol, "") or symbol == ""]
+                if len(entries[symbol, pattern]) > 1:
+                    conflicts.insert(0, (symbol, pattern))
+                for other_symbol, other in conflicts:
+                    if all(ANY in (mine, theirs) or mine == theirs for mine, theirs in zip(pattern, other)):
+                        name = self.states[index].name
+                        tops = tuple(theirs if mine == ANY else mine for mine, theirs in zip(pattern, other))
+                        raise ValueError(f"Nondeterministic transitions in state '{name}' for input "
+                                         f"'{symbol or other_symbol}' and stack tops {self.decode_tops(tops)}")
+
+    def decode_tops(self, tops: Tuple[int, ...]) -> Tuple[Union[str, None], ...]:
+        """Decodes stack tops or a pattern, with None for an empty stack and '*' for any top."""
+        return tuple(self.stack_symbols[top] if top >= 0 else None if top == EMPTY else '*' for top in tops)
+
+    # Deterministic simulation
+
+    def new_stacks(self, initial_stacks: Iterable[Iterable[str]]) -> List[array]:
+        """Returns one compact array of stack symbol codes per stack."""
+        typecode = 'B' if len(self.stack_symbols) <= 0xFF else 'H' if len(self.stack_symbols) <= 0xFFFF else 'I'
+        return [array(typecode, (self.intern(symbol) for symbol in stack)) for stack in initial_stacks]
+
+    @staticmethod
+    def _apply(operations: Tuple[StackOperation, ...], stacks: List[array]) -> None:
+        for stack, (pop, push) in zip(stacks, operations):
+            if pop:
+                stack.pop()
+            if push:
+                stack.extend(push)
+
+    def follow_epsilon(self, state: int, stacks: List[array], budget: List[int]) -> int:
+        """
+        Follows epsilon transitions on `stacks` in place and returns the resulting state.
+
+        A chain provably loops forever if it reaches the same state with the same tops
+        again and no stack was shorter in between (at the start of a step) than at the
+        earlier visit: whatever happened in between never looked below those tops, so it
+        happens again. Visits for which a stack has since been shorter can never match
+        again and are dropped as the stacks shrink, so the check takes constant
+        amortized time per step. Chains that repeat a configuration exactly while some
+        stack dips below its length in between are caught by comparing with snapshots
+        of the stacks taken at exponentially spaced steps, like Brent's cycle detection.
+
+        `budget` holds the number of transitions left and is set to `CUT_OFF` if an
+        epsilon transition applies once it is spent.
+
+        Raises:
+            ValueError: If the epsilon transitions provably loop forever.
+        """
+        lookup = self.moves
+        # Number of visits per (state, tops) that no stack has been shorter than since
+        live: Dict[Tuple[int, Tuple[int, ...]], int] = {}
+        keys: List[Tuple[int, Tuple[int, ...]]] = []
+        dead: List[bool] = []
+        # Per stack, the visits still live for it, with their lengths, oldest first.
+        # Their lengths are nondecreasing, so the visits a shorter stack ends are a suffix
+        pending: List[List[Tuple[int, int]]] = [[] for _ in stacks]
+        snapshot, power, distance = None, 1, 1
+
+        while True:
+            tops = tuple(stack[-1] if stack else EMPTY for stack in stacks)
+            moves = lookup(state, "", tops)
+            if moves is None:
+                return state
+            if budget[0] <= 0:
+                budget[0] = CUT_OFF
+                return state
+
+            for stack, visits in zip(stacks, pending):
+                length = len(stack)
+                while visits and visits[-1][0] > length:
+                    visit = visits.pop()[1]
+                    if not dead[visit]:
+                        dead[visit] = True
+                        live[keys[visit]] -= 1
+            key = (state, tops)
+            if live.get(key):
+                raise ValueError(f"Epsilon transitions starting in state "
+                                 f"'{self.states[state].name}' never terminate")
+            lengths = tuple(len(stack) for stack in stacks)
+            if snapshot is not None and snapshot[:2] == (state, lengths) \
+                    and all(stack.tobytes() == saved for stack, saved in zip(stacks, snapshot[2])):
+                raise ValueError(f"Epsilon transitions starting in state "
+                                 f"'{self.states[state].name}' never terminate")
+            if distance == power:
+                snapshot = (state, lengths, [stack.tobytes() for stack in stacks])
+                power *= 2
+                distance = 0
+            distance += 1
+
+            visit = len(keys)
+            keys.append(key)
+            dead.append(False)
+            live[key] = live.get(key, 0) + 1
+            for length, visits in zip(lengths, pending):
+                visits.append((length, visit))
+
+            target, operations, _ = moves[0]
+            self._apply(operations, stacks)
+            state = target
+            budget[0] -= 1
+
+    def run_deterministic(self, state: int, stacks: List[array], simulation_input: Iterable[str],
+                          alphabet: Set[str], max_steps: Union[int, None] = None) -> Tuple[int, int, bool]:
+        """
+        Runs a deterministic automaton on `stacks` in place.
+
+        Returns:
+            Tuple[int, int, bool]: The final state index, the number of consumed input
+            symbols and whether a transition was cut off by the step budget.
+        """
+        return run_to_completion(self.iter_deterministic(state, stacks, simulation_input, alphabet, max_steps))
+
+    def iter_deterministic(self, state: int, stacks: List[array], simulation_input: Iterable[str],
+                           alphabet: Set[str], max_steps: Union[int, None] = None,
+                           chunk_steps: Optional[int] = None) -> Generator[int, None, Tuple[int, int, bool]]:
+        """
+        `run_deterministic` as a generator that yields the number of steps taken so far
+        between input symbols, whenever at least `chunk_steps` more steps were taken.
+        """
+        lookup = self.moves
+        apply = self._apply
+        start = max_steps if max_steps is not None else sys.maxsize
+        budget = [start]
+        next_yield = chunk_steps
+        consumed = 0
+
+        state = self.follow_epsilon(state, stacks, budget)
+        for symbol in simulation_input:
+            if budget[0] == CUT_OFF:
+                break
+            if next_yield is not None and start - budget[0] >= next_yield:
+                yield start - budget[0]
+                next_yield = start - budget[0] + chunk_steps
+            if symbol not in alphabet:
+                break
+            moves = lookup(state, symbol, tuple(stack[-1] if stack else EMPTY for stack in stacks))
+            if moves is None:
+                break
+            if budget[0] <= 0:
+                budget[0] = CUT_OFF
+                break
+            target, operations, _ = moves[0]
+            apply(operations, stacks)
+            budget[0] -= 1
+            consumed += 1
+            state = self.follow_epsilon(target, stacks, budget)
+
+        return state, consumed, budget[0] == CUT_OFF
+
+    # Nondeterministic simulation
+
+    def run_nondeterministic(self, state: int, initial_stacks: Iterable[Iterable[str]],
+                             simulation_input: Iterable[str], alphabet: Set[str],
+                             max_steps: Union[int, None] = None
+                             ) -> Tuple[Set[Tuple[int, Tuple[int, ...]]], 'SharedStacks', int, bool]:
+        """
+        Explores all runs of a nondeterministic automaton, deduplicating configurations.
+
+        Returns:
+            Tuple: The configurations `(state index, stack IDs)` reached after the last
+            consumed symbol, the `SharedStacks` the IDs refer to, the number of consumed
+            input symbols and whether a transition was cut off by the step budget.
+        """
+        return run_to_completion(self.iter_nondeterministic(state, initial_stacks, simulation_input,
+                                                            alphabet, max_steps))
+
+    def iter_nondeterministic(self, state: int, initial_stacks: Iterable[Iterable[str]],
+                              simulation_input: Iterable[str], alphabet: Set[str],
+                              max_steps: Union[int, None] = None, chunk_steps: Optional[int] = None
+                              ) -> Generator[int, None, Tuple[Set[Tuple[int, Tuple[int, ...]]],
+                                                              'SharedStacks', int, bool]]:
+        """
+        `run_nondeterministic` as a generator that yields the number of steps taken so
+        far between input symbols, whenever at least `chunk_steps` more steps were taken.
+        """
+        stacks = SharedStacks()
+        start = max_steps if max_steps is not None else sys.maxsize
+        budget = [start]
+        next_yield = chunk_steps
+        initial = (state, tuple(stacks.from_symbols(self.intern(symbol) for symbol in stack)
+                                for stack in initial_stacks))
+        configurations = self._closure({initial}, stacks, budget)
+        consumed = 0
+
+        for symbol in simulation_input:
+            if budget[0] == CUT_OFF or symbol not in alphabet:
+                break
+            if next_yield is not None and start - budget[0] >= next_yield:
+                yield start - budget[0]
+                next_yield = start - budget[0] + chunk_steps
+            next_configurations = set()
+            for current_state, stack_ids in configurations:
+                moves = self.moves(current_state, symbol, stacks.tops(stack_ids))
+                if moves:
+                    if budget[0] < len(moves):
+                        budget[0] = CUT_OFF
+                        break
+                    for target, operations, _ in moves:
+                        next_configurations.add((target, stacks.apply(stack_ids, operations)))
+                        budget[0] -= 1
+            if budget[0] == CUT_OFF or not next_configurations:
+                break
+            configurations = self._closure(next_configurations, stacks, budget)
+            consumed += 1
+
+        return configurations, stacks, consumed, budget[0] == CUT_OFF
+
+    def _closure(self, configurations: Set[Tuple[int, Tuple[int, ...]]], stacks: 'SharedStacks',
+                 budget: List[int]) -> Set[Tuple[int, Tuple[int, ...]]]:
+        lookup = self.moves
+        to_process = list(configurations)
+        while to_process:
+            state, stack_ids = to_process.pop()
+            moves = lookup(state, "", stacks.tops(stack_ids))
+            if not moves:
+                continue
+            if budget[0] < len(moves):
+                budget[0] = CUT_OFF
+                return configurations
+            for target, operations, _ in moves:
+                configuration = (target, stacks.apply(stack_ids, operations))
+                budget[0] -= 1
+                if configuration not in configurations:
+                    configurations.add(configuration)
+                    to_process.append(configuration)
+        return configurations
+
+
+class SharedStacks:
+    """
+    Persistent stacks shared between configurations.
+
+    Every stack is identified by the integer ID of its top node, nodes are hash-consed on
+    `(top symbol code, ID of the rest)`. Equal stacks therefore always have equal IDs, and
+    pushing, popping and comparing stacks never copies them. ID 0 is the empty stack.
+    """
+
+    def __init__(self):
+        self.top = array('i', [EMPTY])
+        self.rest = array('i', [0])
+        self.depth = array('i', [0])
+        self.nodes: Dict[Tuple[int, int], int] = {}
+
+    def push(self, stack_id: int, code: int) -> int:
+        key = (code, stack_id)
+        node = self.nodes.get(key)
+        if node is None:
+            node = len(self.top)
+            self.top.append(code)
+            self.rest.append(stack_id)
+            self.depth.append(self.depth[stack_id] + 1)
+            self.nodes[key] = node
+        return node
+
+    def from_symbols(self, codes: Iterable[int]) -> int:
+        """Returns the ID of the stack holding `codes`, bottom first."""
+        stack_id = 0
+        for code in codes:
+            stack_id = self.push(stack_id, code)
+        return stack_id
+
+    def to_symbols(self, stack_id: int) -> List[int]:
+        """Returns the codes on a stack, bottom first."""
+        codes = []
+        while stack_id:
+            codes.append(self.top[stack_id])
+            stack_id = self.rest[stack_id]
+        codes.reverse()
+        return codes
+
+    def tops(self, stack_ids: Tuple[int, ...]) -> Tuple[int, ...]:
+        top = self.top
+        return tuple(top[stack_id] for stack_id in stack_ids)
+
+    def apply(self, stack_ids: Tuple[int, ...], operations: Tuple[StackOperation, ...]) -> Tuple[int, ...]:
+        rest = self.rest
+        result = []
+        for stack_id, (pop, push) in zip(stack_ids, operations):
+            if pop:
+                stack_id = rest[stack_id]
+            for code in push:
+                stack_id = self.push(stack_id, code)
+            result.append(stack_id)
+        return tuple(result)
@@ -0,0 +1,144 @@
+"""
+Compiled transition table for Turing machines with several tapes.
+
+Tape symbols are interned once for all tapes, with the blank symbol as code 0. The
+symbols under all heads are packed into a single integer, `sum(code_i * K**i)` for `K`
+symbols, and the table maps `state * K**tapes + packed symbols` to the transition, so
+every step is a single lookup no matter how many tapes there are. Every tape is a
+`Tape`, which grows in amortized O(1) at both ends.
+"""
+
+import sys
+from typing import Dict, List, Tuple, Iterable
+
+from automata.simulation.tape import Tape, MAX_SYMBOLS
+from automata.simulation.turing import MOVES
+
+# Target state index, codes to write and head movements, one per tape
+Entry = Tuple[int, Tuple[int, ...], Tuple[int, ...]]
+
+
+class CompiledMultiTapeTuring:
+    """
+    Indexed transition table of a multi-tape Turing machine.
+
+    Attributes:
+        states (List[State]): The machine's states, position in the list is the state index.
+        state_index (Dict[State, int]): Maps a state object to its index.
+        tape_count (int): The number of tapes.
+        blank (str): The blank symbol, always code 0.
+        symbols (List[str]): The tape symbols, position in the list is the code.
+        weights (Tuple[int, ...]): The factor of every tape's code in a packed key.
+        row_size (int): Number of keys per state, `len(symbols) ** tape_count`.
+        table (Dict[int, Entry]): Maps `state * row_size + packed symbols` to a transition.
+    """
+
+    def __init__(self, states, tape_count: int, blank: str, symbols: List[str],
+                 transitions: List[Tuple[int, Tuple[int, ...], int, Tuple[int, ...], Tuple[int, ...]]]):
+        if len(symbols) > MAX_SYMBOLS:
+            raise ValueError(f"A Turing machine can use at most {MAX_SYMBOLS} different tape symbols")
+        self.states = states
+        self.state_index = {state: index for index, state in enumerate(states)}
+        self.tape_count = tape_count
+        self.blank = blank
+        self.symbols = symbols
+        self.codes: Dict[str, int] = {symbol: code for code, symbol in enumerate(symbols)}
+        self.weights = tuple(len(symbols) ** tape for tape in range(tape_count))
+        self.row_size = len(symbols) ** tape_count
+        self._transitions = transitions
+        self.table: Dict[int, Entry] = {
+            source * self.row_size + self.pack(reads): (target, writes, moves)
+            for source, reads, target, writes, moves in transitions
+        }
+
+    @classmethod
+    def from_machine(cls, machine) -> 'CompiledMultiTapeTuring':
+        states = list(machine.states.values())
+        state_index = {state: index for index, state in enumerate(states)}
+
+        used = set(machine.stack_alphabet) | set(machine.alphabet)
+        for state in states:
+            for transition in state.transitions.values():
+                used.update(transition.tape_symbols)
+                used.update(transition.tape_writes)
+        used.discard(machine.blank_symbol)
+        symbols = [machine.blank_symbol] + sorted(used, key=str)
+        codes = {symbol: code for code, symbol in enumerate(symbols)}
+
+        transitions = []
+        for index, state in enumerate(states):
+            for transition in state.transitions.values():
+                transitions.append((
+                    index,
+                    tuple(codes[symbol] for symbol in transition.tape_symbols),
+                    state_index[transition.target],
+                    tuple(codes[symbol] for symbol in transition.tape_writes),
+                    tuple(MOVES.get(move, 0) for move in transition.moves),
+                ))
+        return cls(states, machine.tape_count, machine.blank_symbol, symbols, transitions)
+
+    def compile(self):
+        return self
+
+    def pack(self, codes: Iterable[int]) -> int:
+        return sum(code * weight for code, weight in zip(codes, self.weights))
+
+    def extended(self, symbols: List[str]) -> 'CompiledMultiTapeTuring':
+        """Returns a table that also covers `symbols`, which must start with this table's symbols."""
+        return type(self)(self.states, self.tape_count, self.blank, list(symbols), self._transitions)
+
+    def new_tapes(self, simulation_input: Iterable[str]) -> Tuple['CompiledMultiTapeTuring', List[Tape]]:
+        """
+        Creates the tapes for a run on `simulation_input`. The first tape is laid out like
+        `Turing.process_input` does (a blank, the input and another blank, with the head on
+        the first input cell), the other tapes start as a single blank cell.
+
+        Returns:
+            Tuple[CompiledMultiTapeTuring, List[Tape]]: The table to run on the tapes
+            (extended if the input contains symbols unknown to the machine) and the tapes.
+        """
+        first = Tape(self.blank, [self.blank, *simulation_input, self.blank], head=1, symbols=self.symbols)
+        compiled = self if len(first.symbols) == len(self.symbols) else self.extended(first.symbols)
+        tapes = [first] + [Tape(self.blank, [self.blank], symbols=compiled.symbols)
+                           for _ in range(self.tape_count - 1)]
+        return compiled, tapes
+
+    def run(self, tapes: List[Tape], state: int, max_steps) -> Tuple[int, int, bool]:
+        """
+        Runs the machine on `tapes` in place for at most `max_steps` steps.
+
+        Args:
+            tapes (List[Tape]): One tape per head, with codes matching `symbols`.
+            state (int): Index of the state to start in.
+            max_steps: The step budget, may be `float('inf')`.
+
+        Returns:
+            Tuple[int, int, bool]: The index of the current state, the number of steps
+            taken and whether the machine halted (no transition applied).
+        """
+        if max_steps == float('inf'):
+            max_steps = sys.maxsize
+
+        table = self.table
+        row_size = self.row_size
+        pairs = list(zip(tapes, self.weights))
+        halted = False
+
+        steps = 0
+        for steps in range(max_steps):
+            key = state * row_size
+            for tape, weight in pairs:
+                key += tape.cells[tape.head] * weight
+            entry = table.get(key)
+            if entry is None:
+                halted = True
+                break
+            state, writes, moves = entry
+            for tape, code, move in zip(tapes, writes, moves):
+                tape.cells[tape.head] = code
+                if move:
+                    tape.move(move)
+        else:
+            steps = max_steps
+
+        return state, steps, halted
@@ -0,0 +1,304 @@
+"""
+Simulation engine for nondeterministic single-tape Turing machines.
+
+Every branch of a run has its own tape, so tapes are persistent: a tape is a tuple of
+IDs of fixed-size segments, and segments are hash-consed in a `SegmentStore`, so equal
+segments are stored once. A write copies one segment and the tuple of IDs, while every
+other segment stays shared with the branches it came from, and a transition that writes
+back the symbol it read shares the whole tape. Blank segments at either end are
+dropped, so every tape has a single canonical form and a configuration
+`(state, head, base, segment IDs)` can be hashed and compared to prune duplicates.
+
+Runs are explored breadth first, or by iterative deepening, which only keeps the
+current path and a bounded transposition table in memory, at the price of exploring
+the configurations near the start again in every search.
+"""
+
+from dataclasses import dataclass
+from typing import Dict, Generator, Iterable, List, Optional, Tuple
+
+from automata.simulation.tape import MAX_SYMBOLS
+from automata.simulation.turing import MOVES
+
+SEGMENT = 64  # Cells per tape segment
+TRANSPOSITION_TABLE_SIZE = 1 << 16  # Configurations iterative deepening remembers by default
+
+# Index of the first segment and the segment IDs, without blank segments at either end
+SharedTape = Tuple[int, Tuple[int, ...]]
+Configuration = Tuple[int, int, int, Tuple[int, ...]]  # state, head, base, segment IDs
+Move = Tuple[int, int, int]  # target state, code to write, head movement
+
+
+class SegmentStore:
+    """
+    Hash-consed tape segments. The blank segment always has ID 0.
+
+    Attributes:
+        segments (List[bytes]): The segments, position in the list is the ID.
+    """
+
+    def __init__(self):
+        self.segments: List[bytes] = [bytes(SEGMENT)]
+        self._ids: Dict[bytes, int] = {self.segments[0]: 0}
+
+    def intern(self, segment: bytes) -> int:
+        segment_id = self._ids.get(segment)
+        if segment_id is None:
+            segment_id = self._ids[segment] = len(self.segments)
+            self.segments.append(segment)
+        return segment_id
+
+    def tape(self, codes: Iterable[int]) -> SharedTape:
+        """Creates a tape holding `codes` from position 0 on."""
+        codes = bytes(codes)
+        ids = tuple(self.intern(codes[start:start + SEGMENT].ljust(SEGMENT, b'\0'))
+                    for start in range(0, len(codes), SEGMENT))
+        return _trimmed(0, ids)
+
+    def read(self, tape: SharedTape, position: int) -> int:
+        base, ids = tape
+        index = position // SEGMENT - base
+        if 0 <= index < len(ids):
+            return self.segments[ids[index]][position % SEGMENT]
+        return 0
+
+    def write(self, tape: SharedTape, position: int, code: int) -> SharedTape:
+        """Returns the tape with `code` at `position`, sharing all other segments."""
+        base, ids = tape
+        index = position // SEGMENT
+        if not ids:
+            base, ids = index, (0,)
+        elif index < base:
+            ids = (0,) * (base - index) + ids
+            base = index
+        elif index >= base + len(ids):
+            ids = ids + (0,) * (index - base - len(ids) + 1)
+        index -= base
+        segment = bytearray(self.segments[ids[index]])
+        segment[position % SEGMENT] = code
+        return _trimmed(base, ids[:index] + (self.intern(bytes(segment)),) + ids[index + 1:])
+
+    def span(self, tape: SharedTape) -> Tuple[int, int]:
+        """The positions of the first and last non-blank cell, `(0, -1)` for a blank tape."""
+        base, ids = tape
+        if not ids:
+            return 0, -1
+        first, last = self.segments[ids[0]], self.segments[ids[-1]]
+        start = base * SEGMENT + len(first) - len(first.lstrip(b'\0'))
+        end = (base + len(ids) - 1) * SEGMENT + len(last.rstrip(b'\0')) - 1
+        return start, end
+
+    def cells(self, tape: SharedTape, start: int, end: int) -> List[int]:
+        return [self.read(tape, position) for position in range(start, end + 1)]
+
+
+def _trimmed(base: int, ids: Tuple[int, ...]) -> SharedTape:
+    start, end = 0, len(ids)
+    while start < end and ids[start] == 0:
+        start += 1
+    while end > start and ids[end - 1] == 0:
+        end -= 1
+    if start == end:
+        return 0, ()
+    if start or end < len(ids):
+        return base + start, ids[start:end]
+    return base, ids
+
+
+@dataclass
+class Exploration:
+    """
+    Outcome of exploring the runs of a nondeterministic Turing machine.
+
+    Attributes:
+        accepted (bool): Whether some run halted in a final state.
+        configuration (Optional[Configuration]): The accepting configuration.
+        steps (int): Length of the accepting run, or the depth explored.
+        explored (int): Number of configurations explored. Iterative deepening counts a
+                        configuration again in every search that reaches it.
+        exhausted (bool): Whether the exploration stopped at the step or configuration
+                          budget with runs left unexplored. If not, a rejection is final.
+    """
+    accepted: bool
+    configuration: Optional[Configuration]
+    steps: int
+    explored: int
+    exhausted: bool
+
+
+class CompiledNTM:
+    """
+    Transition table of a nondeterministic Turing machine.
+
+    Attributes:
+        states (List[State]): The machine's states, position in the list is the state index.
+        state_index (Dict[State, int]): Maps a state object to its index.
+        final (List[bool]): Whether the state with a given index is final.
+        blank (str): The blank symbol, always code 0.
+        symbols (List[str]): The tape symbols, position in the list is the code.
+        codes (Dict[str, int]): Maps a symbol to its code.
+        table (List[Tuple[Move, ...]]): The moves applicable at `state * len(symbols) + code`.
+    """
+
+    def __init__(self, machine):
+        self.states = list(machine.states.values())
+        self.state_index = {state: index for index, state in enumerate(self.states)}
+        self.final = [bool(getattr(state, "is_final", False)) for state in self.states]
+        self.blank = machine.blank_symbol
+
+        used = set(machine.stack_alphabet) | set(machine.alphabet)
+        for state in self.states:
+            for transitions in state.transitions.values():
+                for transition in transitions:
+                    used.add(transition.tape_symbol)
+                    used.add(transition.tape_write)
+        used.discard(self.blank)
+        self.symbols = [self.blank] + sorted(used, key=str)
+        self.codes = {symbol: code for code, symbol in enumerate(self.symbols)}
+        self._build_table()
+
+    def _build_table(self) -> None:
+        if len(self.symbols) > MAX_SYMBOLS:
+            raise ValueError(f"A Turing machine can use at most {MAX_SYMBOLS} different tape symbols")
+        symbol_count = len(self.symbols)
+        table: List[List[Move]] = [[] for _ in range(len(self.states) * symbol_count)]
+        for index, state in enumerate(self.states):
+            for transitions in state.transitions.values():
+                for transition in transitions:
+                    table[index * symbol_count + self.codes[transition.tape_symbol]].append((
+                        self.state_index[transition.target],
+                        self.codes[transition.tape_write],
+                        MOVES.get(transition.move, 0),
+                    ))
+        self.table = [tuple(moves) for moves in table]
+
+    def compile(self):
+        return self
+
+    def initial(self, simulation_input: Iterable[str], state: int,
+                store: SegmentStore) -> Configuration:
+        """
+        Returns the initial configuration, with the tape laid out like `Turing.process_input`
+        does: a blank, the input and another blank, with the head on the first input cell.
+        Symbols unknown to the machine are added to the table.
+        """
+        codes = []
+        for symbol in simulation_input:
+            if symbol not in self.codes:
+                self.codes[symbol] = len(self.symbols)
+                self.symbols.append(symbol)
+                self._build_table()
+            codes.append(self.codes[symbol])
+        base, ids = store.tape([0, *codes, 0])
+        return state, 1, base, ids
+
+    def successors(self, configuration: Configuration, store: SegmentStore) -> Iterable[Configuration]:
+        state, head, base, ids = configuration
+        tape = (base, ids)
+        read = store.read(tape, head)
+        for target, write, move in self.table[state * len(self.symbols) + read]:
+            new_base, new_ids = tape if write == read else store.write(tape, head, write)
+            yield target, head + move, new_base, new_ids
+
+    def breadth_first(self, start: Configuration, store: SegmentStore, max_steps=None,
+                      max_configurations: Optional[int] = None, chunk_steps: Optional[int] = None,
+                      max_explored: Optional[int] = None) -> Generator[int, None, Exploration]:
+        """
+        Explores all runs level by level, so an accepting run found is a shortest one.
+
+        Yields the number of configurations explored so far every `chunk_steps`
+        configurations, see `automata.simulation.cooperative`, and stops with the runs
+        left unexplored once `max_explored` configurations have been explored.
+        """
+        final, table, symbol_count = self.final, self.table, len(self.symbols)
+        seen = {start}
+        level = [start]
+        explored = 0
+        next_yield = chunk_steps
+        depth = 0
+        exhausted = False
+        while level:
+            next_level = []
+            for configuration in level:
+                if max_explored is not None and explored >= max_explored:
+                    return Exploration(False, None, depth, explored, True)
+                state, head, base, ids = configuration
+                explored += 1
+                if not table[state * symbol_count + store.read((base, ids), head)]:
+                    if final[state]:
+                        return Exploration(True, configuration, depth, explored, False)
+                    continue
+                if max_steps is not None and depth >= max_steps:
+                    exhausted = True
+                    continue
+                for successor in self.successors(configuration, store):
+                    if successor not in seen:
+                        seen.add(successor)
+                        next_level.append(successor)
+                if next_yield is not None and explored >= next_yield:
+                    yield explored
+                    next_yield = explored + chunk_steps
+            if max_configurations is not None and len(seen) > max_configurations:
+                return Exploration(False, None, depth, explored, True)
+            level = next_level
+            depth += 1
+        return Exploration(False, None, depth, explored, exhausted)
+
+    def iterative_deepening(self, start: Configuration, store: SegmentStore, max_steps=None,
+                            max_configurations: Optional[int] = None, chunk_steps: Optional[int] = None,
+                            max_explored: Optional[int] = None) -> Generator[int, None, Exploration]:
+        """
+        Explores all runs depth first with a depth limit that grows by one until a run
+        accepts, no run reaches the limit or the limit passes `max_steps`, so an
+        accepting run found is a shortest one. Every search starts over from `start`,
+        which makes runs of length n cost O(n^2) steps instead of O(n).
+
+        Only the configurations on the current path are kept, plus a transposition
+        table of up to `max_configurations` (default `TRANSPOSITION_TABLE_SIZE`)
+        configurations with the smallest depth they were reached at, which prunes
+        configurations reached again at the same or a larger depth. Once the table is
+        full, further configurations are explored again whenever they are reached.
+
+        Yields like `breadth_first`.
+        """
+        final, table, symbol_count = self.final, self.table, len(self.symbols)
+        table_size = TRANSPOSITION_TABLE_SIZE if max_configurations is None else max_configurations
+        explored = 0
+        next_yield = chunk_steps
+        limit = 0
+        while True:
+            depths: Dict[Configuration, int] = {}
+            # The successors still to explore of every configuration on the current path
+            path = [iter((start,))]
+            cut = False
+            while path:
+                configuration = next(path[-1], None)
+                if configuration is None:
+                    path.pop()
+                    continue
+                depth = len(path) - 1
+                reached = depths.get(configuration)
+                if reached is not None and reached <= depth:
+                    continue
+                if max_explored is not None and explored >= max_explored:
+                    return Exploration(False, None, depth, explored, True)
+                if reached is not None or len(depths) < table_size:
+                    depths[configuration] = depth
+                state, head, base, ids = configuration
+                explored += 1
+                if not table[state * symbol_count + store.read((base, ids), head)]:
+                    if final[state]:
+                        return Exploration(True, configuration, depth, explored, False)
+                    continue
+                if depth >= limit:
+                    cut = True
+                    continue
+                path.append(self.successors(configuration, store))
+                if next_yield is not None and explored >= next_yield:
+                    yield explored
+                    next_yield = explored + chunk_steps
+            if not cut:
+                return Exploration(False, None, limit, explored, False)
+            if max_steps is not None and limit >= max_steps:
+                return Exploration(False, None, limit, explored, True)
+            limit += 1
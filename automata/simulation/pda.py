@@ -0,0 +1,529 @@
+"""
+Integer transition tables for pushdown automata.
+
+The object graph built by `add_transition` (states holding dicts of `PDATransition`
+objects) is convenient to construct and export, but slow to simulate: every step has
+to scan all transitions for an input symbol and reject the ones whose stack symbol
+does not match the top of the stack. `CompiledPDA` flattens that graph once into
+per-state dicts keyed by `(input symbol, stack top)`, with states and stack symbols
+interned to integers and stacks represented as tuples of those integers.
+"""
+
+from array import array
+from typing import Dict, Iterable, List, Set, Tuple, Union
+
+from automata.simulation.trace import PDA_FIELDS
+
+Configuration = Tuple[int, Tuple[int, ...]]
+
+
+class CompiledPDA:
+    """
+    Indexed transition tables for a `DPDA` or `NPDA`.
+
+    Attributes:
+        states (List[State]): The automaton's states, position in the list is the state index.
+        state_index (Dict[State, int]): Maps a state object to its index.
+        stack_symbols (List[str]): Interned stack symbols, position in the list is the code.
+        stack_codes (Dict[str, int]): Maps a stack symbol to its code.
+        final (List[bool]): Whether the state with a given index is final.
+        transitions (List[PDATransition]): All transitions, position in the list is the transition index.
+        table (List[Dict[Tuple[str, int], Tuple[Tuple[int, Tuple[int, ...], int], ...]]]):
+            For every state, maps `(input symbol, stack top code)` to the applicable
+            `(target index, pushed codes, transition index)` triples. Pushed codes are
+            stored in push order, so they can be concatenated directly onto the popped
+            stack. Epsilon transitions are stored under the input symbol ''.
+    """
+
+    def __init__(self, automaton):
+        self.states = list(automaton.states.values())
+        self.state_index = {state: index for index, state in enumerate(self.states)}
+        self.final = [bool(getattr(state, "is_final", False)) for state in self.states]
+        self.stack_symbols: List[str] = []
+        self.stack_codes: Dict[str, int] = {}
+
+        for symbol in sorted(automaton.stack_alphabet, key=str):
+            self.intern(symbol)
+
+        self.transitions = []
+        self.table = []
+        for state in self.states:
+            entries: Dict[Tuple[str, int], List[Tuple[int, Tuple[int, ...], int]]] = {}
+            for transitions in state.transitions.values():
+                if not isinstance(transitions, list):
+                    transitions = [transitions]
+                for transition in transitions:
+                    key = (transition.symbol, self.intern(transition.stack_symbol))
+                    push = tuple(self.intern(symbol) for symbol in reversed(transition.stack_push))
+                    entries.setdefault(key, []).append(
+                        (self.state_index[transition.target], push, len(self.transitions))
+                    )
+                    self.transitions.append(transition)
+            self.table.append({key: tuple(moves) for key, moves in entries.items()})
+
+    def compile(self):
+        return self
+
+    def intern(self, symbol: str) -> int:
+        """Returns the code of a stack symbol, assigning a new one if it is unknown."""
+        code = self.stack_codes.get(symbol)
+        if code is None:
+            code = len(self.stack_symbols)
+            self.stack_symbols.append(symbol)
+            self.stack_codes[symbol] = code
+        return code
+
+    def encode_stack(self, stack: Iterable[str]) -> Tuple[int, ...]:
+        return tuple(self.intern(symbol) for symbol in stack)
+
+    def decode_stack(self, stack: Tuple[int, ...]) -> Tuple[str, ...]:
+        symbols = self.stack_symbols
+        return tuple(symbols[code] for code in stack)
+
+    def epsilon_closure(self, configurations: Iterable[Configuration]) -> Set[Configuration]:
+        """
+        Returns all configurations reachable from `configurations` via epsilon transitions,
+        including the configurations themselves.
+        """
+        table = self.table
+        closure = set(configurations)
+        to_process = list(closure)
+
+        while to_process:
+            state, stack = to_process.pop()
+            if not stack:
+                continue
+            moves = table[state].get(("", stack[-1]))
+            if not moves:
+                continue
+            popped = stack[:-1]
+            for target, push, _ in moves:
+                configuration = (target, popped + push)
+                if configuration not in closure:
+                    closure.add(configuration)
+                    to_process.append(configuration)
+
+        return closure
+
+    def step(self, configurations: Iterable[Configuration], symbol: str) -> Set[Configuration]:
+        """
+        Consumes one input symbol from every configuration and returns the epsilon closure
+        of the resulting configurations. Only transitions matching the stack top are touched.
+        """
+        table = self.table
+        next_configurations = set()
+
+        for state, stack in configurations:
+            if not stack:
+                continue
+            moves = table[state].get((symbol, stack[-1]))
+            if not moves:
+                continue
+            popped = stack[:-1]
+            for target, push, _ in moves:
+                next_configurations.add((target, popped + push))
+
+        return self.epsilon_closure(next_configurations)
+
+    def _witness_closure(self, layer: Dict[Configuration, Tuple[int, int]], witness: 'RunWitness') -> None:
+        """
+        Extends `layer` in place with its epsilon closure. Configurations are expanded in
+        order of their distance from the initial configuration, so every configuration is
+        recorded with the parent on one of its shortest paths.
+        """
+        table = self.table
+        buckets: Dict[int, List[Configuration]] = {}
+        for configuration, (_, distance) in layer.items():
+            buckets.setdefault(distance, []).append(configuration)
+
+        distance = min(buckets, default=0)
+        while buckets:
+            frontier = buckets.pop(distance, ())
+            for configuration in frontier:
+                configuration_id, configuration_distance = layer[configuration]
+                state, stack = configuration
+                if configuration_distance != distance or not stack:
+                    continue  # Reached on a shorter path in the meantime, or nothing to pop
+                moves = table[state].get(("", stack[-1]))
+                if not moves:
+                    continue
+                popped = stack[:-1]
+                for target, push, index in moves:
+                    successor = (target, popped + push)
+                    known = layer.get(successor)
+                    if known is None or known[1] > distance + 1:
+                        layer[successor] = (witness.add(configuration_id, index), distance + 1)
+                        buckets.setdefault(distance + 1, []).append(successor)
+            distance += 1
+
+    def witness_search(self, initial: Configuration, simulation_input: Iterable[str],
+                       alphabet: Set[str]) -> Tuple[Set[Configuration], 'RunWitness', bool]:
+        """
+        Runs the same search as `epsilon_closure` and `step`, but also records a parent
+        pointer for every explored configuration in a `RunWitness`.
+
+        Returns:
+            Tuple[Set[Configuration], RunWitness, bool]: The configurations reached, the
+            witness arena, and whether the whole input could be consumed.
+        """
+        table = self.table
+        witness = RunWitness(self)
+        layer = {initial: (witness.add(-1, -1), 0)}
+        self._witness_closure(layer, witness)
+
+        for symbol in simulation_input:
+            if symbol not in alphabet:
+                witness.layer = layer
+                return set(layer), witness, False
+
+            next_layer: Dict[Configuration, Tuple[int, int]] = {}
+            for (state, stack), (configuration_id, distance) in layer.items():
+                if not stack:
+                    continue
+                moves = table[state].get((symbol, stack[-1]))
+                if not moves:
+                    continue
+                popped = stack[:-1]
+                for target, push, index in moves:
+                    successor = (target, popped + push)
+                    known = next_layer.get(successor)
+                    if known is None or known[1] > distance + 1:
+                        next_layer[successor] = (witness.add(configuration_id, index), distance + 1)
+
+            if not next_layer:
+                witness.layer = layer
+                return set(layer), witness, False
+
+            self._witness_closure(next_layer, witness)
+            layer = next_layer
+
+        witness.layer = layer
+        return set(layer), witness, True
+
+
+class RunWitness:
+    """
+    Parent pointers recorded while searching for accepting runs of an `NPDA`.
+
+    Explored configurations are identified by their position in two parallel integer
+    arrays: the ID of the configuration they were reached from and the index of the
+    transition taken. Memory is therefore linear in the number of explored
+    configurations, and no stacks are kept beyond the last layer of the search.
+    """
+
+    def __init__(self, compiled: CompiledPDA):
+        self.compiled = compiled
+        self.parents = array('i')
+        self.transition_indices = array('i')
+        self.layer: Dict[Configuration, Tuple[int, int]] = {}  # Configurations after the last consumed symbol
+        self.accepting = -1  # ID of the accepting configuration, -1 if there is none
+
+    def __len__(self):
+        return len(self.parents)
+
+    def add(self, parent: int, transition_index: int) -> int:
+        self.parents.append(parent)
+        self.transition_indices.append(transition_index)
+        return len(self.parents) - 1
+
+    def select_accepting(self, accepts) -> bool:
+        """
+        Picks the accepting configuration of the last layer with the shortest run.
+
+        Args:
+            accepts: Called with `(state index, stack codes)`, returns whether that
+                     configuration is accepting.
+        """
+        candidates = [(distance, configuration_id)
+                      for (state, stack), (configuration_id, distance) in self.layer.items()
+                      if accepts(state, stack)]
+        self.accepting = min(candidates)[1] if candidates else -1
+        return self.accepting != -1
+
+    def run(self) -> Union[List, None]:
+        """
+        Reconstructs the accepting run.
+
+        Returns:
+            List[PDATransition]: The transitions taken from the initial configuration to
+            the accepting one, or None if no accepting configuration was found.
+        """
+        if self.accepting == -1:
+            return None
+        transitions = self.compiled.transitions
+        run = []
+        configuration_id = self.accepting
+        while self.parents[configuration_id] != -1:
+            run.append(transitions[self.transition_indices[configuration_id]])
+            configuration_id = self.parents[configuration_id]
+        run.reverse()
+        return run
+
+
+class CompiledDPDA(CompiledPDA):
+    """
+    Transition tables for a `DPDA` in which every input transition is fused with the
+    epsilon chain that follows it.
+
+    A macro transition is a tuple `(pops, push, target, settled)`: pop `pops` symbols,
+    push the codes in `push` (in push order) and continue in state `target`. Epsilon
+    chains are followed at compile time for as long as they only read symbols the chain
+    pushed itself. When a chain pops down into the part of the stack that is unknown at
+    compile time, `settled` is False and the simulation continues with the `epsilon`
+    macro for the new (state, stack top). Every such continuation consumes at least one
+    stack symbol, so in the common case processing costs exactly one lookup per input
+    symbol and never more than one per popped symbol.
+
+    Epsilon chains that never terminate are detected while compiling; their macros
+    have the target `DIVERGES`.
+
+    Attributes:
+        moves (List[Dict[Tuple[str, int], Tuple[int, Tuple[int, ...], int, bool]]]):
+            For every state, maps `(input symbol, stack top code)` to a macro transition.
+        epsilon (List[Dict[int, Tuple[int, Tuple[int, ...], int, bool]]]):
+            For every state, maps a stack top code to the macro transition of the epsilon
+            chain starting there.
+    """
+
+    DIVERGES = -1
+
+    def __init__(self, automaton):
+        super().__init__(automaton)
+        self.has_epsilon = [any(symbol == "" for symbol, _ in entries) for entries in self.table]
+
+        self.epsilon = []
+        for state, entries in enumerate(self.table):
+            self.epsilon.append({
+                top: self._follow_epsilon(state, 1, [top])
+                for symbol, top in entries if symbol == ""
+            })
+
+        self.moves = []
+        for entries in self.table:
+            self.moves.append({
+                key: self._follow_epsilon(target, 1, list(push))
+                for key, ((target, push, _),) in entries.items() if key[0] != ""
+            })
+
+    def _follow_epsilon(self, state: int, pops: int, known: List[int]) -> Tuple[int, Tuple[int, ...], int, bool]:
+        """
+        Follows epsilon transitions from `state` while the stack top is one of the `known`
+        symbols (top at the end) and returns the resulting macro transition.
+        """
+        table = self.table
+        visits: Dict[Tuple[int, int], List[int]] = {}
+        depths: List[int] = []
+
+        while True:
+            if not known:
+                return pops, (), state, not self.has_epsilon[state]
+            top = known[-1]
+            moves = table[state].get(("", top))
+            if not moves:
+                return pops, tuple(known), state, True
+
+            # The chain loops forever if it reaches the same (state, top) again without
+            # ever having touched the stack below the earlier occurrence.
+            depth = len(known)
+            for earlier in visits.get((state, top), ()):
+                if depths[earlier] <= depth and min(depths[earlier:]) >= depths[earlier]:
+                    return pops, (), self.DIVERGES, True
+            visits.setdefault((state, top), []).append(len(depths))
+            depths.append(depth)
+
+            target, push, _ = moves[0]
+            known.pop()
+            known.extend(push)
+            state = target
+
+    def apply(self, macro, state: int, stack: List[int]) -> int:
+        """
+        Applies a macro transition to `stack` in place, following continuation macros
+        until the epsilon chain settles, and returns the resulting state.
+        """
+        epsilon = self.epsilon
+        while True:
+            pops, push, target, settled = macro
+            if target == self.DIVERGES:
+                raise ValueError(f"Epsilon transitions starting in state "
+                                 f"'{self.states[state].name}' never terminate")
+            del stack[len(stack) - pops:]
+            stack.extend(push)
+            state = target
+            if settled or not stack:
+                return state
+            macro = epsilon[state].get(stack[-1])
+            if macro is None:
+                return state
+
+    def follow_epsilon(self, state: int, stack: List[int]) -> int:
+        """Follows the epsilon chain starting in `state` on `stack` in place and returns the resulting state."""
+        if not stack:
+            return state
+        macro = self.epsilon[state].get(stack[-1])
+        if macro is None:
+            return state
+        return self.apply(macro, state, stack)
+
+
+class DPDASession:
+    """
+    A resumable run of a `DPDA` over input that arrives in chunks.
+
+    The stack is kept as a compact array of interned stack symbol codes, so a session
+    needs a few bytes per stack level and nothing per consumed symbol. Rejection is
+    reported as soon as no transition applies, which lets callers drop bad streams
+    without reading the rest of them.
+
+    Example:
+        session = dpda.session()
+        for chunk in stream:
+            if not session.feed(chunk):
+                break  # Rejected, nothing later in the stream can change that
+        accepted = session.finish()
+    """
+
+    def __init__(self, automaton, require_empty_stack=None, trace=None):
+        self.compiled = automaton.compile()
+        self.alphabet = automaton.alphabet
+        self.require_empty_stack = (require_empty_stack
+                                    if require_empty_stack is not None
+                                    else automaton.require_empty_stack)
+
+        initial_stack = self.compiled.encode_stack(automaton.initial_stack)
+        symbol_count = len(self.compiled.stack_symbols)
+        typecode = 'B' if symbol_count <= 0xFF else 'H' if symbol_count <= 0xFFFF else 'I'
+        self.stack = array(typecode, initial_stack)
+        self.trace = trace
+        if trace is not None:
+            symbols = sorted(self.alphabet, key=str)
+            self._symbol_codes = {symbol: code for code, symbol in enumerate(symbols)}
+            state_names = [state.name for state in self.compiled.states]
+            trace.bind(PDA_FIELDS, {"state": state_names, "target": state_names, "symbol": symbols,
+                                    "top": self.compiled.stack_symbols})
+        try:
+            self.state = self.compiled.follow_epsilon(self.compiled.state_index[automaton.initial_state],
+                                                      self.stack)
+        except ValueError:
+            if trace is not None:
+                trace.failed()
+            raise
+        self.position = 0  # Number of input symbols consumed so far
+        self.rejected = False
+        self.finished = False
+
+    @property
+    def current_state(self):
+        return self.compiled.states[self.state]
+
+    def decoded_stack(self) -> List[str]:
+        """Returns the current stack as a list of stack symbols, bottom first."""
+        return list(self.compiled.decode_stack(self.stack))
+
+    def feed(self, chunk: Union[str, bytes, Iterable[str]]) -> bool:
+        """
+        Consumes the next chunk of input.
+
+        Args:
+            chunk: The input symbols to process. `bytes` are decoded as Latin-1, so
+                   every byte becomes one single-character symbol.
+
+        Returns:
+            bool: False if the input has been rejected, either by this chunk or an earlier one.
+
+        Raises:
+            ValueError: If the session has already been finished.
+        """
+        if self.finished:
+            raise ValueError("Cannot feed a finished session")
+        if self.rejected:
+            return False
+        if isinstance(chunk, (bytes, bytearray)):
+            chunk = chunk.decode('latin-1')
+        if self.trace is not None:
+            try:
+                return self._feed_traced(chunk)
+            except BaseException:
+                self.trace.failed()
+                raise
+
+        compiled = self.compiled
+        moves = compiled.moves
+        alphabet = self.alphabet
+        stack = self.stack
+        state = self.state
+        consumed = 0
+
+        for symbol in chunk:
+            if not stack or symbol not in alphabet:
+                self.rejected = True
+                break
+            macro = moves[state].get((symbol, stack[-1]))
+            if macro is None:
+                self.rejected = True
+                break
+
+            _, push, target, settled = macro
+            if settled and target >= 0:
+                # Fast path: the whole epsilon chain was resolved at compile time
+                stack.pop()
+                stack.extend(push)
+                state = target
+            else:
+                state = compiled.apply(macro, state, stack)
+            consumed += 1
+
+        self.state = state
+        self.position += consumed
+        return not self.rejected
+
+    def _feed_traced(self, chunk: Iterable[str]) -> bool:
+        """`feed`, recording every consumed symbol in the session's trace."""
+        compiled = self.compiled
+        moves = compiled.moves
+        codes = self._symbol_codes
+        stack = self.stack
+        state = self.state
+        trace = self.trace
+        states, symbols, tops, targets, depths = trace.columns
+        capacity = trace.capacity
+        consumed = 0
+
+        for symbol in chunk:
+            if not stack or symbol not in codes:
+                self.rejected = True
+                break
+            top = stack[-1]
+            macro = moves[state].get((symbol, top))
+            if macro is None:
+                self.rejected = True
+                break
+
+            slot = trace.recorded % capacity
+            states[slot] = state
+            symbols[slot] = codes[symbol]
+            tops[slot] = top
+            state = compiled.apply(macro, state, stack)
+            targets[slot] = state
+            depths[slot] = len(stack)
+            trace.recorded += 1
+            consumed += 1
+
+        self.state = state
+        self.position += consumed
+        if self.rejected:
+            trace.finish(True)
+        return not self.rejected
+
+    def at_accepting_point(self) -> bool:
+        """Returns whether the input consumed so far is accepted."""
+        return (not self.rejected
+                and self.compiled.final[self.state]
+                and (not self.require_empty_stack or len(self.stack) == 1))
+
+    def finish(self) -> bool:
+        """Ends the session and returns whether the complete input is accepted."""
+        self.finished = True
+        if self.trace is not None and not self.rejected:
+            self.trace.finish(True)
+        return self.at_accepting_point()
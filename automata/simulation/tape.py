@@ -0,0 +1,118 @@
+"""
+Turing machine tape with amortized O(1) growth at both ends.
+
+Tape symbols are interned to single bytes, with the blank symbol always being code 0,
+and the cells are kept in one `bytearray`. The buffer is larger than the part of the
+tape the head has visited: `lo` and `hi` mark the visited cells, and the buffer is
+doubled whenever the head leaves it on either side, so moving left off the edge no
+longer shifts the whole tape.
+"""
+
+from typing import Dict, Iterable, List
+
+MAX_SYMBOLS = 256  # Symbols are stored as single bytes
+
+
+class Tape:
+    """
+    A two-sided, growable tape.
+
+    Attributes:
+        symbols (List[str]): Interned symbols, position in the list is the code. The
+                             blank symbol has code 0.
+        codes (Dict[str, int]): Maps a symbol to its code.
+        cells (bytearray): The buffer holding the codes of all cells.
+        lo (int): Buffer index of the leftmost visited cell.
+        hi (int): Buffer index of the rightmost visited cell.
+        head (int): Buffer index of the cell under the head.
+        origin (int): Buffer index of the cell the tape was initialized at. Positions
+                      relative to it stay valid when the buffer grows to the left.
+    """
+
+    def __init__(self, blank: str, content: Iterable[str] = (), head: int = 0, symbols: Iterable[str] = ()):
+        """
+        Initializes a tape.
+
+        Args:
+            blank (str): The blank symbol.
+            content (Iterable[str]): The initial cells, starting at position 0.
+            head (int): The initial head position, relative to the first cell of `content`.
+            symbols (Iterable[str]): Symbols to intern up front, so that their codes do
+                                     not depend on the order they appear on the tape.
+        """
+        self.blank = blank
+        self.symbols: List[str] = [blank]
+        self.codes: Dict[str, int] = {blank: 0}
+        for symbol in symbols:
+            self.intern(symbol)
+
+        content = bytes(self.intern(symbol) for symbol in content)
+        margin = max(16, len(content) // 2)
+        self.cells = bytearray(margin) + content + bytearray(margin)
+        self.origin = margin
+        self.lo = margin
+        self.hi = margin + max(len(content), 1) - 1
+        self.head = margin + head
+        if not self.lo <= self.head <= self.hi:
+            self.lo = min(self.lo, self.head)
+            self.hi = max(self.hi, self.head)
+
+    def intern(self, symbol: str) -> int:
+        """Returns the code of a symbol, assigning a new one if it is unknown."""
+        code = self.codes.get(symbol)
+        if code is None:
+            code = len(self.symbols)
+            if code >= MAX_SYMBOLS:
+                raise ValueError(f"A tape can hold at most {MAX_SYMBOLS} different symbols")
+            self.symbols.append(symbol)
+            self.codes[symbol] = code
+        return code
+
+    def read(self) -> str:
+        return self.symbols[self.cells[self.head]]
+
+    def write(self, symbol: str) -> None:
+        self.cells[self.head] = self.intern(symbol)
+
+    def move(self, delta: int) -> None:
+        """Moves the head by `delta` cells, growing the tape if it leaves the visited part."""
+        head = self.head + delta
+        if head < self.lo:
+            if head < 0:
+                head += self.grow_left(-head)
+            self.lo = head
+        elif head > self.hi:
+            if head >= len(self.cells):
+                self.grow_right(head - len(self.cells) + 1)
+            self.hi = head
+        self.head = head
+
+    def grow_left(self, minimum: int = 1) -> int:
+        """
+        Prepends blank cells to the buffer, at least doubling its size, and returns the
+        number of cells added. All buffer indices shift by that amount.
+        """
+        extra = max(len(self.cells), minimum)
+        self.cells[0:0] = bytes(extra)
+        self.lo += extra
+        self.hi += extra
+        self.head += extra
+        self.origin += extra
+        return extra
+
+    def grow_right(self, minimum: int = 1) -> None:
+        """Appends blank cells to the buffer, at least doubling its size."""
+        self.cells.extend(bytes(max(len(self.cells), minimum)))
+
+    @property
+    def head_offset(self) -> int:
+        """The head position as an index into `to_list()`."""
+        return self.head - self.lo
+
+    def __len__(self):
+        return self.hi - self.lo + 1
+
+    def to_list(self) -> List[str]:
+        """Returns the visited cells as a list of symbols."""
+        symbols = self.symbols
+        return [symbols[code] for code in self.cells[self.lo:self.hi + 1]]
@@ -0,0 +1,113 @@
+"""
+Bounded execution traces.
+
+A `TraceRecorder` keeps the last `capacity` steps of a run in a ring buffer of
+preallocated integer arrays, one per field, so recording a step is a handful of
+array stores and tracing a run of any length needs constant memory. Engines only
+record into a trace when one is passed to them, and take a separate code path when
+they do, so runs without a trace pay nothing.
+
+Fields are stored as integers (state indices, symbol codes, head positions) and only
+decoded to names when the trace is read.
+"""
+
+import sys
+from array import array
+from typing import Dict, List, Optional, Sequence, TextIO, Tuple
+
+TURING_FIELDS = ("state", "head", "read", "write", "move")
+PDA_FIELDS = ("state", "symbol", "top", "target", "depth")
+
+_MOVE_NAMES = {-1: 'L', 0: 'N', 1: 'R'}
+
+
+class TraceRecorder:
+    """
+    Ring buffer of the last steps of a run.
+
+    Attributes:
+        capacity (int): Number of steps kept.
+        fields (Tuple[str, ...]): Names of the recorded fields, set by the engine.
+        columns (List[array]): One preallocated array per field. Step `n` is stored at
+                               index `n % capacity`.
+        recorded (int): Number of steps recorded since the run started.
+        halted (bool): Whether the run ended because no transition applied.
+        dump_on_halt (bool): Dump the trace when the run halts.
+        dump_on_error (bool): Dump the trace when the run raises an exception, including
+                              a KeyboardInterrupt.
+        file (Optional[TextIO]): Where dumps go, standard error by default.
+    """
+
+    def __init__(self, capacity: int = 1000, dump_on_halt: bool = False, dump_on_error: bool = True,
+                 file: Optional[TextIO] = None):
+        if capacity < 1:
+            raise ValueError("A trace needs room for at least one step")
+        self.capacity = capacity
+        self.dump_on_halt = dump_on_halt
+        self.dump_on_error = dump_on_error
+        self.file = file
+        self.fields: Tuple[str, ...] = ()
+        self.columns: List[array] = []
+        self.recorded = 0
+        self.halted = False
+        self._names: Dict[str, Sequence] = {}
+
+    def bind(self, fields: Tuple[str, ...], names: Dict[str, Sequence]) -> List[array]:
+        """
+        Prepares the trace for a new run and returns the columns to record into.
+
+        Args:
+            fields (Tuple[str, ...]): The fields the engine records.
+            names (Dict[str, Sequence]): For fields holding codes, the names to decode them with.
+        """
+        if fields != self.fields or len(self.columns) != len(fields):
+            self.columns = [array('q', bytes(8 * self.capacity)) for _ in fields]
+        self.fields = fields
+        self.recorded = 0
+        self.halted = False
+        self._names = names
+        return self.columns
+
+    def __len__(self):
+        return min(self.recorded, self.capacity)
+
+    def entries(self) -> List[Dict[str, object]]:
+        """Returns the kept steps, oldest first, with codes decoded to names."""
+        entries = []
+        for step in range(self.recorded - len(self), self.recorded):
+            slot = step % self.capacity
+            entry: Dict[str, object] = {"step": step}
+            for field, column in zip(self.fields, self.columns):
+                value = column[slot]
+                if field == "move":
+                    entry[field] = _MOVE_NAMES.get(value, value)
+                elif field in self._names:
+                    entry[field] = self._names[field][value]
+                else:
+                    entry[field] = value
+            entries.append(entry)
+        return entries
+
+    def format(self) -> str:
+        """Returns the kept steps as text, one line per step."""
+        lines = [f"Last {len(self)} of {self.recorded} steps"
+                 + (", halted" if self.halted else "")]
+        for entry in self.entries():
+            step = entry.pop("step")
+            lines.append(f"{step:>12}: " + " ".join(f"{field}={value}" for field, value in entry.items()))
+        return "\n".join(lines)
+
+    def dump(self, file: Optional[TextIO] = None) -> None:
+        """Writes the kept steps to `file`, by default the recorder's file or standard error."""
+        print(self.format(), file=file or self.file or sys.stderr)
+
+    def finish(self, halted: bool) -> None:
+        """Called by the engine when the run ends."""
+        self.halted = halted
+        if halted and self.dump_on_halt:
+            self.dump()
+
+    def failed(self) -> None:
+        """Called by the engine when the run raises an exception."""
+        if self.dump_on_error:
+            self.dump()
@@ -0,0 +1,308 @@
+"""
+Streaming simulation of Mealy and Moore machines.
+
+`CompiledTransducer` flattens a `MEALY` or `MOORE` machine into integer tables: input
+symbols and outputs are interned, and `next_state` and `output` are flat arrays indexed
+by `state * len(symbols) + symbol`. A Moore machine's outputs belong to the states, but
+are stored per transition too (the output of the target), so both kinds of machine run
+the same loop.
+
+A `TransducerSession` runs the tables over input that arrives in chunks and keeps
+nothing but the current state, so streams of any length are transduced in constant
+memory. Outputs are either yielded lazily or written to a caller-supplied list or file.
+
+`transduce_batch` runs many sequences in lockstep with NumPy instead, as a padded
+matrix of symbol codes plus a length vector. NumPy is only imported when it is used.
+"""
+
+from array import array
+from typing import Any, Iterable, Iterator, List, Optional, Union
+
+from automata.simulation.batch import _numpy
+
+NO_OUTPUT = -1  # Output code of a transition or state without output
+MISSING = -1  # Next state of a missing transition
+
+
+class CompiledTransducer:
+    """
+    Integer transition and output tables of a Mealy or Moore machine.
+
+    Attributes:
+        states (List[State]): The machine's states, position in the list is the state index.
+        state_index (Dict[State, int]): Maps a state object to its index.
+        moore (bool): Whether outputs belong to states (Moore) or transitions (Mealy).
+        symbols (List[str]): The input symbols, position in the list is the code.
+        codes (Dict[str, int]): Maps an input symbol to its code.
+        outputs (List[Any]): The distinct outputs, position in the list is the output code.
+        next_state (array): Index of the next state, or `MISSING`.
+        output (array): Code of the output emitted by the transition, or `NO_OUTPUT`.
+        state_output (array): For Moore machines, the output code of every state.
+    """
+
+    def __init__(self, machine):
+        self.states = list(machine.states.values())
+        self.state_index = {state: index for index, state in enumerate(self.states)}
+        self.moore = machine.type == "MOORE"
+        self.symbols: List[str] = sorted(machine.alphabet, key=str)
+        self.codes = {symbol: code for code, symbol in enumerate(self.symbols)}
+        self.outputs: List[Any] = []
+        self._output_codes = {}
+
+        self.state_output = array('i', [self._intern(getattr(state, "output", None)) if self.moore else NO_OUTPUT
+                                        for state in self.states])
+        size = len(self.states) * len(self.symbols)
+        self.next_state = array('i', [MISSING]) * size
+        self.output = array('i', [NO_OUTPUT]) * size
+        for index, state in enumerate(self.states):
+            for symbol, transition in state.transitions.items():
+                if symbol not in self.codes:
+                    continue
+                cell = index * len(self.symbols) + self.codes[symbol]
+                target = self.state_index[transition.target]
+                self.next_state[cell] = target
+                self.output[cell] = (self.state_output[target] if self.moore
+                                     else self._intern(getattr(transition, "output", None)))
+        self._next_state = self.next_state.tolist()
+        self._output = self.output.tolist()
+
+    def _intern(self, output) -> int:
+        if output is None:
+            return NO_OUTPUT
+        code = self._output_codes.get(output)
+        if code is None:
+            code = self._output_codes[output] = len(self.outputs)
+            self.outputs.append(output)
+        return code
+
+    def compile(self):
+        return self
+
+
+class TransducerSession:
+    """
+    A resumable run of a Mealy or Moore machine over input that arrives in chunks.
+
+    A Mealy machine emits the output of every transition taken. A Moore machine emits
+    the output of the initial state before the first symbol and then the output of
+    every state it enters, so `n` symbols produce `n + 1` outputs. Transitions and
+    states without an output emit nothing. The run stops at the first symbol without
+    a transition.
+
+    Example:
+        session = mealy.session()
+        with open("out.txt", "w") as out:
+            for chunk in stream:
+                session.feed_into(chunk, out)
+    """
+
+    def __init__(self, machine, state=None):
+        self.compiled = machine.compile()
+        initial = state if state is not None else machine.initial_state
+        self.state = self.compiled.state_index[initial]
+        self.position = 0  # Number of input symbols consumed so far
+        self.rejected = False
+        self.finished = False
+        self._started = False
+
+    @property
+    def current_state(self):
+        return self.compiled.states[self.state]
+
+    def _start(self) -> Optional[int]:
+        """Returns the output code of the initial state when a Moore run starts."""
+        if self.finished:
+            raise ValueError("Cannot feed a finished session")
+        if self._started:
+            return None
+        self._started = True
+        if self.compiled.moore and self.compiled.state_output[self.state] != NO_OUTPUT:
+            return self.compiled.state_output[self.state]
+        return None
+
+    def feed(self, chunk: Iterable[str]) -> Iterator[Any]:
+        """
+        Consumes a chunk of input, yielding the outputs one at a time. The session only
+        advances as far as the outputs are consumed.
+        """
+        initial = self._start()
+        compiled = self.compiled
+        outputs = compiled.outputs
+        if initial is not None:
+            yield outputs[initial]
+        if self.rejected:
+            return
+        codes, next_state, output = compiled.codes, compiled._next_state, compiled._output
+        row_size = len(compiled.symbols)
+
+        for symbol in chunk:
+            code = codes.get(symbol)
+            cell = MISSING if code is None else self.state * row_size + code
+            if cell == MISSING or next_state[cell] == MISSING:
+                self.rejected = True
+                return
+            self.state = next_state[cell]
+            self.position += 1
+            if output[cell] != NO_OUTPUT:
+                yield outputs[output[cell]]
+
+    def feed_into(self, chunk: Iterable[str], sink: Union[List, Any]) -> int:
+        """
+        Consumes a chunk of input and writes its outputs to `sink`: a file (anything
+        with `write`, outputs are written as text) or a list (anything with `extend`).
+
+        Returns:
+            int: The number of outputs written.
+        """
+        initial = self._start()
+        compiled = self.compiled
+        outputs = compiled.outputs
+        emitted = [] if initial is None else [initial]
+        if not self.rejected:
+            codes, next_state, output = compiled.codes, compiled._next_state, compiled._output
+            row_size = len(compiled.symbols)
+            state = self.state
+            consumed = 0
+            append = emitted.append
+            for symbol in chunk:
+                code = codes.get(symbol)
+                if code is None or next_state[state * row_size + code] == MISSING:
+                    self.rejected = True
+                    break
+                cell = state * row_size + code
+                state = next_state[cell]
+                consumed += 1
+                if output[cell] != NO_OUTPUT:
+                    append(output[cell])
+            self.state = state
+            self.position += consumed
+
+        if hasattr(sink, "write"):
+            sink.write("".join(str(outputs[code]) for code in emitted))
+        else:
+            sink.extend(outputs[code] for code in emitted)
+        return len(emitted)
+
+    def finish(self) -> bool:
+        """Ends the session and returns whether the complete input was transduced."""
+        self.finished = True
+        return not self.rejected
+
+
+class BatchTransduction:
+    """
+    Outputs of many sequences run through the same machine, one row per sequence.
+
+    Attributes:
+        outputs (numpy.ndarray): Output codes, `NO_OUTPUT` where a transition or state
+                                 has no output, past the end of a sequence and after a
+                                 rejection. Column `t` holds the output of the `t`-th
+                                 transition, for Moore machines shifted by one column,
+                                 with the initial state's output in column 0.
+        lengths (numpy.ndarray): The length of every sequence.
+        states (numpy.ndarray): The state every sequence ended in.
+        rejected (numpy.ndarray): Whether a sequence hit a symbol without a transition.
+        table (List[Any]): Decodes output codes, `table[code]` is the output.
+    """
+
+    def __init__(self, outputs, lengths, states, rejected, table: List[Any]):
+        self.outputs = outputs
+        self.lengths = lengths
+        self.states = states
+        self.rejected = rejected
+        self.table = table
+
+    def __len__(self):
+        return len(self.lengths)
+
+    def decode(self, index: int) -> List[Any]:
+        """The outputs of one sequence, like `TransducerSession.feed` produces them."""
+        return [self.table[code] for code in self.outputs[index].tolist() if code != NO_OUTPUT]
+
+
+def encode_sequences(compiled: CompiledTransducer, sequences: Iterable[Iterable[str]]):
+    """
+    Encodes sequences of input symbols as a padded matrix of symbol codes and a length
+    vector. Symbols unknown to the machine are encoded as `MISSING`.
+    """
+    numpy = _numpy()
+    sequences = list(sequences)
+    if all(isinstance(sequence, str) for sequence in sequences) \
+            and all(isinstance(symbol, str) and len(symbol) == 1 for symbol in compiled.symbols):
+        return _encode_strings(compiled, sequences)
+
+    sequences = [list(sequence) for sequence in sequences]
+    lengths = numpy.array([len(sequence) for sequence in sequences], dtype=numpy.int64)
+    width = int(lengths.max()) if len(sequences) else 0
+    codes = numpy.full((len(sequences), width), MISSING, dtype=numpy.int32)
+    get = compiled.codes.get
+    for row, sequence in enumerate(sequences):
+        codes[row, :len(sequence)] = [get(symbol, MISSING) for symbol in sequence]
+    return codes, lengths
+
+
+def _encode_strings(compiled: CompiledTransducer, sequences: List[str]):
+    """`encode_sequences` for strings over single-character symbols, without a loop per symbol."""
+    numpy = _numpy()
+    lengths = numpy.fromiter(map(len, sequences), dtype=numpy.int64, count=len(sequences))
+    width = int(lengths.max()) if len(sequences) else 0
+    characters = numpy.frombuffer("".join(sequences).encode("utf-32-le"), dtype=numpy.uint32)
+
+    # Sorted code points of the symbols, and the symbol code of each
+    points = numpy.array([ord(symbol) for symbol in compiled.symbols], dtype=numpy.uint32)
+    order = numpy.argsort(points)
+    points = points[order]
+    found = numpy.searchsorted(points, characters)
+    found = numpy.minimum(found, max(len(points) - 1, 0))
+    known = points[found] == characters if len(points) else numpy.zeros(len(characters), dtype=bool)
+    symbol_codes = numpy.where(known, order[found] if len(points) else 0, MISSING)
+
+    codes = numpy.full((len(sequences), width), MISSING, dtype=numpy.int32)
+    rows = numpy.repeat(numpy.arange(len(sequences)), lengths)
+    starts = numpy.cumsum(lengths) - lengths
+    columns = numpy.arange(len(characters)) - numpy.repeat(starts, lengths)
+    codes[rows, columns] = symbol_codes
+    return codes, lengths
+
+
+def transduce_batch(compiled: CompiledTransducer, codes, lengths=None, state: int = 0) -> BatchTransduction:
+    """
+    Runs all sequences in lockstep, one column of the input matrix per step.
+
+    Args:
+        compiled (CompiledTransducer): The machine.
+        codes (numpy.ndarray): Symbol codes, one row per sequence, see `encode_sequences`.
+        lengths (numpy.ndarray, optional): The length of every row, defaults to the full width.
+        state (int): Index of the initial state.
+
+    Returns:
+        BatchTransduction: The output codes and the decode table.
+    """
+    numpy = _numpy()
+    codes = numpy.asarray(codes, dtype=numpy.int64)
+    count, width = codes.shape
+    if lengths is None:
+        lengths = numpy.full(count, width, dtype=numpy.int64)
+    lengths = numpy.asarray(lengths, dtype=numpy.int64)
+
+    row_size = len(compiled.symbols)
+    next_state = numpy.frombuffer(compiled.next_state, dtype=numpy.int32).astype(numpy.int64)
+    output = numpy.frombuffer(compiled.output, dtype=numpy.int32)
+    shift = 1 if compiled.moore else 0
+
+    outputs = numpy.full((count, width + shift), NO_OUTPUT, dtype=numpy.int32)
+    if compiled.moore:
+        outputs[:, 0] = compiled.state_output[state]
+    states = numpy.full(count, state, dtype=numpy.int64)
+    rejected = numpy.zeros(count, dtype=bool)
+    for step in range(width):
+        column = codes[:, step]
+        active = (step < lengths) & ~rejected
+        cells = states * row_size + numpy.maximum(column, 0)
+        targets = next_state[cells] if row_size else numpy.full(count, MISSING)
+        missing = active & ((column < 0) | (targets == MISSING))
+        rejected |= missing
+        applied = active & ~missing
+        outputs[applied, step + shift] = output[cells[applied]]
+        states[applied] = targets[applied]
+    return BatchTransduction(outputs, lengths, states, rejected, compiled.outputs)
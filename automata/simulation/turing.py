@@ -0,0 +1,325 @@
+"""
+Compiled transition tables for single-tape Turing machines.
+
+`CompiledTuring` flattens the states and `TuringTransition` objects of a `Turing`
+machine into three flat arrays indexed by `state * symbol_count + symbol`: the next
+state, the symbol to write and the head movement. The stepping loop in `run` only
+touches integers and the `bytearray` of a `Tape`.
+
+Transitions that keep the state and the symbol and move the head (as added by
+`Turing.loop_left` and `Turing.loop_right`) are scans: the machine walks over a run of
+such symbols one step per cell. `run` executes a scan as a search for the first cell
+that ends it, with `bytes.lstrip`/`rstrip` over windows of doubling size, and advances
+the step count by the distance, so the count stays exact.
+"""
+
+import sys
+from array import array
+from typing import Dict, Iterable, List, Tuple
+
+from automata.simulation.tape import Tape, MAX_SYMBOLS
+
+MOVES = {'L': -1, 'R': 1}  # Any other move leaves the head where it is
+HALT = -1  # Next state of a missing transition
+SCAN = -2  # Marks self-loop transitions in the stepping loop's table
+SCAN_WINDOW = 64  # Cells searched by the first window of a scan
+
+
+def turing_outcome(final: bool, halted: bool, tape: List[str], head_position: int, steps: int,
+                   return_steps: bool = False) -> tuple:
+    """
+    The return value of `Turing.process_input`: `(False, tape)` if the run was cut off,
+    `(True, tape)` if it halted in a final state and `(False, tape, head_position)` if it
+    halted in another state. With `return_steps`, a run that halted in a final state
+    returns `(True, tape, steps)`.
+    """
+    if not halted:
+        return False, tape
+    if final:
+        return (True, tape, steps) if return_steps else (True, tape)
+    return False, tape, head_position
+
+
+class CompiledTuring:
+    """
+    Flat transition tables of a single-tape Turing machine.
+
+    Attributes:
+        states (List[State]): The machine's states, position in the list is the state index.
+        state_index (Dict[State, int]): Maps a state object to its index.
+        final (List[bool]): Whether the state with a given index is final.
+        blank (str): The blank symbol, always code 0.
+        symbols (List[str]): The tape symbols, position in the list is the code.
+        symbol_count (int): The number of tape symbols, the row length of the tables.
+        next_state (array): Index of the next state, or `HALT` if there is no transition.
+        write (array): Code of the symbol to write.
+        move (array): Head movement, -1, 0 or 1.
+        scans (Dict[int, Tuple[int, bytes]]): The direction and the codes passed over of
+                                              the scan every self-loop transition makes.
+    """
+
+    def __init__(self, states, final: List[bool], blank: str, symbols: List[str],
+                 next_state: array, write: array, move: array):
+        self.states = states
+        self.state_index = {state: index for index, state in enumerate(states)}
+        self.final = final
+        self.blank = blank
+        self.symbols = symbols
+        self.codes: Dict[str, int] = {symbol: code for code, symbol in enumerate(symbols)}
+        self.symbol_count = len(symbols)
+        self.next_state = next_state
+        self.write = write
+        self.move = move
+        # The stepping loop reads plain lists and jumps straight to the next row
+        self._next_row = [target * self.symbol_count if target != HALT else HALT for target in next_state]
+        self._write = write.tolist()
+        self._move = move.tolist()
+        self.scans = self._find_scans()
+
+    def _find_scans(self) -> Dict[int, Tuple[int, bytes]]:
+        """
+        Finds the self-loop transitions, marks them with `SCAN` in `_next_row` and returns
+        the direction and the codes the scan passes over for every one of them.
+        """
+        symbol_count = self.symbol_count
+        loops: Dict[Tuple[int, int], List[int]] = {}
+        for cell, target in enumerate(self.next_state):
+            state, code = divmod(cell, symbol_count)
+            if target == state and self.write[cell] == code and self.move[cell]:
+                loops.setdefault((state, self.move[cell]), []).append(code)
+
+        scans = {}
+        for (state, direction), codes in loops.items():
+            skip = bytes(codes)
+            for code in codes:
+                cell = state * symbol_count + code
+                self._next_row[cell] = SCAN
+                scans[cell] = (direction, skip)
+        return scans
+
+    @classmethod
+    def from_turing(cls, machine) -> 'CompiledTuring':
+        states = list(machine.states.values())
+        state_index = {state: index for index, state in enumerate(states)}
+
+        used = set(machine.stack_alphabet) | set(machine.alphabet)
+        for state in states:
+            for transition in state.transitions.values():
+                used.add(transition.tape_symbol)
+                used.add(transition.tape_write)
+        used.discard(machine.blank_symbol)
+        symbols = [machine.blank_symbol] + sorted(used, key=str)
+        if len(symbols) > MAX_SYMBOLS:
+            raise ValueError(f"A Turing machine can use at most {MAX_SYMBOLS} different tape symbols")
+        codes = {symbol: code for code, symbol in enumerate(symbols)}
+
+        size = len(states) * len(symbols)
+        next_state = array('i', [HALT]) * size
+        write = array('B', [0]) * size
+        move = array('b', [0]) * size
+        for index, state in enumerate(states):
+            for transition in state.transitions.values():
+                cell = index * len(symbols) + codes[transition.tape_symbol]
+                next_state[cell] = state_index[transition.target]
+                write[cell] = codes[transition.tape_write]
+                move[cell] = MOVES.get(transition.move, 0)
+
+        final = [bool(getattr(state, "is_final", False)) for state in states]
+        return cls(states, final, machine.blank_symbol, symbols, next_state, write, move)
+
+    def compile(self):
+        return self
+
+    def extended(self, symbols: List[str]) -> 'CompiledTuring':
+        """
+        Returns tables that also cover `symbols` (which must start with this machine's
+        symbols), for input containing symbols no transition mentions.
+        """
+        if len(symbols) > MAX_SYMBOLS:
+            raise ValueError(f"A Turing machine can use at most {MAX_SYMBOLS} different tape symbols")
+        old, new = self.symbol_count, len(symbols)
+        padding = new - old
+        next_state, write, move = array('i'), array('B'), array('b')
+        for start in range(0, len(self.next_state), old):
+            next_state.extend(self.next_state[start:start + old])
+            next_state.extend([HALT] * padding)
+            write.extend(self.write[start:start + old])
+            write.extend([0] * padding)
+            move.extend(self.move[start:start + old])
+            move.extend([0] * padding)
+        return type(self)(self.states, self.final, self.blank, list(symbols), next_state, write, move)
+
+    def new_tape(self, simulation_input: Iterable[str]) -> Tuple['CompiledTuring', Tape]:
+        """
+        Creates the tape for a run on `simulation_input`, laid out like `Turing.process_input`
+        does: a blank, the input and another blank, with the head on the first input cell.
+
+        Returns:
+            Tuple[CompiledTuring, Tape]: The tables to run on the tape (extended if the
+            input contains symbols unknown to the machine) and the tape.
+        """
+        tape = Tape(self.blank, [self.blank, *simulation_input, self.blank], head=1, symbols=self.symbols)
+        compiled = self if len(tape.symbols) == self.symbol_count else self.extended(tape.symbols)
+        return compiled, tape
+
+    def run(self, tape: Tape, state: int, max_steps) -> Tuple[int, int, bool]:
+        """
+        Runs the machine on `tape` in place for at most `max_steps` steps.
+
+        Args:
+            tape (Tape): A tape whose codes match `symbols`.
+            state (int): Index of the state to start in.
+            max_steps: The step budget, may be `float('inf')`.
+
+        Returns:
+            Tuple[int, int, bool]: The index of the current state, the number of steps
+            taken and whether the machine halted (no transition applied).
+        """
+        if max_steps == float('inf'):
+            max_steps = sys.maxsize
+
+        symbol_count = self.symbol_count
+        next_row = self._next_row
+        write = self._write
+        move = self._move
+        scans = self.scans
+        cells = tape.cells
+        lo, hi, head = tape.lo, tape.hi, tape.head
+        row = state * symbol_count
+        halted = False
+
+        steps = 0
+        while True:
+            for steps in range(steps, max_steps):
+                cell = row + cells[head]
+                row = next_row[cell]
+                if row < 0:
+                    halted = row == HALT
+                    row = cell - cells[head]
+                    break
+                cells[head] = write[cell]
+                head += move[cell]
+                if head < lo:
+                    if head < 0:
+                        tape.lo, tape.hi, tape.head = lo, hi, head
+                        tape.grow_left(-head)
+                        lo, hi, head = tape.lo, tape.hi, tape.head
+                    lo = head
+                elif head > hi:
+                    if head >= len(cells):
+                        tape.grow_right()
+                    hi = head
+            else:
+                steps = max_steps
+                break
+            if halted:
+                break
+
+            # A self-loop: skip over the run of cells it passes over
+            direction, skip = scans[cell]
+            tape.lo, tape.hi, tape.head = lo, hi, head
+            end = self._scan(tape, direction, skip, max_steps - steps)
+            cells = tape.cells
+            lo, hi = min(tape.lo, end), max(tape.hi, end)
+            steps += abs(end - tape.head)
+            head = end
+
+        tape.lo, tape.hi, tape.head = lo, hi, head
+        return row // symbol_count, steps, halted
+
+    def run_traced(self, tape: Tape, state: int, max_steps, trace) -> Tuple[int, int, bool]:
+        """
+        Like `run`, but records every step in `trace`, a `TraceRecorder` bound to
+        `TURING_FIELDS`, with head positions relative to the tape's origin. Scans are
+        taken one step at a time, so every step is recorded.
+        """
+        if max_steps == float('inf'):
+            max_steps = sys.maxsize
+
+        symbol_count = self.symbol_count
+        next_state = self.next_state
+        write = self._write
+        move = self._move
+        states, heads, reads, writes, moves = trace.columns
+        capacity = trace.capacity
+        slot = trace.recorded % capacity
+        cells = tape.cells
+        lo, hi, head, origin = tape.lo, tape.hi, tape.head, tape.origin
+        halted = False
+
+        steps = 0
+        for steps in range(max_steps):
+            read = cells[head]
+            cell = state * symbol_count + read
+            target = next_state[cell]
+            if target == HALT:
+                halted = True
+                break
+            states[slot] = state
+            heads[slot] = head - origin
+            reads[slot] = read
+            writes[slot] = cells[head] = write[cell]
+            moves[slot] = move[cell]
+            # Counted as it is recorded, so a trace dumped by an interrupted run is current
+            trace.recorded += 1
+            slot += 1
+            if slot == capacity:
+                slot = 0
+            state = target
+            head += move[cell]
+            if head < lo:
+                if head < 0:
+                    tape.lo, tape.hi, tape.head = lo, hi, head
+                    tape.grow_left(-head)
+                    lo, hi, head, origin = tape.lo, tape.hi, tape.head, tape.origin
+                lo = head
+            elif head > hi:
+                if head >= len(cells):
+                    tape.grow_right()
+                hi = head
+        else:
+            steps = max_steps
+
+        tape.lo, tape.hi, tape.head = lo, hi, head
+        return state, steps, halted
+
+    @staticmethod
+    def _scan(tape: Tape, direction: int, skip: bytes, budget: int) -> int:
+        """
+        Returns the buffer index where a scan from the head in `direction` stops, see
+        `scan_end`. The buffer is grown first if the head is at its edge.
+        """
+        if direction > 0 and tape.head + 1 >= len(tape.cells):
+            tape.grow_right()
+        elif direction < 0 and tape.head == 0:
+            tape.grow_left()
+        return scan_end(tape.cells, tape.head, direction, skip, budget)
+
+
+def scan_end(cells: bytearray, head: int, direction: int, skip: bytes, budget: int) -> int:
+    """
+    Returns the buffer index where a scan from `head` in `direction` stops: the first
+    cell whose code is not in `skip`, at most `budget` cells away and within the buffer.
+    """
+    width = SCAN_WINDOW
+    end = head
+    if direction > 0:
+        limit = min(len(cells) - 1, head + budget)
+        while True:
+            stop = min(limit, end + width)
+            rest = cells[end:stop].lstrip(skip)
+            end = stop - len(rest)
+            if rest or stop == limit:
+                return end
+            width *= 2
+    else:
+        limit = max(0, head - budget)
+        while True:
+            start = max(limit, end + 1 - width)
+            rest = cells[start:end + 1].rstrip(skip)
+            if rest:
+                return start + len(rest) - 1
+            if start == limit:
+                return limit
+            end = start - 1
+            width *= 2
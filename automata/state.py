@@ -1,25 +1,76 @@
 import random
 
 class State:
+    """
+    A state of an automaton.
+
+    States use `__slots__` and allocate as little as possible, since automata can have
+    millions of them: the layout coordinates `x` and `y` are only drawn when they are
+    first read, which normally is when the automaton is exported to FLACI, and
+    `used_symbols` is only created when a transition is added.
+    """
+    __slots__ = ("name", "id", "transitions", "_used_symbols", "_x", "_y")
+    radius = 30
+
     def __init__(self, name, state_id):
         self.name = name
         self.id = state_id
         self.transitions = {}
-        self.used_symbols = set()
-        self.x = random.randint(0, 1000)
-        self.y = random.randint(0, 1000)
-        self.radius = 30
+        self._used_symbols = None
+        self._x = None
+        self._y = None
+
+    @property
+    def used_symbols(self):
+        if self._used_symbols is None:
+            self._used_symbols = set()
+        return self._used_symbols
+
+    @used_symbols.setter
+    def used_symbols(self, symbols):
+        self._used_symbols = symbols
+
+    @property
+    def x(self):
+        if self._x is None:
+            self._x = random.randint(0, 1000)
+        return self._x
+
+    @x.setter
+    def x(self, x):
+        self._x = x
+
+    @property
+    def y(self):
+        if self._y is None:
+            self._y = random.randint(0, 1000)
+        return self._y
+
+    @y.setter
+    def y(self, y):
+        self._y = y
 
     def clear(self):
         self.transitions = {}
         self.used_symbols = set()
 
 class AutomatonState(State):
+    __slots__ = ("is_final", "_epsilon_transitions")
+
     def __init__(self, name, state_id, is_final=False):
         super().__init__(name, state_id)
         self.is_final = is_final  # Only used by DFA and NFA
-        self.epsilon_transitions = {}  # Only used by NFA
+        self._epsilon_transitions = None  # Only used by NFA, created on first use
+
+    @property
+    def epsilon_transitions(self):
+        if self._epsilon_transitions is None:
+            self._epsilon_transitions = {}
+        return self._epsilon_transitions
 
+    @epsilon_transitions.setter
+    def epsilon_transitions(self, transitions):
+        self._epsilon_transitions = transitions
 
     def clear(self):
         self.transitions = {}
@@ -28,6 +79,8 @@ class AutomatonState(State):
 
 
 class MooreState(State):
+    __slots__ = ("output",)
+
     def __init__(self, name, state_id, output=None):
         super().__init__(name, state_id)
         self.output = output  # Only used by Moore machines
@@ -35,4 +88,4 @@ class MooreState(State):
 
 class By:
     NAME = 1
-    ID = 2
\ No newline at end of file
+    ID = 2
@@ -1,11 +1,13 @@
 from dataclasses import dataclass
 from enum import Enum
-from typing import List, Union, Callable, Tuple, Dict
+from typing import List, Union, Callable, Tuple, Dict, Optional
 
 from automata.state import State
 
 
 class Transition:
+    __slots__ = ("symbol", "source", "target", "x", "y")
+
     def __init__(self, symbol, source, target, x=0, y=0):
         self.symbol = symbol
         self.source = source
@@ -14,6 +16,8 @@ class Transition:
         self.y = y
 
 class MealyTransition(Transition):
+    __slots__ = ("output",)
+
     def __init__(self, symbol, source, target, output, x=0, y=0):
         super().__init__(symbol, source, target, x, y)
         self.output = output # Only used by Mealy machines
@@ -22,6 +26,7 @@ class MealyTransition(Transition):
 @dataclass
 class PDATransition(Transition):
     """Transition class for PDAs with stack operations"""
+    __slots__ = ("stack_symbol", "stack_push")
     stack_symbol: str  # Symbol to read from stack
     stack_push: List[str]  # Symbols to push onto stack (an empty list means no push)
 
@@ -35,6 +40,7 @@ class PDATransition(Transition):
 @dataclass
 class TuringTransition(Transition):
     """Transition class for Turing machines"""
+    __slots__ = ("tape_symbol", "tape_write", "move")
     tape_symbol: str  # Symbol to read from tape
     tape_write: str  # Symbol to write to tape
     move: str  # Move tape head (L, R, or N for None)
@@ -47,13 +53,30 @@ class TuringTransition(Transition):
         self.move = move
 
 
+@dataclass
+class MultiTapeTuringTransition(Transition):
+    """Transition class for Turing machines with several tapes"""
+    __slots__ = ("tape_symbols", "tape_writes", "moves")
+    tape_symbols: Tuple[str, ...]  # Symbol to read from every tape
+    tape_writes: Tuple[str, ...]  # Symbol to write to every tape
+    moves: Tuple[str, ...]  # Move of every head (L, R, or N for None)
+
+    def __init__(self, source: 'State', target: 'State', tape_symbols: Tuple[str, ...],
+                 tape_writes: Tuple[str, ...], moves: Tuple[str, ...], x: int = 0, y: int = 0):
+        super().__init__(tape_symbols, source, target, x, y)
+        self.tape_symbols = tape_symbols
+        self.tape_writes = tape_writes
+        self.moves = moves
+
+
 @dataclass
 class MultiStackPDATransition(Transition):
     """Transition class for PDAs with multiple stack operations"""
-    stack_operations: Dict[str, List[str]]
+    __slots__ = ("stack_operations",)
+    stack_operations: Dict[str, Tuple[Optional[str], List[str]]]
 
     def __init__(self, symbol: str, source: 'State', target: 'State',
-                 stack_operations: Dict,
+                 stack_operations: Dict[str, Tuple[Optional[str], List[str]]],
                  x: int = 0, y: int = 0):
         """
         Initialize a multi-stack PDA transition
@@ -62,12 +85,15 @@ class MultiStackPDATransition(Transition):
             symbol: Input symbol triggering the transition
             source: Source state
             target: Target state
-            stack_symbols: Dict[stack_name, pop_symbol] or List[List[pop_symbols]]
-            stack_pushes: Dict[stack_name, push_symbols] or List[List[push_symbols]]
+            stack_operations: Dict[stack_name, (stack_symbol, stack_push)]. The transition
+                              requires `stack_symbol` on top of the stack, pops it and pushes
+                              `stack_push` (the first symbol ends up on top). A stack_symbol
+                              of None leaves the stack untouched apart from the push.
             x: X coordinate for visualization (optional)
             y: Y coordinate for visualization (optional)
         """
         super().__init__(symbol, source, target, x, y)
+        self.stack_operations = stack_operations
 
 
 
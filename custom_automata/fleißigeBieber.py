@@ -9,6 +9,8 @@ import gc
 
 # Import the Turing class (assuming it's in the same directory or properly imported)
 from automata.automata_classes import Turing
+from automata.simulation.batch import BatchTuring
+from automata.simulation.busy_beaver import SearchResult, search, to_standard_format, to_turing
 
 
 def calculate_total_combinations(states: int, symbols: int) -> int:
@@ -151,7 +153,7 @@ def evaluate_machine(args: tuple) -> Tuple[int, list]:
     Evaluate a single Turing machine and return the number of 1s and tape.
 
     Args:
-        args (tuple): (Turing machine, input length)
+        args (tuple): (Turing machine or frozen snapshot of one, input length)
 
     Returns:
         Tuple[int, list]: Number of 1s and final tape state
@@ -166,7 +168,48 @@ def evaluate_machine(args: tuple) -> Tuple[int, list]:
         return 0, []
 
 
-def parallel_evaluate_machines(machines: List[Turing], input_length: int = 10) -> Tuple[int, list]:
+def parallel_evaluate_machines(machines: List[Turing], input_length: int = 10,
+                               batch_size: int = 10000) -> Tuple[int, list]:
+    """
+    Evaluate machines in lockstep batches to find the best result.
+
+    Falls back to evaluating the machines one by one in a process pool if NumPy is
+    not installed.
+
+    Args:
+        machines (List[Turing]): List of Turing machines to evaluate
+        input_length (int): Length of initial input tape
+        batch_size (int): Number of machines simulated together
+
+    Returns:
+        Tuple[int, list]: Best number of 1s and corresponding tape
+    """
+    try:
+        import numpy  # noqa: F401
+    except ImportError:
+        return pool_evaluate_machines(machines, input_length)
+
+    total_machines = len(machines)
+    most_ones = 0
+    best_tape = []
+
+    for start in range(0, total_machines, batch_size):
+        # Same step budget as process_input's default max_iterations
+        result = BatchTuring(machines[start:start + batch_size]).run("0" * input_length, max_steps=1000)
+        ones = result.count("1") * result.accepted
+        best = int(ones.argmax()) if len(result) else 0
+        if len(result) and ones[best] > most_ones:
+            most_ones = int(ones[best])
+            best_tape = result.tape(best)
+
+        processed_machines = min(start + batch_size, total_machines)
+        percentage = (processed_machines / total_machines) * 100
+        print(f"Evaluating machines: {percentage:.2f}% complete ({processed_machines:,}/{total_machines:,})")
+
+    return most_ones, best_tape
+
+
+def pool_evaluate_machines(machines: List[Turing], input_length: int = 10) -> Tuple[int, list]:
     """
     Evaluate machines in parallel to find the best result.
 
@@ -182,8 +225,8 @@ def parallel_evaluate_machines(machines: List[Turing], input_length: int = 10) -
     last_print_time = time.time()
 
     with Pool(processes=max(1, cpu_count() - 1)) as pool:
-        # Create evaluation arguments
-        eval_args = [(tm, input_length) for tm in machines]
+        # Send compact snapshots, pickling whole Turing objects dominates the run time
+        eval_args = [(tm.freeze(), input_length) for tm in machines]
 
         most_ones = 0
         best_tape = []
@@ -204,27 +247,31 @@ def parallel_evaluate_machines(machines: List[Turing], input_length: int = 10) -
     return most_ones, best_tape
 
 
+def print_search_progress(result: SearchResult, finished_subtrees: int) -> None:
+    most_ones = max((candidate.ones for candidate in result.best), default=0)
+    print(f"Searched {finished_subtrees:,} subtrees: {result.halted:,} halting, {result.looping:,} looping, "
+          f"{result.holdouts:,} holdouts, most 1s so far: {most_ones}")
+
+
 def main():
     states = 3
     symbols = 2
 
     print(f"Starting Busy Beaver search for {states} states and {symbols} symbols")
 
-    # Machine Generation
+    # Enumerate machines in tree normal form, only the best ones are kept
     start = time.time()
-    tms = bb(states, symbols)
-    generation_time = time.time() - start
-    print(f"\nGeneration time: {generation_time:.2f} seconds")
+    result = search(states, symbols, max_steps=10000, progress=print_search_progress)
+    search_time = time.time() - start
 
-    # Machine Evaluation
-    start = time.time()
-    most_ones, best_tape = parallel_evaluate_machines(tms)
-    evaluation_time = time.time() - start
+    best = result.best[0]
+    best_tape = to_turing(best.machine, symbols).process_input("", max_iterations=best.steps)[1]
 
-    print(f"\nEvaluation time: {evaluation_time:.2f} seconds")
+    print(f"\nSearch time: {search_time:.2f} seconds")
+    print(f"Halting machines: {result.halted:,}, looping: {result.looping:,}, holdouts: {result.holdouts:,}")
+    print(f"Best machine: {to_standard_format(best.machine, symbols)} ({best.steps} steps)")
     print(f"Best result: {best_tape}")
-    print(f"Number of 1s: {most_ones}")
-    print(f"\nTotal time: {generation_time + evaluation_time:.2f} seconds")
+    print(f"Number of 1s: {best.ones}")
     print("Done!")
 
 
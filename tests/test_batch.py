@@ -0,0 +1,72 @@
+import random
+
+import pytest
+
+from automata.automata_classes import Turing
+
+numpy = pytest.importorskip("numpy")
+
+from automata.simulation.batch import BatchTuring  # noqa: E402
+from custom_automata.fleißigeBieber import evaluate_machine, parallel_evaluate_machines  # noqa: E402
+
+
+def random_machine(rnd: random.Random) -> Turing:
+    """A machine with a few missing transitions, so some runs halt, and sometimes a third symbol."""
+    machine = Turing(blank_symbol="0")
+    states = [f"q{index}" for index in range(rnd.randint(1, 5))]
+    symbols = "012"[:rnd.randint(2, 3)]
+    for state in states:
+        machine.add_state(state, is_final=rnd.random() < 0.5)
+    for state in states:
+        for symbol in symbols:
+            if rnd.random() < 0.85:
+                machine.add_transition(state, rnd.choice(states), symbol, rnd.choice(symbols), rnd.choice("LRN"))
+    return machine
+
+
+@pytest.mark.parametrize("seed", range(40))
+def test_batch_agrees_with_process_input(seed):
+    rnd = random.Random(seed)
+    machines = [random_machine(rnd) for _ in range(rnd.randint(1, 30))]
+    tape = "".join(rnd.choice("0112") for _ in range(rnd.randint(0, 8)))
+    # Long enough budgets to grow the tapes past the margin on either side
+    max_steps = rnd.choice([0, 1, 10, 200])
+    result = BatchTuring(machines).run(tape, max_steps)
+    assert len(result) == len(machines)
+
+    ones = result.count("1")
+    for index, machine in enumerate(machines):
+        # process_input takes max_iterations + 1 steps, but only reports a halt after
+        # at most max_iterations steps
+        expected = machine.process_input(tape, max_steps, return_steps=True)
+        halted = len(expected) == 3
+        assert bool(result.halted[index]) == halted
+        if not halted:
+            assert result.steps[index] == max_steps
+            if max_steps:
+                expected = machine.process_input(tape, max_steps - 1)
+            else:
+                expected = (False, ["0"] + list(tape) + ["0"])
+                machine.current_state, machine.head_position = machine.initial_state, 1
+        assert bool(result.accepted[index]) == (halted and expected[0])
+        if result.accepted[index]:
+            assert result.steps[index] == expected[2]
+        assert result.tape(index) == expected[1]
+        assert result.head_position(index) == machine.head_position
+        assert machine.compile().states[result.states[index]] is machine.current_state
+        assert ones[index] == expected[1].count("1")
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_batched_evaluation_agrees_with_single_machines(seed):
+    rnd = random.Random(seed)
+    machines = [random_machine(rnd) for _ in range(60)]
+    expected = max(evaluate_machine((machine, 4))[0] for machine in machines)
+    most_ones, tape = parallel_evaluate_machines(machines, input_length=4, batch_size=25)
+    assert most_ones == expected
+    assert tape.count("1") == most_ones
+
+
+def test_empty_batch():
+    result = BatchTuring([]).run("01", 10)
+    assert len(result) == 0
@@ -0,0 +1,32 @@
+import pytest
+
+from automata.simulation.busy_beaver import search, to_standard_format, to_turing
+
+
+@pytest.mark.parametrize("states, ones, steps", [(1, 1, 1), (2, 4, 6), (3, 6, 21)])
+def test_known_busy_beaver_values(states, ones, steps):
+    # Keep every halting machine, so the longest run is among them
+    result = search(states, max_steps=1000, keep=10 ** 4, processes=1)
+    assert result.halted == len(result.best)
+    assert result.best[0].ones == ones
+    assert max(candidate.steps for candidate in result.best) == steps
+
+
+def test_champion_runs_like_a_turing_machine():
+    champion = search(2, processes=1).best[0]
+    assert to_standard_format(champion.machine, 2) == "1RB1LB_1LA1RZ"
+    accepted, tape, steps = to_turing(champion.machine, 2).process_input("", return_steps=True)
+    assert accepted
+    assert (tape.count("1"), steps) == (champion.ones, champion.steps)
+
+
+@pytest.mark.parametrize("states, split_depth", [(2, 1), (3, 3)])
+def test_pooled_search_agrees_with_serial_search(states, split_depth):
+    serial = search(states, max_steps=1000, processes=1)
+    finished = []
+    pooled = search(states, max_steps=1000, processes=2, split_depth=split_depth, batch_size=4,
+                    progress=lambda result, count: finished.append(count))
+    assert [(candidate.ones, candidate.steps) for candidate in pooled.best] == \
+        [(candidate.ones, candidate.steps) for candidate in serial.best]
+    assert (pooled.halted, pooled.looping, pooled.holdouts) == (serial.halted, serial.looping, serial.holdouts)
+    assert finished and finished == sorted(finished)
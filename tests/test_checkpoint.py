@@ -0,0 +1,88 @@
+import random
+
+import pytest
+
+from automata.automata_classes import Turing
+from automata.simulation import checkpoint
+from automata.simulation.deciders import RunStatus
+
+
+def random_machine(rnd: random.Random) -> Turing:
+    """A machine with a few missing transitions, so some runs halt."""
+    machine = Turing(blank_symbol="0")
+    states = [f"q{index}" for index in range(rnd.randint(1, 4))]
+    for state in states:
+        machine.add_state(state, is_final=rnd.random() < 0.5)
+    for state in states:
+        for symbol in "01":
+            if rnd.random() < 0.85:
+                machine.add_transition(state, rnd.choice(states), symbol, rnd.choice("01"), rnd.choice("LRN"))
+    return machine
+
+
+@pytest.mark.parametrize("seed", range(80))
+def test_resumed_run_ends_like_uninterrupted_run(seed, tmp_path, monkeypatch):
+    # Small chunks, so the resumed run is split up as well
+    monkeypatch.setattr(checkpoint, "CHUNK_STEPS", 7)
+    rnd = random.Random(seed)
+    machine = random_machine(rnd)
+    tape = "".join(rnd.choice("01") for _ in range(rnd.randint(0, 8)))
+    budget = rnd.randint(1, 200)
+    expected = machine.process_input(tape, budget, return_steps=True)
+    state, head_position = machine.current_state.name, machine.head_position
+
+    path = str(tmp_path / "run.checkpoint")
+    first = machine.run_checkpointed(path, tape, max_steps=rnd.randint(0, budget))
+    # process_input takes max_iterations + 1 steps before it cuts a run off
+    decision = machine.resume_checkpointed(path, max_steps=budget + 1)
+    assert decision.steps >= first.steps
+    assert (machine.tape, machine.head_position, machine.current_state.name) == (expected[1], head_position, state)
+    if len(expected) == 2:
+        assert decision.steps == budget + 1
+        if decision.status != RunStatus.BUDGET_EXCEEDED:
+            # Halting on the last step is only found out by process_input with one more step
+            assert decision.status == RunStatus.HALTED
+            assert len(machine.process_input(tape, budget + 1)) == 3
+    else:
+        assert decision.status == RunStatus.HALTED
+        if expected[0]:
+            assert decision.steps == expected[2]
+
+    uninterrupted = machine.run_checkpointed(str(tmp_path / "whole.checkpoint"), tape, max_steps=budget + 1)
+    assert uninterrupted == decision
+
+
+def test_resumed_decider_run_ends_like_uninterrupted_run(tmp_path):
+    # Writes ones while it steps right, back and right again, a translated cycler
+    machine = Turing(blank_symbol="0")
+    for state in "abc":
+        machine.add_state(state)
+    machine.add_transition("a", "b", ["0", "1"], ["1", "1"], "R")
+    machine.add_transition("b", "c", "0", "0", "L")
+    machine.add_transition("c", "a", "1", "1", "R")
+    expected = machine.decide_halting("", max_steps=10 ** 5)
+    assert expected.reason == "translated cycler"
+    tape = machine.tape
+
+    path = str(tmp_path / "run.checkpoint")
+    assert machine.run_checkpointed(path, "", max_steps=2, deciders=True).steps == 2
+    assert machine.resume_checkpointed(path, max_steps=10 ** 5) == expected
+    assert machine.tape == tape
+
+
+def shuttle(write: str = "1") -> Turing:
+    machine = Turing(blank_symbol="0")
+    machine.add_state("q0")
+    machine.add_state("q1")
+    for symbol in "01":
+        machine.add_transition("q0", "q1", symbol, write, "R")
+        machine.add_transition("q1", "q0", symbol, "1", "L")
+    return machine
+
+
+def test_checkpoint_of_a_changed_machine_is_rejected(tmp_path):
+    path = str(tmp_path / "run.checkpoint")
+    shuttle().run_checkpointed(path, "", max_steps=10)
+    assert shuttle().resume_checkpointed(path, max_steps=20).steps == 20
+    with pytest.raises(ValueError, match="different machine"):
+        shuttle(write="0").resume_checkpointed(path, max_steps=30)
@@ -0,0 +1,62 @@
+import random
+
+import pytest
+
+from automata.automata_classes import Turing
+
+
+def random_machine(rnd: random.Random) -> Turing:
+    """A machine with random transitions, about half of them self-loops that run as scans."""
+    machine = Turing(blank_symbol="0")
+    states = [f"q{index}" for index in range(rnd.randint(1, 5))]
+    symbols = [str(code) for code in range(rnd.randint(2, 4))]
+    for state in states:
+        machine.add_state(state)
+    for state in states:
+        for symbol in symbols:
+            if rnd.random() < 0.45:
+                machine.add_transition(state, state, symbol, symbol, rnd.choice("LR"))
+            elif rnd.random() < 0.8:
+                machine.add_transition(state, rnd.choice(states), symbol, rnd.choice(symbols), rnd.choice("LRN"))
+    return machine
+
+
+def cycle(state_count: int) -> Turing:
+    """A machine that changes its state on every step."""
+    machine = Turing(blank_symbol="0")
+    for index in range(state_count):
+        machine.add_state(f"s{index}")
+    for index in range(state_count):
+        target = f"s{(index + 1) % state_count}"
+        move = "R" if index % 2 == 0 else "L"
+        machine.add_transition(f"s{index}", target, "0", "1", move)
+        machine.add_transition(f"s{index}", target, "1", "0", move)
+    return machine
+
+
+@pytest.mark.parametrize("seed", range(200))
+def test_generated_code_runs_like_tables(seed, tmp_path):
+    rnd = random.Random(seed)
+    machine = random_machine(rnd)
+    machine.compile_python(str(tmp_path))
+    tape = "".join(rnd.choice("0123") for _ in range(rnd.randint(0, 40)))
+    tape = "".join(symbol for symbol in tape if symbol in machine.compile().symbols)
+    budget = rnd.choice([0, 1, 7, 300, 5000])
+    expected = machine.process_input(tape, budget, return_steps=True, backend="table")
+    assert machine.process_input(tape, budget, return_steps=True, backend="python") == expected
+
+
+@pytest.mark.parametrize("state_count", [2, 3, 300])
+def test_generated_code_follows_state_changes(state_count, tmp_path):
+    machine = cycle(state_count)
+    machine.compile_python(str(tmp_path))
+    expected = machine.process_input("", 2000, return_steps=True, backend="table")
+    assert machine.process_input("", 2000, return_steps=True, backend="python") == expected
+
+
+def test_generated_machine_is_cached_until_the_machine_changes(tmp_path):
+    machine = cycle(3)
+    generated = machine.compile_python(str(tmp_path))
+    assert machine.compile_python(str(tmp_path)) is generated
+    machine.add_state("extra")
+    assert machine.compile_python(str(tmp_path)) is not generated
@@ -0,0 +1,58 @@
+import asyncio
+
+import pytest
+
+from automata.automata_classes import MultiStackPDA, MultiTapeTuring, Turing
+
+
+def right_forever() -> Turing:
+    machine = Turing(blank_symbol="0")
+    machine.add_state("q0")
+    machine.add_transition("q0", "q0", ["0", "1"], ["1", "1"], "R")
+    return machine
+
+
+def right_forever_on_two_tapes() -> MultiTapeTuring:
+    machine = MultiTapeTuring(blank_symbol="0")
+    machine.add_state("q0")
+    for symbol in "01":
+        machine.add_transition("q0", "q0", [symbol, "0"], ["1", "1"], "RR")
+    return machine
+
+
+def counter() -> MultiStackPDA:
+    """Pushes an A per 'a' on both stacks and accepts on a closing 'b'."""
+    machine = MultiStackPDA(2)
+    machine.add_state("push")
+    machine.add_state("done", is_final=True)
+    machine.add_transition("push", "push", "a", [None, None], [["A"], ["A"]])
+    machine.add_transition("push", "done", "b", [None, None], [[], []])
+    return machine
+
+
+@pytest.mark.parametrize("make", [right_forever, right_forever_on_two_tapes])
+@pytest.mark.parametrize("step_budget", [None, 5, 50])
+def test_max_iterations_applies_to_turing_machines(make, step_budget):
+    machine = make()
+    expected = machine.process_input("111", min(10, step_budget or 10), return_steps=True)
+    result = asyncio.run(machine.run_async("111", step_budget, yield_every=3, max_iterations=10,
+                                           return_steps=True))
+    assert result == expected
+
+
+@pytest.mark.parametrize("step_budget", [None, 3, 50])
+@pytest.mark.parametrize("max_steps", [None, 4, 5])
+def test_max_steps_applies_to_multistack_pda(step_budget, max_steps):
+    machine = counter()
+    budgets = [budget for budget in (step_budget, max_steps) if budget is not None]
+    expected = machine.process_input("aaaab", max_steps=min(budgets) if budgets else None)
+    assert expected == (not budgets or min(budgets) >= 5)
+    result = asyncio.run(machine.run_async("aaaab", step_budget, yield_every=2, max_steps=max_steps))
+    assert result == expected
+
+
+def test_unknown_options_are_rejected():
+    with pytest.raises(TypeError):
+        asyncio.run(right_forever().run_async("111", max_steps=10))
+    with pytest.raises(TypeError):
+        asyncio.run(counter().run_async("aaaab", max_iterations=10))
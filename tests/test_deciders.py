@@ -0,0 +1,50 @@
+import random
+
+import pytest
+
+from automata.automata_classes import Turing
+from automata.simulation.deciders import RunStatus
+
+CONFIRM_STEPS = 20000  # Steps a plain run takes to confirm a loop
+
+
+def random_machine(rnd: random.Random) -> Turing:
+    """A machine on the symbols 0 and 1 with a few missing transitions to halt on."""
+    machine = Turing(blank_symbol="0")
+    states = [f"q{index}" for index in range(rnd.randint(1, 4))]
+    for state in states:
+        machine.add_state(state)
+    for state in states:
+        for symbol in "01":
+            if rnd.random() < 0.85:
+                machine.add_transition(state, rnd.choice(states), symbol, rnd.choice("01"), rnd.choice("LRN"))
+    return machine
+
+
+def plain_run(machine: Turing, tape: str, max_steps: int):
+    """Steps the machine through its transition dicts. Returns the state and steps when it halts, else None."""
+    cells = dict(enumerate(tape))
+    head, state = 0, machine.initial_state
+    for steps in range(max_steps + 1):
+        transition = state.transitions.get(cells.get(head, machine.blank_symbol))
+        if transition is None:
+            return state.name, steps
+        cells[head] = transition.tape_write
+        head += {"L": -1, "R": 1}.get(transition.move, 0)
+        state = transition.target
+    return None
+
+
+@pytest.mark.parametrize("seed", range(400))
+def test_decisions_agree_with_plain_runs(seed):
+    rnd = random.Random(seed)
+    machine = random_machine(rnd)
+    tape = "".join(rnd.choice("01") for _ in range(rnd.randint(0, 5)))
+    decision = machine.decide_halting(tape, max_steps=2000)
+    outcome = plain_run(machine, tape, CONFIRM_STEPS)
+    if decision.status == RunStatus.HALTED:
+        assert outcome == (machine.compile().states[decision.state].name, decision.steps)
+    elif decision.status == RunStatus.LOOPING:
+        assert outcome is None, decision.reason
+    else:
+        assert outcome is None or outcome[1] > 2000
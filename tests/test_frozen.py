@@ -0,0 +1,93 @@
+import pickle
+import random
+from multiprocessing import Pool, shared_memory
+
+import pytest
+
+from automata.automata_classes import Turing
+
+
+def random_machine(rnd: random.Random, state_count: int = 5) -> Turing:
+    machine = Turing(blank_symbol="0")
+    states = [f"q{index}" for index in range(rnd.randint(1, state_count))]
+    for state in states:
+        machine.add_state(state, is_final=rnd.random() < 0.5)
+    for state in states:
+        for symbol in "012":
+            if rnd.random() < 0.85:
+                machine.add_transition(state, rnd.choice(states), symbol, rnd.choice("012"), rnd.choice("LRN"))
+    return machine
+
+
+def run_snapshot(arguments):
+    snapshot, tape = arguments
+    return snapshot.shared_name, snapshot.process_input(tape, 500, return_steps=True)
+
+
+@pytest.mark.parametrize("seed", range(100))
+def test_frozen_run_agrees_with_machine(seed):
+    rnd = random.Random(seed)
+    machine = random_machine(rnd)
+    frozen = machine.freeze()
+    copy = pickle.loads(pickle.dumps(frozen))
+    assert copy == frozen and hash(copy) == hash(frozen)
+    for _ in range(5):
+        tape = "".join(rnd.choice("0123") for _ in range(rnd.randint(0, 10)))
+        budget = rnd.choice([0, 5, 500])
+        expected = machine.process_input(tape, budget, return_steps=True)
+        assert frozen.process_input(tape, budget, return_steps=True) == expected
+        assert copy.process_input(tape, budget, return_steps=True) == expected
+
+
+def test_snapshot_is_immutable():
+    frozen = random_machine(random.Random(0)).freeze()
+    with pytest.raises(AttributeError):
+        frozen.initial = 1
+    with pytest.raises(TypeError):
+        frozen.write[0] = 1
+
+
+def test_shared_snapshot_pickles_as_block_name():
+    machine = random_machine(random.Random(1), state_count=200)
+    frozen = machine.freeze()
+    shared = frozen.share()
+    name = shared.shared_name
+    try:
+        assert shared == frozen and name is not None
+        data = pickle.dumps(shared)
+        assert len(data) < len(pickle.dumps(frozen)) - len(frozen.next_state.tobytes())
+        attached = pickle.loads(data)
+        assert attached.shared_name == name
+        assert attached == frozen
+        assert attached.process_input("0120", 500, return_steps=True) == \
+            machine.process_input("0120", 500, return_steps=True)
+        attached.close()
+        assert attached.shared_name is None
+
+        # Unlinking a snapshot that did not create the block leaves the block alone
+        attached = pickle.loads(data)
+        attached.unlink()
+        assert shared.process_input("0120", 500) == machine.process_input("0120", 500)
+    finally:
+        shared.unlink()
+    assert shared.shared_name is None
+    with pytest.raises(FileNotFoundError):
+        shared_memory.SharedMemory(name=name)
+
+
+def test_shared_snapshot_in_worker_processes():
+    rnd = random.Random(2)
+    machine = random_machine(rnd)
+    shared = machine.freeze().share()
+    tapes = ["".join(rnd.choice("012") for _ in range(rnd.randint(0, 10))) for _ in range(20)]
+    try:
+        with Pool(processes=2) as pool:
+            results = pool.map(run_snapshot, [(shared, tape) for tape in tapes])
+        for tape, (name, result) in zip(tapes, results):
+            assert name == shared.shared_name
+            assert result == machine.process_input(tape, 500, return_steps=True)
+    finally:
+        name = shared.shared_name
+        shared.unlink()
+    with pytest.raises(FileNotFoundError):
+        shared_memory.SharedMemory(name=name)
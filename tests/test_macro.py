@@ -0,0 +1,76 @@
+import random
+
+import pytest
+
+from automata.automata_classes import Turing
+
+
+def random_machine(rnd: random.Random) -> Turing:
+    """A machine with a few missing transitions, so some runs halt."""
+    machine = Turing(blank_symbol="0")
+    states = [f"q{index}" for index in range(rnd.randint(1, 4))]
+    for state in states:
+        machine.add_state(state, is_final=rnd.random() < 0.3)
+    for state in states:
+        for symbol in "01":
+            if rnd.random() < 0.85:
+                machine.add_transition(state, rnd.choice(states), symbol, rnd.choice("01"), rnd.choice("LRN"))
+    return machine
+
+
+def bouncing() -> Turing:
+    """Changes its state on every step without ever moving the head."""
+    machine = Turing(blank_symbol="0")
+    machine.add_state("a")
+    machine.add_state("b")
+    machine.add_transition("a", "b", "0", "0", "N")
+    machine.add_transition("b", "a", "0", "0", "N")
+    return machine
+
+
+@pytest.mark.parametrize("seed", range(300))
+def test_accelerated_run_agrees_with_process_input(seed):
+    rnd = random.Random(seed)
+    machine = random_machine(rnd)
+    tape = rnd.choice("01") * rnd.randint(0, 30) + "".join(rnd.choice("01") for _ in range(rnd.randint(0, 4)))
+    budget = rnd.choice([0, 1, 5, 50, 300])
+    expected = machine.process_input(tape, budget, return_steps=True)
+    state, head_position = machine.current_state.name, machine.head_position
+
+    # process_input takes max_iterations + 1 steps before it cuts a run off
+    result = machine.run_accelerated(tape, budget + 1, block_size=rnd.choice([1, 2, 3]))
+    assert result.tape() == expected[1]
+    assert result.count("1") == expected[1].count("1")
+    assert (result.state, result.head_position) == (state, head_position)
+    if not result.halted:
+        assert len(expected) == 2
+        assert result.steps == budget + 1
+    else:
+        # Halting on the last step is only found out by a run with one more step
+        assert len(expected) == 3 or result.steps == budget + 1
+        assert result.accepted == machine.states[result.state].is_final
+        halted = machine.process_input(tape, result.steps, return_steps=True)
+        assert len(halted) == 3
+        if result.accepted:
+            assert halted[2] == result.steps
+        if result.steps:
+            assert len(machine.process_input(tape, result.steps - 1)) == 2
+    if result.looping:
+        assert len(machine.process_input(tape, budget + 1000)) == 2
+
+
+@pytest.mark.parametrize("max_steps", [10, 10 ** 6, 10 ** 6 + 1])
+def test_cycle_inside_a_block_is_looping_under_a_budget(max_steps):
+    result = bouncing().run_accelerated("", max_steps=max_steps)
+    assert result.looping and not result.halted
+    assert result.steps == max_steps
+    assert result.state == ("a" if max_steps % 2 == 0 else "b")
+
+
+def test_sweep_over_blank_tape_is_looping_under_a_budget():
+    machine = Turing(blank_symbol="0")
+    machine.add_state("q0")
+    machine.add_transition("q0", "q0", "0", "1", "R")
+    result = machine.run_accelerated("", max_steps=10 ** 9)
+    assert result.looping and result.steps == 10 ** 9
+    assert result.count("1") == 10 ** 9
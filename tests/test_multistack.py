@@ -0,0 +1,230 @@
+import itertools
+import random
+
+import pytest
+
+from automata.automata_classes import MultiStackPDA
+
+
+def transfer_machine(deterministic: bool = True) -> MultiStackPDA:
+    """Pushes an A per 'a' and moves them to the second stack with an epsilon loop after 'b'."""
+    machine = MultiStackPDA(2, deterministic=deterministic)
+    machine.add_state('push')
+    machine.add_state('move')
+    machine.add_state('done', is_final=True)
+    machine.add_transition('push', 'push', 'a', [None, None], [['A'], []])
+    machine.add_transition('push', 'move', 'b', [None, None], [[], []])
+    machine.add_transition('move', 'move', '', ['A', None], [[], ['A']])
+    machine.add_transition('move', 'done', '', ['|', None], [['|'], []])
+    return machine
+
+
+def test_long_epsilon_chain():
+    machine = transfer_machine()
+    assert machine.process_input('a' * 20000 + 'b')
+    assert machine.stacks == [['|'], ['|'] + ['A'] * 20000]
+
+
+def test_epsilon_loop_growing_a_stack_is_detected():
+    machine = MultiStackPDA(2)
+    machine.add_state('x')
+    machine.add_transition('x', 'x', '', ['|', None], [['|'], ['A']])
+    with pytest.raises(ValueError, match="never terminate"):
+        machine.process_input('')
+
+
+def test_epsilon_cycle_dipping_into_every_stack_is_detected():
+    # Every stack is popped at some point of the cycle, at different times, so only
+    # the exact configuration repeats
+    machine = MultiStackPDA(2, initial_stacks=[['|', 'A'], ['|', 'B']])
+    for state in 'pqr':
+        machine.add_state(state)
+    machine.add_transition('p', 'q', '', ['A', None], [[], []])
+    machine.add_transition('q', 'r', '', ['|', 'B'], [['A', '|'], []])
+    machine.add_transition('r', 'p', '', [None, '|'], [[], ['B', '|']])
+    with pytest.raises(ValueError, match="never terminate"):
+        machine.process_input('')
+
+
+def test_nondeterministic_ww():
+    machine = MultiStackPDA(2, deterministic=False)
+    machine.add_state('push')
+    machine.add_state('move')
+    machine.add_state('match')
+    machine.add_state('accept', is_final=True)
+    for symbol in 'ab':
+        machine.add_transition('push', 'push', symbol, [None, None], [[symbol], []])
+        machine.add_transition('move', 'move', '', [symbol, None], [[], [symbol]])
+        machine.add_transition('match', 'match', symbol, [None, symbol], [[], []])
+    machine.add_transition('push', 'move', '', [None, None], [[], []])
+    machine.add_transition('move', 'match', '', ['|', None], [['|'], []])
+    machine.add_transition('match', 'accept', '', [None, '|'], [[], ['|']])
+
+    for length in range(9):
+        for word in map(''.join, itertools.product('ab', repeat=length)):
+            half = len(word) // 2
+            assert machine.process_input(word) == (len(word) % 2 == 0 and word[:half] == word[half:]), word
+
+
+@pytest.mark.parametrize("deterministic", [True, False])
+def test_run_using_exactly_the_step_budget_is_accepted(deterministic):
+    machine = MultiStackPDA(2, deterministic=deterministic)
+    machine.add_state('q', is_final=True)
+    machine.add_transition('q', 'q', 'a', [None, None], [['A'], []])
+    assert machine.process_input('aaa')
+    assert not machine.process_input('aaa', max_steps=2)
+    assert machine.process_input('aaa', max_steps=3)
+    assert machine.process_input('aaa', max_steps=4)
+
+
+@pytest.mark.parametrize("deterministic", [True, False])
+def test_step_budget_counts_epsilon_transitions(deterministic):
+    machine = transfer_machine(deterministic)
+    # Three pushes, the 'b', three moves and the final epsilon transition
+    assert not machine.process_input('aaab', max_steps=7)
+    assert machine.process_input('aaab', max_steps=8)
+
+
+def random_machine(rnd: random.Random, deterministic: bool) -> MultiStackPDA:
+    """A 3-stack machine whose epsilon transitions never grow a stack, so every closure is finite."""
+    machine = MultiStackPDA(3, deterministic=deterministic)
+    states = [f"q{index}" for index in range(rnd.randint(1, 3))]
+    for state in states:
+        machine.add_state(state, is_final=rnd.random() < 0.5)
+    for _ in range(rnd.randint(1, 8)):
+        symbol = rnd.choice(["a", "b", ""])
+        tops = [rnd.choice(["|", "A", None, None]) for _ in range(3)]
+        pushes = [[rnd.choice("|A") for _ in range(rnd.randint(0, 2 if symbol else int(top is not None)))]
+                  for top in tops]
+        try:
+            machine.add_transition(rnd.choice(states), rnd.choice(states), symbol, tops, pushes)
+        except ValueError:
+            pass  # Duplicate transition
+    machine.alphabet |= {"a", "b"}
+    return machine
+
+
+def successors(machine: MultiStackPDA, configuration, symbol: str):
+    """The configurations every transition for `symbol` that matches the stack tops leads to."""
+    state, stacks = configuration
+    for transitions in state.transitions.values():
+        for transition in transitions:
+            if transition.symbol != symbol:
+                continue
+            new_stacks = []
+            for stack, name in zip(stacks, machine.stack_names):
+                top, push = transition.stack_operations[name]
+                if top is not None:
+                    if not stack or stack[-1] != top:
+                        break
+                    stack = stack[:-1]
+                new_stacks.append(stack + tuple(reversed(push)))
+            else:
+                yield transition.target, tuple(new_stacks)
+
+
+def initial_configuration(machine: MultiStackPDA):
+    return machine.initial_state, tuple(tuple(stack) for stack in machine.initial_stacks)
+
+
+def plain_run(machine: MultiStackPDA, word: str):
+    """Tracks the set of configurations of all runs. Returns it, or None on rejection."""
+    def closure(configurations):
+        found, pending = set(configurations), list(configurations)
+        while pending:
+            for successor in successors(machine, pending.pop(), ""):
+                if successor not in found:
+                    found.add(successor)
+                    pending.append(successor)
+        return found
+
+    configurations = closure({initial_configuration(machine)})
+    for symbol in word:
+        configurations = closure({successor for configuration in configurations
+                                  for successor in successors(machine, configuration, symbol)})
+        if not configurations:
+            return None
+    return configurations
+
+
+def plain_deterministic_run(machine: MultiStackPDA, word: str):
+    """Follows the single run. Returns its last configuration, or None on rejection."""
+    configuration = initial_configuration(machine)
+    for symbol in [*word, None]:
+        seen = set()
+        while True:
+            following = next(successors(machine, configuration, ""), None)
+            if following is None:
+                break
+            if configuration in seen:
+                raise RecursionError("epsilon transitions loop")
+            seen.add(configuration)
+            configuration = following
+        if symbol is None:
+            return configuration
+        configuration = next(successors(machine, configuration, symbol), None)
+        if configuration is None:
+            return None
+
+
+def has_overlapping_transitions(machine: MultiStackPDA) -> bool:
+    """Whether two transitions of a state can apply on the same input and stack tops."""
+    for state in machine.states.values():
+        transitions = [transition for group in state.transitions.values() for transition in group]
+        for first, second in itertools.combinations(transitions, 2):
+            if first.symbol != second.symbol and "" not in (first.symbol, second.symbol):
+                continue
+            if all(None in (first.stack_operations[name][0], second.stack_operations[name][0])
+                   or first.stack_operations[name][0] == second.stack_operations[name][0]
+                   for name in machine.stack_names):
+                return True
+    return False
+
+
+WORDS = ["", "a", "ab", "ba", "aab", "abab"]
+
+
+@pytest.mark.parametrize("seed", range(300))
+def test_nondeterministic_runs_agree_with_plain_run(seed):
+    machine = random_machine(random.Random(seed), deterministic=False)
+    for word in WORDS:
+        configurations = plain_run(machine, word)
+        accepted = configurations is not None and any(state.is_final for state, _ in configurations)
+        assert machine.process_input(word) == accepted
+        if configurations is not None:
+            assert machine.current_states == configurations
+
+
+@pytest.mark.parametrize("seed", range(600))
+def test_deterministic_runs_agree_with_plain_run(seed):
+    machine = random_machine(random.Random(seed), deterministic=True)
+    try:
+        machine.compile()
+    except ValueError:
+        assert has_overlapping_transitions(machine)
+        return
+    assert not has_overlapping_transitions(machine)
+    for word in WORDS:
+        try:
+            configuration = plain_deterministic_run(machine, word)
+        except RecursionError:
+            with pytest.raises(ValueError, match="never terminate"):
+                machine.process_input(word)
+            continue
+        accepted = machine.process_input(word)
+        if configuration is None:
+            assert not accepted
+        else:
+            assert accepted == configuration[0].is_final
+            assert (machine.current_state, tuple(tuple(stack) for stack in machine.stacks)) == configuration
+
+
+def test_unread_stacks_do_not_multiply_the_table():
+    machine = MultiStackPDA(4, deterministic=False)
+    machine.add_state('q', is_final=True)
+    symbols = [f"S{index}" for index in range(50)]
+    for symbol in symbols:
+        machine.add_transition('q', 'q', 'a', [None, None, None, None], [[symbol], [], [], []])
+    machine.add_transition('q', 'q', 'b', [symbols[0], None, None, None], [[], [], [], []])
+    assert sum(len(entries) for entries in machine.compile().table) == 2
+    assert machine.process_input('aab')
@@ -0,0 +1,92 @@
+import pytest
+
+from automata.automata_classes import MultiTapeTuring
+
+
+def copier() -> MultiTapeTuring:
+    """Copies the input over {a, b} to the second tape, up to the first blank."""
+    machine = MultiTapeTuring()
+    machine.add_state("copy")
+    machine.add_state("done", is_final=True)
+    for symbol in "ab":
+        machine.add_transition("copy", "copy", [symbol, "|"], [symbol, symbol], "RR")
+    machine.add_transition("copy", "done", ["|", "|"], ["|", "|"], "NN")
+    return machine
+
+
+def comparer() -> MultiTapeTuring:
+    """Accepts 'w#w' for words w over {a, b}: copies w, rewinds the copy and compares."""
+    machine = MultiTapeTuring()
+    for state in ["copy", "rewind", "compare"]:
+        machine.add_state(state)
+    machine.add_state("equal", is_final=True)
+    for symbol in "ab":
+        machine.add_transition("copy", "copy", [symbol, "|"], [symbol, symbol], "RR")
+        machine.add_transition("rewind", "rewind", ["#", symbol], ["#", symbol], "NL")
+        machine.add_transition("compare", "compare", [symbol, symbol], [symbol, symbol], "RR")
+    machine.add_transition("copy", "rewind", ["#", "|"], ["#", "|"], "NL")
+    machine.add_transition("rewind", "compare", ["#", "|"], ["#", "|"], "RR")
+    machine.add_transition("compare", "equal", ["|", "|"], ["|", "|"], "NN")
+    return machine
+
+
+@pytest.mark.parametrize("word", ["", "a", "ab", "abba", "b" * 500])
+def test_copy(word):
+    machine = copier()
+    assert machine.process_input(word, return_steps=True) == (True, [["|", *word, "|"], [*word, "|"]], len(word) + 1)
+    assert machine.head_positions == [len(word) + 1, len(word)]
+    assert machine.current_state.name == "done"
+
+
+def test_copy_stops_at_a_blank_in_the_input():
+    machine = copier()
+    accepted, tapes = machine.process_input("ab|ba")
+    assert accepted
+    assert tapes == [["|", "a", "b", "|", "b", "a", "|"], ["a", "b", "|"]]
+    assert machine.head_positions == [3, 2]
+
+
+def test_unknown_symbol_halts_without_accepting():
+    machine = copier()
+    assert machine.process_input("abc", return_steps=True) == (False, [["|", "a", "b", "c", "|"], ["a", "b", "|"]], 2)
+    assert machine.current_state.name == "copy"
+
+
+@pytest.mark.parametrize("word, accepted", [
+    ("#", True), ("a#a", True), ("ab#ab", True), ("abba#abba", True),
+    ("a#", False), ("#b", False), ("ab#ba", False), ("ab#abb", False), ("abb#ab", False),
+])
+def test_compare(word, accepted):
+    machine = comparer()
+    result, tapes = machine.process_input(word)
+    assert result == accepted
+    first = word.split("#")[0]
+    assert tapes[0] == ["|", *word, "|"]
+    # The rewind steps one cell left of the copy, onto a blank
+    assert tapes[1][:len(first) + 1] == ["|", *first]
+    assert machine.current_state.name == ("equal" if accepted else "compare")
+
+
+def test_max_iterations():
+    machine = copier()
+    word = "ab" * 10
+    # A run halting after n steps needs max_iterations >= n, like Turing.process_input
+    assert machine.process_input(word, max_iterations=len(word) + 1, return_steps=True)[0]
+    accepted, tapes, steps = machine.process_input(word, max_iterations=len(word), return_steps=True)
+    assert not accepted
+    assert steps == len(word) + 1
+    assert machine.current_state.name == "done"
+
+    accepted, tapes, steps = machine.process_input(word, max_iterations=5, return_steps=True)
+    assert not accepted
+    assert steps == 6
+    assert tapes[1] == list(word[:6]) + ["|"]
+    assert machine.current_state.name == "copy"
+
+    runaway = MultiTapeTuring()
+    runaway.add_state("run")
+    runaway.add_transition("run", "run", ["|", "|"], ["|", "x"], "RL")
+    accepted, tapes, steps = runaway.process_input("", max_iterations=99, return_steps=True)
+    assert not accepted and steps == 100
+    assert tapes == [["|"] * 102, ["|"] + ["x"] * 100]
+    assert runaway.head_positions == [101, 0]
@@ -0,0 +1,72 @@
+import asyncio
+import random
+
+import pytest
+
+from automata.automata_classes import NTM
+
+
+def random_machine(rnd: random.Random) -> NTM:
+    """A machine with up to two random transitions per state and symbol."""
+    machine = NTM(blank_symbol="0")
+    states = [f"q{index}" for index in range(rnd.randint(1, 5))]
+    for state in states:
+        machine.add_state(state, is_final=rnd.random() < 0.3)
+    for state in states:
+        for symbol in "012":
+            for _ in range(rnd.choice([0, 1, 1, 2])):
+                machine.add_transition(state, rnd.choice(states), symbol, rnd.choice("012"), rnd.choice("LRN"))
+    return machine
+
+
+def two_branches() -> NTM:
+    """Accepts after 4 steps on the branch tried first and after 3 steps on the other one."""
+    machine = NTM()
+    for state in ["q0", "a1", "a2", "a3", "b1", "b2"]:
+        machine.add_state(state)
+    machine.add_state("accept", is_final=True)
+    machine.add_transition("q0", "a1", "|", "|", "R")
+    machine.add_transition("q0", "b1", "|", "|", "R")
+    machine.add_transition("a1", "a2", "|", "|", "R")
+    machine.add_transition("a2", "a3", "|", "|", "R")
+    machine.add_transition("a3", "accept", "|", "|", "R")
+    machine.add_transition("b1", "b2", "|", "|", "R")
+    machine.add_transition("b2", "accept", "|", "|", "R")
+    return machine
+
+
+def test_iterative_deepening_finds_shortest_run():
+    machine = two_branches()
+    assert machine.process_input("", strategy="iddfs", return_steps=True)[2] == 3
+    assert machine.process_input("", strategy="bfs", return_steps=True)[2] == 3
+
+
+@pytest.mark.parametrize("seed", range(300))
+def test_iterative_deepening_agrees_with_breadth_first(seed):
+    rnd = random.Random(seed)
+    machine = random_machine(rnd)
+    tape = "".join(rnd.choice("12") for _ in range(rnd.randint(0, 4)))
+    accepted, _, steps = machine.process_input(tape, 12, strategy="bfs", return_steps=True)
+    for table_size in (None, 3):
+        result = machine.process_input(tape, 12, strategy="iddfs", max_configurations=table_size,
+                                       return_steps=True)
+        assert result[0] == accepted
+        if accepted:
+            assert result[2] == steps
+
+
+@pytest.mark.parametrize("strategy", ["bfs", "iddfs"])
+def test_step_budget_limits_explored_configurations(strategy):
+    machine = two_branches()
+    progress = []
+    accepted, _ = asyncio.run(machine.run_async("", step_budget=4, yield_every=1, progress=progress.append,
+                                                strategy=strategy))
+    assert not accepted
+    assert machine.output[""] == {"accepted": False, "explored": 4, "exhausted": True}
+    assert progress and progress == sorted(progress) and progress[-1] <= 4
+
+    result = asyncio.run(machine.run_async("", step_budget=100, strategy=strategy, max_iterations=2))
+    assert result == (False, [])
+    assert machine.output[""]["exhausted"]
+    result = asyncio.run(machine.run_async("", step_budget=100, strategy=strategy, max_iterations=3))
+    assert result[0]
@@ -0,0 +1,145 @@
+import random
+
+import pytest
+
+from automata.automata_classes import DPDA, NPDA
+
+WORDS = ["", "a", "b", "ab", "ba", "aab", "abba", "bbb", "abab", "aaabbb"]
+EPSILON_LIMIT = 500  # Epsilon steps after which the plain DPDA run counts as diverging
+
+
+def random_npda(rnd: random.Random) -> NPDA:
+    """A machine whose epsilon transitions never grow the stack, so every closure is finite."""
+    machine = NPDA(initial_stack=["Z"])
+    states = [f"q{index}" for index in range(rnd.randint(1, 4))]
+    for state in states:
+        machine.add_state(state, is_final=rnd.random() < 0.4)
+    for _ in range(rnd.randint(1, 10)):
+        symbol = rnd.choice(["a", "b", ""])
+        push = [rnd.choice("ZAB") for _ in range(rnd.randint(0, 2 if symbol else 1))]
+        machine.add_transition(rnd.choice(states), rnd.choice(states), symbol, rnd.choice("ZAB"), push)
+    machine.alphabet |= {"a", "b"}
+    return machine
+
+
+def random_dpda(rnd: random.Random) -> DPDA:
+    machine = DPDA(initial_stack=["Z"])
+    states = [f"q{index}" for index in range(rnd.randint(1, 4))]
+    for state in states:
+        machine.add_state(state, is_final=rnd.random() < 0.4)
+    for _ in range(rnd.randint(1, 12)):
+        push = [rnd.choice("ZAB") for _ in range(rnd.randint(0, 2))]
+        try:
+            machine.add_transition(rnd.choice(states), rnd.choice(states), rnd.choice(["a", "b", "a", "b", ""]),
+                                   rnd.choice("ZAB"), push)
+        except ValueError:
+            pass  # Would break determinism
+    machine.alphabet |= {"a", "b"}
+    return machine
+
+
+def apply(stack: tuple, transition) -> tuple:
+    """Pops the transition's stack symbol and pushes its symbols, the first one ending on top."""
+    if not stack or stack[-1] != transition.stack_symbol:
+        return None
+    return stack[:-1] + tuple(reversed(transition.stack_push))
+
+
+def plain_npda_run(machine: NPDA, word: str):
+    """Tracks the set of configurations symbol by symbol. Returns it, or None on rejection."""
+    def closure(configurations):
+        found = set(configurations)
+        pending = list(found)
+        while pending:
+            state, stack = pending.pop()
+            for transition in state.transitions.get("", []):
+                new_stack = apply(stack, transition)
+                if new_stack is not None and (transition.target, new_stack) not in found:
+                    found.add((transition.target, new_stack))
+                    pending.append((transition.target, new_stack))
+        return found
+
+    configurations = closure({(machine.initial_state, tuple(machine.initial_stack))})
+    for symbol in word:
+        if symbol not in machine.alphabet:
+            return None
+        configurations = closure({(transition.target, new_stack)
+                                  for state, stack in configurations
+                                  for transition in state.transitions.get(symbol, [])
+                                  for new_stack in [apply(stack, transition)] if new_stack is not None})
+        if not configurations:
+            return None
+    return configurations
+
+
+def plain_dpda_run(machine: DPDA, word: str):
+    """Runs the machine one transition at a time. Returns the final state and stack, or None on rejection."""
+    def follow_epsilon(state, stack):
+        for _ in range(EPSILON_LIMIT):
+            transition = state.transitions.get(("", stack[-1])) if stack else None
+            if transition is None:
+                return state, stack
+            state, stack = transition.target, apply(stack, transition)
+        raise RecursionError("epsilon transitions diverge")
+
+    state, stack = follow_epsilon(machine.initial_state, tuple(machine.initial_stack))
+    for symbol in word:
+        transition = state.transitions.get((symbol, stack[-1])) if stack else None
+        if symbol not in machine.alphabet or transition is None:
+            return None
+        state, stack = follow_epsilon(transition.target, apply(stack, transition))
+    return state, stack
+
+
+@pytest.mark.parametrize("seed", range(300))
+def test_compiled_npda_agrees_with_plain_run(seed):
+    machine = random_npda(random.Random(seed))
+    for word in WORDS:
+        for require_empty_stack in (False, True):
+            configurations = plain_npda_run(machine, word)
+            accepted = configurations is not None and any(
+                state.is_final and (not require_empty_stack or len(stack) == 1) for state, stack in configurations)
+            assert machine.process_input(word, require_empty_stack) == accepted
+            if configurations is not None:
+                assert sorted(machine.output[word]["states"]) == sorted(state.name for state, _ in configurations)
+            assert machine.process_input(word, require_empty_stack, witness=True) == accepted
+            if accepted:
+                assert_accepting_run(machine, word, machine.accepting_run(), require_empty_stack)
+
+
+def assert_accepting_run(machine: NPDA, word: str, run, require_empty_stack: bool):
+    state, stack, position = machine.initial_state, tuple(machine.initial_stack), 0
+    for transition in run:
+        assert transition.source is state
+        if transition.symbol:
+            assert word[position] == transition.symbol
+            position += 1
+        stack = apply(stack, transition)
+        assert stack is not None
+        state = transition.target
+    assert position == len(word)
+    assert state.is_final and (not require_empty_stack or len(stack) == 1)
+
+
+@pytest.mark.parametrize("seed", range(400))
+def test_compiled_dpda_agrees_with_plain_run(seed):
+    machine = random_dpda(random.Random(seed))
+    for word in WORDS:
+        for require_empty_stack in (False, True):
+            try:
+                outcome = plain_dpda_run(machine, word)
+            except RecursionError:
+                with pytest.raises(ValueError):
+                    machine.process_input(word, require_empty_stack)
+                continue
+            accepted = outcome is not None and outcome[0].is_final and (
+                not require_empty_stack or len(outcome[1]) == 1)
+            assert machine.process_input(word, require_empty_stack) == accepted
+            if outcome is not None:
+                assert machine.output[word]["state"] == outcome[0].name
+                assert machine.stack == list(outcome[1])
+
+            session = machine.session(require_empty_stack)
+            for start in range(0, len(word), 2):
+                session.feed(word[start:start + 2])
+            assert session.finish() == accepted
@@ -0,0 +1,51 @@
+import io
+import signal
+
+import pytest
+
+from automata.automata_classes import Turing
+from automata.simulation.trace import TraceRecorder
+
+
+def ping_pong() -> Turing:
+    """A machine that moves its head back and forth between two cells forever."""
+    machine = Turing()
+    machine.add_state("q0")
+    machine.add_state("q1")
+    machine.add_transition("q0", "q1", "|", "|", "R")
+    machine.add_transition("q1", "q0", "|", "|", "L")
+    return machine
+
+
+def test_trace_keeps_last_steps_of_finished_run():
+    trace = TraceRecorder(capacity=5, dump_on_error=False)
+    ping_pong().process_input("", max_iterations=99, trace=trace)
+    assert trace.recorded == 100
+    entries = trace.entries()
+    assert [entry["step"] for entry in entries] == [95, 96, 97, 98, 99]
+    assert [entry["state"] for entry in entries] == ["q1", "q0", "q1", "q0", "q1"]
+
+
+@pytest.mark.skipif(not hasattr(signal, "setitimer"), reason="needs interval timers")
+def test_interrupted_run_dumps_current_trace():
+    def interrupt(signum, frame):
+        raise KeyboardInterrupt
+
+    out = io.StringIO()
+    trace = TraceRecorder(capacity=5, file=out)
+    previous = signal.signal(signal.SIGALRM, interrupt)
+    signal.setitimer(signal.ITIMER_REAL, 0.05)
+    try:
+        with pytest.raises(KeyboardInterrupt):
+            ping_pong().process_input("", max_iterations=None, trace=trace)
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+    assert trace.recorded > 5
+    dump = out.getvalue().splitlines()
+    assert dump[0] == f"Last 5 of {trace.recorded} steps"
+    steps = [int(line.split(":")[0]) for line in dump[1:]]
+    assert steps == list(range(trace.recorded - 5, trace.recorded))
+    states = [entry["state"] for entry in trace.entries()]
+    assert all(first != second for first, second in zip(states, states[1:]))
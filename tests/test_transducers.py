@@ -0,0 +1,165 @@
+import io
+import itertools
+import random
+
+import pytest
+
+from automata.automata_classes import MEALY, MOORE
+
+OUTPUTS = ["x", "y", None]
+
+
+def random_transducer(rnd: random.Random, kind, inputs="ab", outputs=OUTPUTS):
+    """A machine with a few missing transitions, some of them without output."""
+    machine = kind()
+    states = [f"q{index}" for index in range(rnd.randint(1, 5))]
+    for state in states:
+        if kind is MOORE:
+            machine.add_state(state, output=rnd.choice(outputs))
+        else:
+            machine.add_state(state)
+    for state in states:
+        for symbol in inputs:
+            if rnd.random() < 0.85:
+                if kind is MOORE:
+                    machine.add_transition(state, rnd.choice(states), symbol)
+                else:
+                    machine.add_transition(state, rnd.choice(states), symbol, rnd.choice(outputs))
+    machine.alphabet = set(inputs)
+    return machine
+
+
+def plain_run(machine, word):
+    """Steps through the transition dicts. Returns the outputs, whether the word was consumed and the last state."""
+    moore = machine.type == "MOORE"
+    state = machine.initial_state
+    outputs = [state.output] if moore and state.output is not None else []
+    for symbol in word:
+        transition = state.transitions.get(symbol) if symbol in machine.alphabet else None
+        if transition is None:
+            return outputs, False, state.name
+        state = transition.target
+        output = state.output if moore else transition.output
+        if output is not None:
+            outputs.append(output)
+    return outputs, True, state.name
+
+
+def session_run(machine, word):
+    session = machine.session()
+    outputs = list(session.feed(word))
+    return outputs, session.finish(), session.current_state.name
+
+
+def words(rnd: random.Random, count: int, symbols="ab"):
+    return ["".join(rnd.choice(symbols + "c" if rnd.random() < 0.1 else symbols)
+                    for _ in range(rnd.randint(0, 10))) for _ in range(count)]
+
+
+@pytest.mark.parametrize("seed", range(150))
+def test_streaming_agrees_with_plain_run(seed):
+    rnd = random.Random(seed)
+    machine = random_transducer(rnd, rnd.choice([MEALY, MOORE]))
+    for word in words(rnd, 20):
+        expected = plain_run(machine, word)
+        assert session_run(machine, word) == expected
+        assert list(machine.transduce(iter(word))) == expected[0]
+
+        to_list, to_file = machine.session(), machine.session()
+        collected, written = [], io.StringIO()
+        for start in range(0, len(word) + 1, 3):
+            to_list.feed_into(word[start:start + 3], collected)
+            to_file.feed_into(word[start:start + 3], written)
+        assert collected == expected[0]
+        assert written.getvalue() == "".join(expected[0])
+        assert to_list.finish() == expected[1]
+
+
+@pytest.mark.parametrize("seed", range(100))
+def test_batch_agrees_with_plain_run(seed):
+    rnd = random.Random(seed)
+    machine = random_transducer(rnd, rnd.choice([MEALY, MOORE]))
+    sequences = words(rnd, 30)
+    batch = machine.transduce_batch(sequences)
+    states = machine.compile().states
+    for index, word in enumerate(sequences):
+        outputs, consumed, state = plain_run(machine, word)
+        assert batch.decode(index) == outputs
+        assert bool(batch.rejected[index]) == (not consumed)
+        assert states[batch.states[index]].name == state
+
+
+def cascade(machines, word):
+    """Feeds every machine the outputs of the one before it."""
+    symbols, consumed = list(word), True
+    for machine in machines:
+        symbols, stage_consumed, _ = plain_run(machine, symbols)
+        consumed = consumed and stage_consumed
+    return symbols, consumed
+
+
+@pytest.mark.parametrize("seed", range(150))
+def test_composition_agrees_with_cascade(seed):
+    rnd = random.Random(seed)
+    machines, inputs = [], "ab"
+    for _ in range(rnd.randint(1, 4)):
+        outputs = rnd.choice([["x", "y"], ["0", "1", "2", None], ["a", "b"], ["x", None]])
+        machines.append(random_transducer(rnd, MEALY, inputs, outputs))
+        inputs = "".join(output for output in outputs if output is not None)
+    composed = machines[0].compose(*machines[1:])
+    minimized = machines[0].compose(*machines[1:], minimize=True)
+    assert len(minimized.states) <= len(composed.states)
+    for word in words(rnd, 20):
+        outputs, consumed = cascade(machines, word)
+        for machine in (composed, minimized):
+            result = session_run(machine, word)
+            assert result[1] == consumed
+            if consumed:
+                assert result[0] == outputs
+
+
+def behaviours(machine, depth: int) -> int:
+    """Counts the reachable states that differ in their outputs on some word of at most `depth` symbols."""
+    probes = ["".join(word) for length in range(depth + 1)
+              for word in itertools.product(sorted(machine.alphabet), repeat=length)]
+    reachable, pending = {machine.initial_state}, [machine.initial_state]
+    while pending:
+        for transition in pending.pop().transitions.values():
+            if transition.target not in reachable:
+                reachable.add(transition.target)
+                pending.append(transition.target)
+
+    def behaviour(state):
+        initial = machine.initial_state
+        machine.initial_state = state
+        try:
+            return tuple((tuple(outputs), consumed) for outputs, consumed, _ in
+                         (plain_run(machine, probe) for probe in probes))
+        finally:
+            machine.initial_state = initial
+
+    return len({behaviour(state) for state in reachable})
+
+
+@pytest.mark.parametrize("seed", range(150))
+def test_minimization_keeps_behaviour_and_is_minimal(seed):
+    rnd = random.Random(seed)
+    machine = random_transducer(rnd, rnd.choice([MEALY, MOORE]))
+    minimized = machine.minimize()
+    assert len(minimized.states) == behaviours(machine, len(machine.states))
+    for word in words(rnd, 25):
+        assert session_run(minimized, word)[:2] == plain_run(machine, word)[:2]
+
+
+@pytest.mark.parametrize("seed", range(150))
+def test_conversions_keep_outputs(seed):
+    rnd = random.Random(seed)
+    mealy = random_transducer(rnd, MEALY)
+    moore = random_transducer(rnd, MOORE)
+    to_moore, to_mealy = mealy.to_moore(), moore.to_mealy()
+    for word in words(rnd, 25):
+        assert session_run(to_moore, word)[:2] == plain_run(mealy, word)[:2]
+        outputs, consumed, _ = plain_run(moore, word)
+        if moore.initial_state.output is not None:
+            outputs = outputs[1:]
+        assert session_run(to_mealy, word)[:2] == (outputs, consumed)
@@ -0,0 +1,144 @@
+import random
+
+import pytest
+
+from automata.automata_classes import Turing
+from automata.simulation.tape import Tape
+from automata.simulation.turing import SCAN_WINDOW
+
+MOVES = {"L": -1, "R": 1, "N": 0}
+
+
+def random_machine(rnd: random.Random) -> Turing:
+    """A machine with random transitions, about half of them self-loops that run as scans."""
+    machine = Turing(blank_symbol="0")
+    states = [f"q{index}" for index in range(rnd.randint(1, 5))]
+    symbols = [str(code) for code in range(rnd.randint(2, 4))]
+    for state in states:
+        machine.add_state(state, is_final=rnd.random() < 0.5)
+    for state in states:
+        for symbol in symbols:
+            if rnd.random() < 0.45:
+                machine.add_transition(state, state, symbol, symbol, rnd.choice("LR"))
+            elif rnd.random() < 0.8:
+                machine.add_transition(state, rnd.choice(states), symbol, rnd.choice(symbols), rnd.choice("LRN"))
+    return machine
+
+
+def plain_run(machine: Turing, word: str, max_iterations: int):
+    """
+    Steps through the transition dicts on a dict of cells. Returns whether the machine
+    halted, its final state, the visited cells, the head position in them and the steps.
+    """
+    cells = dict(enumerate(["0", *word, "0"]))
+    state, head, lo, hi = machine.initial_state, 1, 0, len(word) + 1
+    steps, halted = 0, False
+    while steps <= max_iterations:
+        transition = state.transitions.get(cells.get(head, "0"))
+        if transition is None:
+            halted = True
+            break
+        cells[head] = transition.tape_write
+        head += MOVES[transition.move]
+        lo, hi = min(lo, head), max(hi, head)
+        state = transition.target
+        steps += 1
+    return halted, state, [cells.get(position, "0") for position in range(lo, hi + 1)], head - lo, steps
+
+
+def random_word(rnd: random.Random) -> str:
+    """Short random words, and long uniform stretches that scans cross in doubling windows."""
+    parts = []
+    for _ in range(rnd.randint(0, 4)):
+        if rnd.random() < 0.5:
+            parts.append(rnd.choice("0123") * rnd.randint(1, 5 * SCAN_WINDOW))
+        else:
+            parts.append("".join(rnd.choice("0123") for _ in range(rnd.randint(1, 10))))
+    return "".join(parts)
+
+
+@pytest.mark.parametrize("seed", range(300))
+def test_compiled_run_agrees_with_plain_run(seed):
+    rnd = random.Random(seed)
+    machine = random_machine(rnd)
+    word = random_word(rnd)
+    budget = rnd.choice([0, 1, 7, 300, 5000])
+    halted, state, tape, head_position, steps = plain_run(machine, word, budget)
+
+    result = machine.process_input(word, budget, return_steps=True)
+    assert result[1] == tape
+    assert (machine.current_state, machine.head_position) == (state, head_position)
+    if not halted:
+        assert result == (False, tape)
+    elif state.is_final:
+        assert result == (True, tape, steps)
+    else:
+        assert result == (False, tape, head_position)
+
+
+def there_and_back() -> Turing:
+    """Scans right over ones up to a 2, then left over ones up to the blank before them."""
+    machine = Turing(blank_symbol="0")
+    machine.add_state("right")
+    machine.add_state("left")
+    machine.add_state("done", is_final=True)
+    machine.add_transition("right", "right", "1", "1", "R")
+    machine.add_transition("right", "left", "2", "2", "L")
+    machine.add_transition("left", "left", "1", "1", "L")
+    machine.add_transition("left", "done", "0", "0", "N")
+    return machine
+
+
+# Lengths around the ends of the first few scan windows, which double in size
+STRETCHES = sorted({SCAN_WINDOW * (2 ** doublings - 1) + offset
+                    for doublings in range(5) for offset in (-1, 0, 1, 2)} - {-1})
+
+
+@pytest.mark.parametrize("length", STRETCHES)
+def test_scans_stop_at_the_right_cell(length):
+    machine = there_and_back()
+    word = "1" * length + "2"
+    for budget in (length - 1, length, length + 1, 2 * length + 1, 3 * length):
+        if budget >= 0:
+            expected = plain_run(machine, word, budget)
+            result = machine.process_input(word, budget, return_steps=True)
+            assert result[1] == expected[2]
+            assert (machine.current_state, machine.head_position) == (expected[1], expected[3])
+            assert (len(result) == 3) == expected[0]
+
+
+@pytest.mark.parametrize("direction", ["L", "R"])
+def test_scan_off_the_edge_grows_the_tape(direction):
+    machine = Turing(blank_symbol="0")
+    machine.add_state("scan")
+    machine.add_transition("scan", "scan", ["0", "1"], ["0", "1"], direction)
+    for budget in (10, SCAN_WINDOW, 3 * SCAN_WINDOW + 5, 10000):
+        expected = plain_run(machine, "1" * 100, budget)
+        assert machine.process_input("1" * 100, budget) == (False, expected[2])
+        assert machine.head_position == expected[3]
+
+
+@pytest.mark.parametrize("seed", range(50))
+def test_tape_agrees_with_dict_of_cells(seed):
+    rnd = random.Random(seed)
+    content = [rnd.choice("ab0") for _ in range(rnd.randint(0, 20))]
+    head = rnd.randint(0, max(len(content) - 1, 0))
+    tape = Tape("0", content, head=head)
+    cells = dict(enumerate(content or ["0"]))
+    lo, hi = 0, max(len(content), 1) - 1
+    direction = 1
+    for _ in range(2000):
+        # Long walks in one direction, so the buffer grows on both sides
+        if rnd.random() < 0.02:
+            direction = -direction
+        delta = direction * rnd.choice([1, 1, 1, 2, 3]) if rnd.random() < 0.9 else -direction
+        if rnd.random() < 0.3:
+            symbol = rnd.choice("abc0")
+            tape.write(symbol)
+            cells[head] = symbol
+        tape.move(delta)
+        head += delta
+        lo, hi = min(lo, head), max(hi, head)
+        assert tape.read() == cells.get(head, "0")
+    assert tape.to_list() == [cells.get(position, "0") for position in range(lo, hi + 1)]
+    assert tape.head_offset == head - lo